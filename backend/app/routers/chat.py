@@ -261,16 +261,12 @@ async def get_example_question(
 ):
     """예시 질문에 대한 프롬프트 반환"""
     try:
-        # 프롬프트 파일 경로
-        from ..services.chat_service import PATHS
-        prompt_path = os.path.join(PATHS["prompts"], "example_questions", f"question_{question_number}.txt")
+        # 프롬프트 내용 (서버 시작 시 미리 읽어 둔 캐시 사용)
+        prompt_content = ChatService.get_example_question(question_number)
         
-        if not os.path.exists(prompt_path):
+        if prompt_content is None:
             raise HTTPException(status_code=404, detail="프롬프트 파일을 찾을 수 없습니다.")
         
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            prompt_content = f.read()
-        
         return {
             "question_number": question_number,
             "prompt": prompt_content
@@ -9,10 +9,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 router = APIRouter()
 security = HTTPBearer()
 
+# 검색 기록에 포함되는 service_name (query_summary_local: Gemini 없이 로컬 분석기로 처리한 검색)
+SEARCH_SERVICE_NAMES = ["query_summary", "query_summary_local"]
+
 @router.get("/ai-usage")
 async def get_ai_usage(
     current_user: User = Depends(get_current_user),
-    service_name: Optional[str] = Query(None, description="서비스 이름 (query_summary, analyze_reports, chat_report)"),
+    service_name: Optional[str] = Query(None, description="서비스 이름 (query_summary, query_summary_local, analyze_reports, chat_report)"),
     start_date: Optional[date] = Query(None, description="시작 날짜 (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="종료 날짜 (YYYY-MM-DD)"),
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -112,12 +115,12 @@ async def get_user_history(
         
         # 서비스 타입 필터
         if service_type == "search":
-            query = query.eq("service_name", "query_summary")
+            query = query.in_("service_name", SEARCH_SERVICE_NAMES)
         elif service_type == "chat":
             query = query.in_("service_name", ["chat_report", "write_chat"])
         else:
-            # all 또는 기본값: query_summary, chat_report, write_chat 모두
-            query = query.in_("service_name", ["query_summary", "chat_report", "write_chat"])
+            # all 또는 기본값: 검색(query_summary, query_summary_local), chat_report, write_chat 모두
+            query = query.in_("service_name", SEARCH_SERVICE_NAMES + ["chat_report", "write_chat"])
         
         response = query.execute()
         
@@ -134,7 +137,7 @@ async def get_user_history(
         logs = response.data
         
         # 서비스별 개수 계산
-        search_count = sum(1 for log in logs if log.get("service_name") == "query_summary")
+        search_count = sum(1 for log in logs if log.get("service_name") in SEARCH_SERVICE_NAMES)
         chat_count = sum(1 for log in logs if log.get("service_name") in ["chat_report", "write_chat"])
         
         return {
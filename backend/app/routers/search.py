@@ -3,7 +3,7 @@ from fastapi.responses import FileResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Dict, Any
 import os
-from ..schemas.search import SearchRequest, SearchResponse
+from ..schemas.search import SearchRequest, SearchResponse, BatchSearchRequest, BatchSearchResponse
 from ..services.search_service import SearchService
 from ..services.analysis_service import AnalysisService
 from ..services.logger_service import LoggerService
@@ -28,9 +28,36 @@ async def search_documents(
             k=request.k, 
             user_id=str(current_user.id),
             logger_service=logger_service,
+            auth_token=credentials.credentials,  # 토큰 전달
+            cursor=request.cursor
+        )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_documents_batch(
+    request: BatchSearchRequest,
+    current_user = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """여러 쿼리 배치 검색 API - 인증된 사용자만 사용 가능"""
+    try:
+        # LoggerService 인스턴스 생성
+        logger_service = LoggerService()
+
+        result = await SearchService.search_documents_batch(
+            queries=request.queries,
+            k=request.k,
+            user_id=str(current_user.id),
+            logger_service=logger_service,
             auth_token=credentials.credentials  # 토큰 전달
         )
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -2,9 +2,10 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
 class SearchRequest(BaseModel):
-    query: str
+    query: str = ""
     k: Optional[int] = 10
     search_results: Optional[List[Dict[str, Any]]] = None
+    cursor: Optional[str] = None  # 이전 검색 응답의 next_cursor (다음 페이지 조회)
 
 class SearchResponse(BaseModel):
     query: str
@@ -14,4 +15,13 @@ class SearchResponse(BaseModel):
     intent: Optional[str] = None
     total_results: int
     results: List[Dict[str, Any]]
-    usage_metadata: Optional[Dict[str, Any]] = None 
\ No newline at end of file
+    usage_metadata: Optional[Dict[str, Any]] = None
+    next_cursor: Optional[str] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    k: Optional[int] = 10
+
+class BatchSearchResponse(BaseModel):
+    total_queries: int
+    results: List[Dict[str, Any]]  # 쿼리 순서대로 SearchResponse 형식 또는 {query, error, status_code}
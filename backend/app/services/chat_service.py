@@ -1,13 +1,14 @@
 import os
 import sys
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
 import traceback
 import sqlite3
 import uuid
-from typing import Optional
+from typing import Any, Dict, Optional
 from .logger_service import LoggerService
+from .llm_gateway import LLMGateway, client
+from .chat_session_store import ChatSessionStore
 
 # 경로 설정 (환경변수에서 읽어오기)
 def get_paths():
@@ -26,15 +27,42 @@ def get_paths():
 # 전역 경로 설정
 PATHS = get_paths()
 
-API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    raise RuntimeError("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
-
 CHAT_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
-client = genai.Client(api_key=API_KEY)
+
+# ChatSession 저장소 설정 (보고서 전문을 담은 세션이 쌓이지 않도록 개수 / 유휴 시간 / 메모리 예산 제한)
+CHAT_SESSION_MAX_ENTRIES = int(os.getenv("CHAT_SESSION_MAX_ENTRIES", "200"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "1800"))                                # 유휴 세션 제거 시간 (초)
+CHAT_SESSION_MAX_BYTES = int(os.getenv("CHAT_SESSION_MAX_MB", "256")) * 1024 * 1024
+CHAT_SESSION_HISTORY_ENTRIES = int(os.getenv("CHAT_SESSION_HISTORY_ENTRIES", "5000"))          # 제거된 세션의 대화 기록 보관 수
+CHAT_SESSION_HISTORY_TTL = float(os.getenv("CHAT_SESSION_HISTORY_TTL", "86400"))
+
+
+def snapshot_chat_history(chat) -> list:
+    """제거되는 세션의 대화 기록 (보고서 전문이 담긴 첫 system message는 복원 시 union 파일로 다시 만들므로 제외)"""
+    return list(chat.get_history())[1:]
+
+
+def estimate_history_bytes(history) -> int:
+    """대화 기록(Content 목록)의 대략적인 텍스트 바이트 수"""
+    return sum(
+        len((getattr(part, "text", None) or "").encode("utf-8"))
+        for content in history
+        for part in (content.parts or [])
+    )
+
 
 # ChatSession(대화 context) 관리를 위한 전역 변수
-chat_sessions = {}  # key: session_id, value: chat 객체
+chat_sessions = ChatSessionStore(
+    max_entries=CHAT_SESSION_MAX_ENTRIES,
+    ttl_seconds=CHAT_SESSION_TTL,
+    max_bytes=CHAT_SESSION_MAX_BYTES,
+    snapshot=snapshot_chat_history,
+    history_entries=CHAT_SESSION_HISTORY_ENTRIES,
+    history_ttl_seconds=CHAT_SESSION_HISTORY_TTL
+)  # key: session_id, value: chat 객체
+
+# 예시 질문 프롬프트 캐시
+example_questions = {}  # key: 질문 번호, value: 프롬프트 내용
 
 # 프롬프트 템플릿 로드
 try:
@@ -58,6 +86,26 @@ class ChatService:
         with open(union_path, 'r', encoding='utf-8') as f:
             return f.read()
 
+    @staticmethod
+    def get_example_question(question_number: int) -> Optional[str]:
+        """예시 질문 프롬프트 반환 (한 번 읽은 파일은 메모리에 캐시, 없으면 None)"""
+        if question_number not in example_questions:
+            prompt_path = os.path.join(PATHS["prompts"], "example_questions", f"question_{question_number}.txt")
+            if not os.path.exists(prompt_path):
+                return None
+            with open(prompt_path, 'r', encoding='utf-8') as f:
+                example_questions[question_number] = f.read()
+        return example_questions[question_number]
+
+    @staticmethod
+    def preload_example_questions() -> int:
+        """예시 질문 프롬프트 파일을 모두 미리 읽어 캐시"""
+        example_dir = os.path.join(PATHS["prompts"], "example_questions")
+        for filename in os.listdir(example_dir):
+            if filename.startswith("question_") and filename.endswith(".txt"):
+                ChatService.get_example_question(int(filename[len("question_"):-len(".txt")]))
+        return len(example_questions)
+
     @staticmethod
     def create_system_message(report_content: str) -> str:
         """프롬프트 템플릿을 사용하여 system message 생성"""
@@ -117,37 +165,45 @@ class ChatService:
             if not session_id:
                 session_id = f"anonymous_{report_number}"
 
-            if session_id in chat_sessions:
+            chat = chat_sessions.get(session_id)
+            if chat is not None:
                 # 기존 세션 사용
-                chat = chat_sessions[session_id]
                 print(f"[CHAT] 기존 ChatSession 사용: {session_id}")
-                response = await chat.send_message(query)
+                response = await LLMGateway.send_message(chat, query)
+                chat_sessions.add_bytes(session_id, len(query.encode("utf-8")) + len((response.text or "").encode("utf-8")))
             else:
-                # 새로운 세션 생성
-                chat = client.aio.chats.create(model=CHAT_MODEL_NAME)
-                print(f"[CHAT] 새로운 ChatSession 생성: {session_id}")
-                
                 # union 파일 내용을 프롬프트 템플릿을 사용하여 system message 생성
                 report_content = ChatService.get_union_content(report_number)
                 system_message = ChatService.create_system_message(report_content)
                 print(f"[CHAT] 프롬프트 템플릿 기반 system message 생성 완료")
-                await chat.send_message(system_message)
-                
-                # 히스토리가 있으면 추가
-                if history:
-                    for item in history:
-                        for part in item.get("parts", []):
-                            role = item.get('role', '')
-                            text = part.get('text', '')
-                            if role == 'user':
-                                await chat.send_message(text)
-                            elif role == 'model':
-                                # assistant 응답은 자동으로 처리됨
-                                pass
-                
+
+                stored_history = chat_sessions.get_history(session_id)
+                if stored_history is not None:
+                    # 메모리 제한으로 제거된 세션은 보관된 대화 기록으로 복원 (Gemini 호출 없이 context 재구성)
+                    restored_history = [types.Content(role="user", parts=[types.Part(text=system_message)])] + list(stored_history)
+                    chat = client.aio.chats.create(model=CHAT_MODEL_NAME, history=restored_history)
+                    print(f"[CHAT] 보관된 대화 기록으로 ChatSession 복원: {session_id} ({len(stored_history)}개 메시지)")
+                else:
+                    # 새로운 세션 생성
+                    chat = client.aio.chats.create(model=CHAT_MODEL_NAME)
+                    print(f"[CHAT] 새로운 ChatSession 생성: {session_id}")
+                    await LLMGateway.send_message(chat, system_message)
+
+                    # 히스토리가 있으면 추가
+                    if history:
+                        for item in history:
+                            for part in item.get("parts", []):
+                                role = item.get('role', '')
+                                text = part.get('text', '')
+                                if role == 'user':
+                                    await LLMGateway.send_message(chat, text)
+                                elif role == 'model':
+                                    # assistant 응답은 자동으로 처리됨
+                                    pass
+
                 # 현재 쿼리 전송
-                response = await chat.send_message(query)
-                chat_sessions[session_id] = chat
+                response = await LLMGateway.send_message(chat, query)
+                chat_sessions.put(session_id, chat, estimate_history_bytes(chat.get_history()), restored=stored_history is not None)
 
             result = response.text.strip()
             print(f"[CHAT] 응답 성공 (길이: {len(result)})")
@@ -196,7 +252,11 @@ class ChatService:
 
     @staticmethod
     def cleanup_session(session_id: str):
-        """세션 종료: ChatSession 삭제"""
-        if session_id in chat_sessions:
-            del chat_sessions[session_id]
-            print(f"[CLEANUP] ChatSession 삭제됨: {session_id}") 
\ No newline at end of file
+        """세션 종료: ChatSession과 보관 중인 대화 기록 삭제"""
+        if chat_sessions.remove(session_id):
+            print(f"[CLEANUP] ChatSession 삭제됨: {session_id}")
+
+    @staticmethod
+    def get_session_stats() -> Dict[str, Any]:
+        """ChatSession 저장소 크기, 메모리 사용량, 적중 / 제거 / 복원 통계"""
+        return chat_sessions.stats()
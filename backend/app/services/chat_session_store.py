@@ -0,0 +1,132 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .cache import LRUCache
+
+
+class ChatSessionStore:
+    """최대 세션 수 / 유휴 TTL / 대략적인 메모리 예산을 지키는 LRU 채팅 세션 저장소
+
+    - 가장 오래 사용되지 않은 세션부터 제거 (유휴 시간이 지난 세션은 조회/저장 시 함께 정리)
+    - 제거되는 세션은 snapshot(chat)으로 가벼운 대화 기록만 남겨 두고, 다시 요청되면 호출자가 기록으로 세션을 복원
+    """
+
+    def __init__(self, max_entries: int = 200, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None,
+                 snapshot: Optional[Callable[[Any], Any]] = None, history_entries: int = 5000, history_ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.snapshot = snapshot
+        self._entries = OrderedDict()  # session_id -> [마지막 사용 시각, chat, 바이트 수], LRU 순서
+        self._histories = LRUCache(history_entries, ttl_seconds=history_ttl_seconds)  # session_id -> 제거된 세션의 대화 기록
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.restores = 0
+
+    def _evict(self, session_id: Hashable, reason: str):
+        """세션을 제거하고 대화 기록을 보관 (lock 안에서 호출)"""
+        _, chat, size_bytes = self._entries.pop(session_id)
+        self.total_bytes -= size_bytes
+        if reason == "expired":
+            self.expirations += 1
+        else:
+            self.evictions += 1
+
+        if self.snapshot is not None:
+            try:
+                self._histories.set(session_id, self.snapshot(chat))
+            except Exception as e:
+                print(f"⚠️ 채팅 세션 기록 보관 실패 ({session_id}): {e}")
+        print(f"🧹 채팅 세션 제거 ({reason}): {session_id} ({size_bytes / 1024:.0f}KB)")
+
+    def _enforce_limits(self, now: float):
+        """유휴 TTL이 지난 세션과 용량 / 메모리 예산을 넘는 LRU 세션 제거 (lock 안에서 호출)"""
+        while self._entries:
+            session_id, (last_used, _, _) = next(iter(self._entries.items()))
+            if self.ttl_seconds and last_used + self.ttl_seconds <= now:
+                self._evict(session_id, "expired")
+            elif len(self._entries) > self.max_entries or (self.max_bytes and self.total_bytes > self.max_bytes and len(self._entries) > 1):
+                self._evict(session_id, "lru")
+            else:
+                break
+
+    def get(self, session_id: Hashable) -> Optional[Any]:
+        """세션 반환 (없거나 유휴 시간이 지났으면 None)"""
+        with self._lock:
+            now = time.monotonic()
+            self._enforce_limits(now)
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry[0] = now
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, session_id: Hashable, chat: Any, size_bytes: int, restored: bool = False):
+        """세션 저장 (보관 중이던 같은 세션의 대화 기록은 삭제, restored면 기록으로 복원한 세션으로 집계)"""
+        with self._lock:
+            if restored:
+                self.restores += 1
+            if session_id in self._entries:
+                self.total_bytes -= self._entries.pop(session_id)[2]
+            self._entries[session_id] = [time.monotonic(), chat, size_bytes]
+            self.total_bytes += size_bytes
+            self._histories.pop(session_id)
+            self._enforce_limits(time.monotonic())
+
+    def add_bytes(self, session_id: Hashable, size_bytes: int):
+        """메시지를 주고받은 만큼 세션 크기 증가 및 최근 사용으로 갱신 (이미 제거된 세션이면 무시)"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+            entry[0] = time.monotonic()
+            entry[2] += size_bytes
+            self.total_bytes += size_bytes
+            self._entries.move_to_end(session_id)
+            self._enforce_limits(entry[0])
+
+    def get_history(self, session_id: Hashable) -> Optional[Any]:
+        """제거된 세션의 대화 기록 (없으면 None) - 복원에 성공하면 put(restored=True)가 기록을 삭제하고 복원 횟수 집계"""
+        return self._histories.get(session_id)
+
+    def remove(self, session_id: Hashable) -> bool:
+        """세션과 보관 중인 대화 기록 삭제 (명시적 세션 종료)"""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self.total_bytes -= entry[2]
+            history = self._histories.pop(session_id)
+            return entry is not None or history is not None
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        return session_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """세션 수, 메모리 사용량, 적중률, 제거 / 복원 횟수"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "restores": self.restores,
+            "stored_histories": len(self._histories)
+        }
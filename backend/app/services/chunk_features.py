@@ -0,0 +1,96 @@
+import os
+import json
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional
+
+# 청크별로 미리 계산해 두는 특징 (값 사전(vocab)의 번호로 저장, 청크 ID 순서와 정렬)
+FEATURE_KEYS = ["section", "title", "award", "field", "year", "authors", "teacher"]
+
+
+def normalize_feature(key: str, value: Any) -> str:
+    """재정렬에서 비교하는 형태로 메타데이터 값 변환 (섹션은 원래 값, 제목은 소문자, 나머지는 앞뒤 공백 제거)"""
+    if key == "section":
+        return str(value)
+    if key == "title":
+        return str(value).lower()
+    return str(value).strip()
+
+
+class ChunkFeatures:
+    """청크별 쿼리와 무관한 재정렬 특징 테이블 (build_chromadb.py가 생성)
+
+    - 특징마다 작은 정수 번호 배열(codes)과 값 사전(vocab)으로 저장 (섹션 / 수상 / 분야 / 연도는 수십 개 값뿐)
+    - 재정렬 시 후보별 문자열 처리 없이 번호 배열을 조회하고, 값 사전 단위로만 쿼리 의존 계산 수행
+    """
+
+    def __init__(self, doc_ids: List[str], codes: Dict[str, np.ndarray], vocab: Dict[str, List[str]]):
+        self.doc_ids = doc_ids
+        self.id_to_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self.codes = codes
+        self.vocab = vocab
+        self.value_to_code = {key: {value: code for code, value in enumerate(values)} for key, values in vocab.items()}
+        self.title_present = np.array([bool(title.strip()) for title in vocab["title"]], dtype=bool)
+        self.num_docs = len(doc_ids)
+
+    # ---------- 생성 / 저장 / 로드 ----------
+
+    @staticmethod
+    def build(doc_ids: List[str], metadatas: Iterable[Optional[Dict[str, Any]]]) -> "ChunkFeatures":
+        """청크 ID와 메타데이터 목록으로 특징 테이블 생성"""
+        vocab = {key: [] for key in FEATURE_KEYS}
+        lookup = {key: {} for key in FEATURE_KEYS}
+        codes = {key: [] for key in FEATURE_KEYS}
+        for metadata in metadatas:
+            metadata = metadata or {}
+            for key in FEATURE_KEYS:
+                value = normalize_feature(key, metadata.get(key, ""))
+                code = lookup[key].get(value)
+                if code is None:
+                    code = lookup[key][value] = len(vocab[key])
+                    vocab[key].append(value)
+                codes[key].append(code)
+
+        arrays = {
+            key: np.array(codes[key], dtype=np.min_scalar_type(max(len(vocab[key]) - 1, 0)))
+            for key in FEATURE_KEYS
+        }
+        return ChunkFeatures(list(doc_ids), arrays, vocab)
+
+    def save(self, features_dir: str):
+        """특징별 .npy 파일과 vocab.json, doc_ids.json으로 저장"""
+        os.makedirs(features_dir, exist_ok=True)
+        for key in FEATURE_KEYS:
+            np.save(os.path.join(features_dir, f"{key}.npy"), self.codes[key])
+        with open(os.path.join(features_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+        with open(os.path.join(features_dir, "doc_ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.doc_ids, f, ensure_ascii=False)
+
+    @staticmethod
+    def load(features_dir: str) -> Optional["ChunkFeatures"]:
+        """저장된 특징 테이블을 mmap으로 로드 (없으면 None)"""
+        doc_ids_path = os.path.join(features_dir, "doc_ids.json")
+        if not os.path.exists(doc_ids_path):
+            return None
+        with open(doc_ids_path, "r", encoding="utf-8") as f:
+            doc_ids = json.load(f)
+        with open(os.path.join(features_dir, "vocab.json"), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        codes = {
+            key: np.load(os.path.join(features_dir, f"{key}.npy"), mmap_mode="r")
+            for key in FEATURE_KEYS
+        }
+        return ChunkFeatures(doc_ids, codes, vocab)
+
+    # ---------- 조회 ----------
+
+    def indices_for(self, doc_ids: List[str]) -> np.ndarray:
+        """청크 ID 목록을 테이블 내 행 번호로 변환 (없으면 -1)"""
+        return np.array([self.id_to_index.get(doc_id, -1) for doc_id in doc_ids], dtype=np.int64)
+
+    def codes_for(self, doc_ids: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        """청크들의 특징 번호 배열 (테이블에 없는 청크가 하나라도 있으면 None)"""
+        rows = self.indices_for(doc_ids)
+        if len(rows) and rows.min() < 0:
+            return None
+        return {key: np.asarray(self.codes[key][rows], dtype=np.intp) for key in FEATURE_KEYS}
@@ -0,0 +1,181 @@
+import os
+import time
+import numpy as np
+from typing import List, Optional
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+# 환경 변수 로드
+load_dotenv()
+
+# 임베딩 모델 설정
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-large")
+
+# 임베딩 백엔드 ("torch": sentence-transformers, "onnx": ONNX Runtime CPU, "sidecar": 로컬 모델 서버 프로세스)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").strip().strip("'\"").lower()
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# CPU 추론 스레드 수 (0이면 라이브러리 기본값)
+EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))
+EMBEDDING_MAX_LENGTH = int(os.getenv("EMBEDDING_MAX_LENGTH", "512"))
+
+# ONNX 모델 설정 (int8 동적 양자화 모델 사용 여부)
+EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true"
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+
+
+def resolve_device() -> str:
+    """EMBEDDING_DEVICE 환경 변수 또는 CUDA 사용 가능 여부로 torch 디바이스 결정"""
+    device = os.getenv("EMBEDDING_DEVICE", "").strip().strip("'\"")
+    if device:
+        return device
+
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def mean_pool(last_hidden_state: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """attention mask 기준 평균 풀링 후 L2 정규화 (sentence-transformers e5 구성과 동일)"""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (last_hidden_state * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return pooled / np.clip(norms, 1e-12, None)
+
+
+def export_onnx_model(output_dir: str, model_name: str = EMBEDDING_MODEL_NAME, quantize: bool = True) -> str:
+    """허깅페이스 모델을 ONNX 그래프로 내보내고 필요하면 int8 동적 양자화 (torch 필요)"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(output_dir)
+
+    if not os.path.exists(model_path):
+        print(f"📦 ONNX 내보내기 시작: {model_name}")
+        model = AutoModel.from_pretrained(model_name).eval()
+        sample = tokenizer(["query: 예시 문장"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                model_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"}
+                },
+                opset_version=17
+            )
+        print(f"✅ ONNX 내보내기 완료: {model_path}")
+
+    if not quantize:
+        return model_path
+
+    int8_path = os.path.join(output_dir, ONNX_INT8_MODEL_FILE)
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        print(f"🗜️ int8 동적 양자화 시작...")
+        quantize_dynamic(model_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"✅ int8 양자화 완료: {int8_path}")
+    return int8_path
+
+
+class OnnxEmbeddings(Embeddings):
+    """ONNX Runtime(CPU)으로 실행하는 e5 임베딩 모델 (HuggingFaceEmbeddings와 같은 벡터를 반환)"""
+
+    def __init__(self, model_dir: str, quantize: bool = EMBEDDING_ONNX_QUANTIZE, batch_size: int = EMBEDDING_BATCH_SIZE,
+                 num_threads: int = EMBEDDING_NUM_THREADS, max_length: int = EMBEDDING_MAX_LENGTH):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(model_dir, ONNX_INT8_MODEL_FILE if quantize else ONNX_MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX 모델 '{model_path}'가 없습니다. scripts/export_onnx_embedding.py로 먼저 내보내주세요."
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """길이가 비슷한 텍스트끼리 배치로 묶어 추론 (패딩 최소화) 후 원래 순서로 반환"""
+        vectors = np.zeros((len(texts), 0), dtype=np.float32)
+        order = np.argsort([len(text) for text in texts], kind="stable")
+
+        for start in range(0, len(texts), self.batch_size):
+            batch_indices = order[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in batch_indices],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            inputs = {name: encoded[name].astype(np.int64) for name in self.input_names if name in encoded}
+            last_hidden_state = self.session.run(None, inputs)[0]
+            pooled = mean_pool(last_hidden_state, encoded["attention_mask"])
+
+            if vectors.shape[1] == 0:
+                vectors = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+            vectors[batch_indices] = pooled
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
+
+
+def create_embedding_model(backend: str = EMBEDDING_BACKEND, onnx_dir: Optional[str] = None) -> Embeddings:
+    """설정된 백엔드로 임베딩 모델 생성 (GPU가 없으면 CPU에서 실행)"""
+    started_at = time.perf_counter()
+
+    if backend == "onnx":
+        if onnx_dir is None:
+            raise ValueError("ONNX 백엔드에는 onnx_dir 경로가 필요합니다.")
+        model = OnnxEmbeddings(onnx_dir)
+        print(f"✅ 임베딩 모델 로드 완료: onnx ({os.path.basename(model.model_path)}, 스레드 {EMBEDDING_NUM_THREADS or '기본값'})")
+    elif backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        device = resolve_device()
+        if device == "cpu":
+            print(f"⚠️ CUDA를 사용하지 않습니다. CPU에서 임베딩합니다.")
+            if EMBEDDING_NUM_THREADS > 0:
+                import torch
+                torch.set_num_threads(EMBEDDING_NUM_THREADS)
+
+        model = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME,
+            model_kwargs={'device': device},
+            encode_kwargs={'batch_size': EMBEDDING_BATCH_SIZE}
+        )
+        print(f"✅ 임베딩 모델 로드 완료: {device}")
+    elif backend == "sidecar":
+        from .embedding_sidecar import SidecarClient, SidecarEmbeddings
+
+        model = SidecarEmbeddings(SidecarClient())
+        print(f"✅ 임베딩 사이드카 사용: {model.client.socket_path}")
+    else:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend}")
+
+    print(f"⏱️ 임베딩 모델 로딩 시간: {time.perf_counter() - started_at:.2f}초")
+    return model
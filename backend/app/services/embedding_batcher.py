@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class EmbeddingBatcher:
+    """동시에 들어온 쿼리 임베딩 요청을 짧은 시간 동안 모아 한 번의 배치 추론으로 처리
+
+    - max_wait_ms 동안 요청을 모으거나 max_batch_size개가 차면 배치 실행
+    - 추론은 이벤트 루프 밖 스레드에서 한 번에 하나의 배치만 실행하고,
+      실행 중에 들어온 요청은 다음 배치로 모음
+    """
+
+    def __init__(self, embed_documents: Callable[[List[str]], List[List[float]]], max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.embed_documents = embed_documents
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []  # (텍스트, 결과 future, 요청 시각)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size_seen = 0
+        self.failed_batches = 0
+        self._recent_batch_sizes = deque(maxlen=1000)
+        self._recent_wait_ms = deque(maxlen=1000)
+        self._recent_run_ms = deque(maxlen=1000)
+
+    async def embed(self, text: str) -> np.ndarray:
+        """텍스트 하나를 배치에 추가하고 임베딩 결과를 기다림"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+
+        if self._running is None:
+            if len(self._pending) >= self.max_batch_size:
+                self._start_batch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._on_timer)
+        return await future
+
+    def _on_timer(self):
+        self._timer = None
+        if self._running is None and self._pending:
+            self._start_batch()
+
+    def _start_batch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        self._running = asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        started_at = time.perf_counter()
+        # 같은 텍스트는 한 번만 임베딩
+        unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            vectors = await asyncio.to_thread(self.embed_documents, unique_texts)
+            by_text = {text: np.asarray(vector, dtype=np.float32) for text, vector in zip(unique_texts, vectors)}
+            for text, future, _ in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            run_ms = (time.perf_counter() - started_at) * 1000
+            wait_ms = max((started_at - enqueued_at) * 1000 for _, _, enqueued_at in batch)
+            self._record(len(batch), wait_ms, run_ms)
+            print(f"🧮 임베딩 배치: {len(batch)}건 (고유 {len(unique_texts)}건), 최대 대기 {wait_ms:.1f}ms, 실행 {run_ms:.1f}ms")
+
+            self._running = None
+            # 실행 중에 쌓인 요청은 이미 충분히 기다렸으므로 바로 다음 배치 실행
+            if self._pending:
+                self._start_batch()
+
+    def _record(self, batch_size: int, wait_ms: float, run_ms: float):
+        self.batches += 1
+        self.items += batch_size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, batch_size)
+        self._recent_batch_sizes.append(batch_size)
+        self._recent_wait_ms.append(wait_ms)
+        self._recent_run_ms.append(run_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 크기, 대기 시간, 실행 시간 통계 (최근 1000개 배치 기준 백분위수)"""
+        def percentile(values, p):
+            return float(np.percentile(values, p)) if values else 0.0
+
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "pending": len(self._pending),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "largest_batch_size": self.max_batch_size_seen,
+            "p50_batch_size": percentile(self._recent_batch_sizes, 50),
+            "p50_wait_ms": percentile(self._recent_wait_ms, 50),
+            "p95_wait_ms": percentile(self._recent_wait_ms, 95),
+            "p50_run_ms": percentile(self._recent_run_ms, 50),
+            "p95_run_ms": percentile(self._recent_run_ms, 95)
+        }
@@ -0,0 +1,318 @@
+"""
+임베딩 사이드카 프로세스
+
+임베딩 모델(선택적으로 Chroma 벡터 인덱스까지)을 한 프로세스에서만 메모리에 올리고,
+여러 uvicorn 워커가 Unix 소켓으로 요청하도록 하는 로컬 모델 서버입니다.
+
+프로토콜 (리틀 엔디언):
+    프레임  = [op 또는 status: uint8][payload 길이: uint32][payload]
+    payload = [JSON 길이: uint32][JSON][float32 텐서 바이트]
+    벡터는 JSON이 아닌 float32 원본 바이트로 전송하고, JSON에는 텐서의 키와 shape만 기록합니다.
+
+실행 (backend 폴더에서):
+    python -m app.services.embedding_sidecar
+워커 설정:
+    EMBEDDING_BACKEND=sidecar
+"""
+import os
+import json
+import time
+import socket
+import struct
+import asyncio
+import threading
+import numpy as np
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+from .embedding_backend import EMBEDDING_BATCH_SIZE, create_embedding_model
+from .embedding_batcher import EmbeddingBatcher
+from .vector_snapshot import VECTORSTORE_BACKEND, SnapshotVectorStore
+
+# 환경 변수 로드
+load_dotenv()
+
+EMBEDDING_SIDECAR_SOCKET = os.getenv("EMBEDDING_SIDECAR_SOCKET", "/tmp/report_coach_embedding.sock")
+# 사이드카가 실제로 사용할 임베딩 백엔드 (torch / onnx)
+EMBEDDING_SIDECAR_BACKEND = os.getenv("EMBEDDING_SIDECAR_BACKEND", "torch").strip().strip("'\"").lower()
+# 사이드카가 Chroma 벡터 인덱스도 제공할지 여부
+EMBEDDING_SIDECAR_VECTORSTORE = os.getenv("EMBEDDING_SIDECAR_VECTORSTORE", "true").lower() == "true"
+EMBEDDING_SIDECAR_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_SIDECAR_TIMEOUT_SECONDS", "30"))
+EMBEDDING_SIDECAR_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+OP_EMBED = 1
+OP_CHROMA = 2
+OP_STATS = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+FRAME_HEADER = struct.Struct("<BI")
+JSON_LENGTH = struct.Struct("<I")
+
+# 사이드카를 통해 호출할 수 있는 Chroma 컬렉션 메서드 (읽기 전용)
+CHROMA_METHODS = {"query", "get", "count"}
+
+
+def get_sidecar_paths():
+    """search_service.get_paths()와 같은 기준의 Chroma / ONNX / 벡터 스냅샷 경로"""
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return {
+        "chroma_db": os.path.join(base_dir, os.getenv("CHROMA_DB_PATH", "datas/chroma_db")),
+        "onnx_model": os.path.join(base_dir, os.getenv("EMBEDDING_ONNX_PATH", "datas/onnx_model")),
+        "vector_snapshot": os.path.join(base_dir, os.getenv("VECTOR_SNAPSHOT_PATH", "datas/vector_snapshot"))
+    }
+
+
+def _json_default(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def pack_message(body: Dict[str, Any], tensor_key: str) -> bytes:
+    """body[tensor_key]는 float32 바이트로, 나머지는 JSON으로 직렬화"""
+    body = dict(body)
+    tensor = body.pop(tensor_key, None)
+    header = {"body": body, "tensor_key": tensor_key, "shape": None}
+    raw = b""
+    if tensor is not None:
+        array = np.ascontiguousarray(np.asarray(tensor, dtype="<f4"))
+        header["shape"] = list(array.shape)
+        raw = array.tobytes()
+    encoded = json.dumps(header, ensure_ascii=False, default=_json_default).encode("utf-8")
+    return JSON_LENGTH.pack(len(encoded)) + encoded + raw
+
+
+def unpack_message(payload: bytes) -> Dict[str, Any]:
+    """pack_message의 역변환 (텐서는 numpy 배열로 복원)"""
+    (json_length,) = JSON_LENGTH.unpack_from(payload, 0)
+    header = json.loads(payload[JSON_LENGTH.size:JSON_LENGTH.size + json_length].decode("utf-8"))
+    body = header["body"]
+    body[header["tensor_key"]] = None
+    if header["shape"] is not None:
+        tensor = np.frombuffer(payload, dtype="<f4", offset=JSON_LENGTH.size + json_length)
+        body[header["tensor_key"]] = tensor.reshape(header["shape"])
+    return body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("사이드카 연결이 끊어졌습니다.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+# ---------- 워커(클라이언트) 측 ----------
+
+class SidecarClient:
+    """스레드별로 Unix 소켓 연결을 유지하는 동기 클라이언트 (임베딩/Chroma 호출은 스레드에서 실행됨)"""
+
+    def __init__(self, socket_path: str = EMBEDDING_SIDECAR_SOCKET, timeout: float = EMBEDDING_SIDECAR_TIMEOUT_SECONDS):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def request(self, op: int, payload: bytes) -> bytes:
+        """요청 프레임을 보내고 응답 payload를 반환 (연결 오류 시 한 번 재연결)"""
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None)
+            try:
+                if sock is None:
+                    sock = self._connect()
+                sock.sendall(FRAME_HEADER.pack(op, len(payload)) + payload)
+                status, length = FRAME_HEADER.unpack(_recv_exact(sock, FRAME_HEADER.size))
+                body = _recv_exact(sock, length)
+            except OSError as e:
+                if sock is not None:
+                    sock.close()
+                self._local.sock = None
+                if attempt == 1:
+                    raise ConnectionError(f"임베딩 사이드카 연결 실패 ({self.socket_path}): {e}")
+                continue
+
+            self._local.sock = sock
+            if status != STATUS_OK:
+                raise RuntimeError(f"임베딩 사이드카 오류: {body.decode('utf-8', errors='replace')}")
+            return body
+
+    def stats(self) -> Dict[str, Any]:
+        return json.loads(self.request(OP_STATS, b"").decode("utf-8"))
+
+
+class SidecarEmbeddings(Embeddings):
+    """사이드카 프로세스의 임베딩 모델을 사용하는 Embeddings 구현"""
+
+    def __init__(self, client: SidecarClient):
+        self.client = client
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = unpack_message(self.client.request(OP_EMBED, pack_message({"texts": list(texts)}, "embeddings")))
+        return response["embeddings"].tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class SidecarCollection:
+    """사이드카의 Chroma 컬렉션 프록시 (query / get / count만 지원)"""
+
+    def __init__(self, client: SidecarClient, name: str):
+        self.client = client
+        self.name = name
+
+    def _call(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        kwargs = dict(kwargs)
+        body = {
+            "collection": self.name,
+            "method": method,
+            "kwargs": kwargs,
+            "query_embeddings": kwargs.pop("query_embeddings", None)
+        }
+        response = unpack_message(self.client.request(OP_CHROMA, pack_message(body, "query_embeddings")))
+        return response.get("result", response)
+
+    def query(self, **kwargs) -> Dict[str, Any]:
+        return self._call("query", kwargs)
+
+    def get(self, **kwargs) -> Dict[str, Any]:
+        return self._call("get", kwargs)
+
+    def count(self) -> int:
+        return self._call("count", {})
+
+
+class SidecarVectorStore:
+    """search_service가 사용하는 vectorstore._collection / vectorstore._client.get_collection 인터페이스 제공"""
+
+    def __init__(self, client: SidecarClient, collection_name: str):
+        self.client = client
+        self._collection = SidecarCollection(client, collection_name)
+        self._client = self
+
+    def get_collection(self, name: str) -> SidecarCollection:
+        return SidecarCollection(self.client, name)
+
+
+# ---------- 사이드카(서버) 측 ----------
+
+class SidecarServer:
+    """임베딩 모델과 Chroma 클라이언트를 소유하고 Unix 소켓 요청을 처리 (워커 간 요청도 마이크로 배치로 묶음)"""
+
+    def __init__(self, embedding_model, chroma_client=None):
+        self.batcher = EmbeddingBatcher(embedding_model.embed_documents, EMBEDDING_BATCH_SIZE, EMBEDDING_SIDECAR_BATCH_WAIT_MS)
+        self.chroma_client = chroma_client
+        self._collections = {}
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self.started_at = time.time()
+
+    def _collection(self, name: str):
+        if name not in self._collections:
+            self._collections[name] = self.chroma_client.get_collection(name=name)
+        return self._collections[name]
+
+    async def dispatch(self, op: int, payload: bytes) -> bytes:
+        if op == OP_EMBED:
+            texts = unpack_message(payload)["texts"]
+            vectors = await asyncio.gather(*[self.batcher.embed(text) for text in texts])
+            return pack_message({"embeddings": np.stack(vectors)}, "embeddings")
+
+        if op == OP_CHROMA:
+            if self.chroma_client is None:
+                raise RuntimeError("벡터 인덱스를 제공하지 않는 사이드카입니다. (EMBEDDING_SIDECAR_VECTORSTORE=false)")
+            request = unpack_message(payload)
+            if request["method"] not in CHROMA_METHODS:
+                raise ValueError(f"지원하지 않는 Chroma 메서드입니다: {request['method']}")
+
+            kwargs = request["kwargs"]
+            if request.get("query_embeddings") is not None:
+                kwargs["query_embeddings"] = request["query_embeddings"].tolist()
+            collection = self._collection(request["collection"])
+            result = await asyncio.to_thread(getattr(collection, request["method"]), **kwargs)
+            if request["method"] == "count":
+                return pack_message({"result": result}, "embeddings")
+            return pack_message(dict(result), "embeddings")
+
+        if op == OP_STATS:
+            return json.dumps(self.stats(), ensure_ascii=False).encode("utf-8")
+
+        raise ValueError(f"알 수 없는 요청 코드입니다: {op}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                op, length = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                payload = await reader.readexactly(length)
+                self.requests += 1
+                try:
+                    response, status = await self.dispatch(op, payload), STATUS_OK
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ 사이드카 요청 처리 오류: {e}")
+                    response, status = str(e).encode("utf-8"), STATUS_ERROR
+                writer.write(FRAME_HEADER.pack(status, len(response)) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "connections": self.connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "vectorstore": self.chroma_client is not None,
+            "batcher": self.batcher.stats()
+        }
+
+    async def serve(self, socket_path: str = EMBEDDING_SIDECAR_SOCKET):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(self.handle_connection, path=socket_path)
+        os.chmod(socket_path, 0o660)
+        print(f"✅ 임베딩 사이드카 실행 중: {socket_path}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(socket_path: Optional[str] = None):
+    paths = get_sidecar_paths()
+    print(f"🧠 사이드카 임베딩 모델 로딩 중: {EMBEDDING_SIDECAR_BACKEND}")
+    embedding_model = create_embedding_model(EMBEDDING_SIDECAR_BACKEND, onnx_dir=paths["onnx_model"])
+
+    chroma_client = None
+    if EMBEDDING_SIDECAR_VECTORSTORE and VECTORSTORE_BACKEND == "snapshot":
+        # 스냅샷도 get_collection(name=...)으로 컬렉션을 제공하므로 Chroma 클라이언트 대신 사용
+        chroma_client = SnapshotVectorStore(paths["vector_snapshot"], None)
+        print(f"✅ 벡터 스냅샷 로딩 완료: {paths['vector_snapshot']}")
+    elif EMBEDDING_SIDECAR_VECTORSTORE:
+        import chromadb
+
+        if not os.path.exists(paths["chroma_db"]):
+            raise ValueError(f"Chroma DB 디렉토리 '{paths['chroma_db']}'가 존재하지 않습니다.")
+        chroma_client = chromadb.PersistentClient(path=paths["chroma_db"])
+        print(f"✅ Chroma DB 로딩 완료: {paths['chroma_db']}")
+
+    asyncio.run(SidecarServer(embedding_model, chroma_client).serve(socket_path or EMBEDDING_SIDECAR_SOCKET))
+
+
+if __name__ == "__main__":
+    main()
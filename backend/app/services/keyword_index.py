@@ -0,0 +1,199 @@
+import os
+import json
+import math
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# BM25 파라미터
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# 인덱스 파일 구성 (모두 np.load(mmap_mode="r")로 열 수 있는 .npy 파일)
+INDEX_ARRAYS = ["vocab", "post_offsets", "post_docs", "post_tf", "pos_offsets", "positions", "doc_lengths"]
+
+
+def char_bigrams(text: str) -> List[Tuple[str, int]]:
+    """소문자 텍스트에서 공백을 포함하지 않는 문자 바이그램과 시작 위치를 추출 (한국어 형태 변화에 강함)"""
+    return [
+        (text[i:i + 2], i)
+        for i in range(len(text) - 1)
+        if not text[i].isspace() and not text[i + 1].isspace()
+    ]
+
+
+class KeywordIndex:
+    """청크 텍스트에 대한 문자 바이그램 역색인 (위치 정보 포함, CSR 배열 형태로 저장)
+
+    - 검색어(공백 없는 2자 이상)가 청크에 부분 문자열로 포함되는지를 위치 연결로 정확히 판별
+    - 바이그램 빈도와 문서 길이로 BM25 점수 계산
+    """
+
+    def __init__(self, doc_ids: List[str], arrays: Dict[str, np.ndarray]):
+        self.doc_ids = doc_ids
+        self.id_to_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self.vocab = {str(bigram): row for row, bigram in enumerate(arrays["vocab"])}
+        self.post_offsets = arrays["post_offsets"]
+        self.post_docs = arrays["post_docs"]
+        self.post_tf = arrays["post_tf"]
+        self.pos_offsets = arrays["pos_offsets"]
+        self.positions = arrays["positions"]
+        self.doc_lengths = arrays["doc_lengths"]
+        self.num_docs = len(doc_ids)
+        self.avg_doc_length = float(np.mean(self.doc_lengths)) if self.num_docs else 0.0
+
+    # ---------- 생성 / 저장 / 로드 ----------
+
+    @staticmethod
+    def build(doc_ids: List[str], texts: Iterable[str]) -> "KeywordIndex":
+        """청크 ID와 텍스트 목록으로 인덱스 생성"""
+        postings = defaultdict(dict)  # bigram -> {doc_index: [positions]}
+        doc_lengths = np.zeros(len(doc_ids), dtype=np.uint32)
+
+        for doc_index, text in enumerate(texts):
+            bigrams = char_bigrams(text.lower())
+            doc_lengths[doc_index] = len(bigrams)
+            for bigram, position in bigrams:
+                postings[bigram].setdefault(doc_index, []).append(position)
+
+        vocab = sorted(postings.keys())
+        post_offsets = [0]
+        post_docs, post_tf, pos_offsets, positions = [], [], [0], []
+        for bigram in vocab:
+            for doc_index in sorted(postings[bigram]):
+                doc_positions = postings[bigram][doc_index]
+                post_docs.append(doc_index)
+                post_tf.append(len(doc_positions))
+                positions.extend(doc_positions)
+                pos_offsets.append(len(positions))
+            post_offsets.append(len(post_docs))
+
+        arrays = {
+            "vocab": np.array(vocab, dtype="<U2"),
+            "post_offsets": np.array(post_offsets, dtype=np.int64),
+            "post_docs": np.array(post_docs, dtype=np.uint32),
+            "post_tf": np.array(post_tf, dtype=np.uint32),
+            "pos_offsets": np.array(pos_offsets, dtype=np.int64),
+            "positions": np.array(positions, dtype=np.uint32),
+            "doc_lengths": doc_lengths
+        }
+        return KeywordIndex(list(doc_ids), arrays)
+
+    def save(self, index_dir: str):
+        """인덱스를 .npy 파일들과 doc_ids.json으로 저장"""
+        os.makedirs(index_dir, exist_ok=True)
+        arrays = {
+            "vocab": np.array(sorted(self.vocab, key=self.vocab.get), dtype="<U2"),
+            "post_offsets": self.post_offsets,
+            "post_docs": self.post_docs,
+            "post_tf": self.post_tf,
+            "pos_offsets": self.pos_offsets,
+            "positions": self.positions,
+            "doc_lengths": self.doc_lengths
+        }
+        for name in INDEX_ARRAYS:
+            np.save(os.path.join(index_dir, f"{name}.npy"), arrays[name])
+        with open(os.path.join(index_dir, "doc_ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.doc_ids, f, ensure_ascii=False)
+
+    @staticmethod
+    def load(index_dir: str) -> Optional["KeywordIndex"]:
+        """저장된 인덱스를 mmap으로 로드 (없으면 None)"""
+        doc_ids_path = os.path.join(index_dir, "doc_ids.json")
+        if not os.path.exists(doc_ids_path):
+            return None
+        with open(doc_ids_path, "r", encoding="utf-8") as f:
+            doc_ids = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+            for name in INDEX_ARRAYS
+        }
+        return KeywordIndex(doc_ids, arrays)
+
+    # ---------- 조회 ----------
+
+    def _posting_range(self, bigram: str) -> Optional[Tuple[int, int]]:
+        row = self.vocab.get(bigram)
+        if row is None:
+            return None
+        return int(self.post_offsets[row]), int(self.post_offsets[row + 1])
+
+    def _start_keys(self, posting_range: Tuple[int, int], doc_indices: np.ndarray, offset: int) -> np.ndarray:
+        """doc_indices 문서들에서 바이그램 위치를 (문서 번호, 검색어 시작 위치) 키 배열로 변환"""
+        start, end = posting_range
+        selected = np.flatnonzero(np.isin(self.post_docs[start:end], doc_indices)) + start
+        if len(selected) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        pos_starts = np.asarray(self.pos_offsets[selected], dtype=np.int64)
+        lengths = np.asarray(self.pos_offsets[selected + 1], dtype=np.int64) - pos_starts
+        # 각 posting의 위치 구간을 한 번에 모으기 위한 인덱스 배열
+        gather = np.repeat(pos_starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(lengths.sum())
+        starts = np.asarray(self.positions[gather], dtype=np.int64) - offset
+        docs = np.repeat(np.asarray(self.post_docs[selected], dtype=np.int64), lengths)
+        valid = starts >= 0
+        return (docs[valid] << 32) | starts[valid]
+
+    def docs_containing(self, term: str, doc_indices: np.ndarray) -> np.ndarray:
+        """doc_indices 중 term을 부분 문자열로 포함하는 문서 여부 배열 (term은 공백 없는 2자 이상)"""
+        matched = np.zeros(len(doc_indices), dtype=bool)
+        bigrams = [term[i:i + 2] for i in range(len(term) - 1)]
+        ranges = [self._posting_range(bigram) for bigram in bigrams]
+        if not bigrams or any(r is None for r in ranges):
+            return matched
+
+        # 모든 바이그램이 등장하는 문서로 먼저 좁힘 (희소한 바이그램부터)
+        order = sorted(range(len(bigrams)), key=lambda j: ranges[j][1] - ranges[j][0])
+        remaining = np.asarray(doc_indices, dtype=np.uint32)
+        for j in order:
+            start, end = ranges[j]
+            remaining = remaining[np.isin(remaining, self.post_docs[start:end])]
+            if len(remaining) == 0:
+                return matched
+
+        # 위치가 연속으로 이어지는지 확인하여 정확한 부분 문자열 일치 판별
+        keys = self._start_keys(ranges[0], remaining, 0)
+        for offset in range(1, len(bigrams)):
+            if len(keys) == 0:
+                break
+            keys = np.intersect1d(keys, self._start_keys(ranges[offset], remaining, offset), assume_unique=True)
+
+        matched_docs = np.unique(keys >> 32)
+        return np.isin(np.asarray(doc_indices, dtype=np.int64), matched_docs)
+
+    def bm25_scores(self, query: str, doc_indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """쿼리 바이그램 기준 BM25 점수 (doc_indices가 없으면 전체 문서)"""
+        scores = np.zeros(self.num_docs, dtype=np.float64)
+        if self.num_docs == 0:
+            return scores if doc_indices is None else np.zeros(len(doc_indices), dtype=np.float64)
+
+        query_bigrams = {bigram for bigram, _ in char_bigrams(query.lower())}
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(self.doc_lengths, dtype=np.float64) / (self.avg_doc_length or 1.0))
+        for bigram in query_bigrams:
+            posting_range = self._posting_range(bigram)
+            if posting_range is None:
+                continue
+            start, end = posting_range
+            df = end - start
+            idf = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            docs = np.asarray(self.post_docs[start:end], dtype=np.int64)
+            tf = np.asarray(self.post_tf[start:end], dtype=np.float64)
+            scores[docs] += idf * tf * (BM25_K1 + 1) / (tf + length_norm[docs])
+
+        if doc_indices is None:
+            return scores
+        return scores[np.asarray(doc_indices, dtype=np.int64)]
+
+    def top_k(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """BM25 상위 k개 문서 번호와 점수 (점수 0인 문서 제외)"""
+        scores = self.bm25_scores(query)
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top]
+
+    def indices_for(self, doc_ids: List[str]) -> np.ndarray:
+        """청크 ID 목록을 인덱스 내 문서 번호로 변환 (없으면 -1)"""
+        return np.array([self.id_to_index.get(doc_id, -1) for doc_id in doc_ids], dtype=np.int64)
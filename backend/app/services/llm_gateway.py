@@ -0,0 +1,84 @@
+import os
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from google import genai
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+API_KEY = os.getenv("GOOGLE_API_KEY")
+if not API_KEY:
+    raise ValueError("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
+
+# 모든 서비스가 공유하는 Gemini 클라이언트
+client = genai.Client(api_key=API_KEY)
+
+# 동시 Gemini 호출 수 제한 및 호출별 타임아웃 (초)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+
+_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+_stats = {
+    "in_flight": 0,
+    "waiting": 0,
+    "completed": 0,
+    "failed": 0,
+    "timeouts": 0
+}
+
+
+class LLMGateway:
+    """이벤트 루프를 막지 않는 공용 Gemini 호출 창구 (비동기 클라이언트 + 동시성 제한 + 타임아웃)"""
+
+    @staticmethod
+    async def run(call: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """비동기 Gemini 호출을 동시성 제한과 타임아웃 안에서 실행"""
+        timeout = GEMINI_TIMEOUT_SECONDS if timeout is None else timeout
+
+        _stats["waiting"] += 1
+        try:
+            await _semaphore.acquire()
+        finally:
+            _stats["waiting"] -= 1
+
+        _stats["in_flight"] += 1
+        started_at = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call(), timeout=timeout)
+            _stats["completed"] += 1
+            return result
+        except asyncio.TimeoutError:
+            _stats["timeouts"] += 1
+            print(f"❌ Gemini 호출 타임아웃 ({timeout:.0f}초 초과)")
+            raise
+        except Exception:
+            _stats["failed"] += 1
+            raise
+        finally:
+            _stats["in_flight"] -= 1
+            _semaphore.release()
+            print(f"⏱️ Gemini 호출 소요 시간: {time.perf_counter() - started_at:.2f}초")
+
+    @staticmethod
+    async def generate_content(model: str, contents: Any, timeout: Optional[float] = None, **kwargs) -> Any:
+        """client.aio.models.generate_content의 비동기 래퍼"""
+        return await LLMGateway.run(
+            lambda: client.aio.models.generate_content(model=model, contents=contents, **kwargs),
+            timeout=timeout
+        )
+
+    @staticmethod
+    async def send_message(chat, message: Any, timeout: Optional[float] = None) -> Any:
+        """비동기 ChatSession 메시지 전송"""
+        return await LLMGateway.run(lambda: chat.send_message(message), timeout=timeout)
+
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """현재 Gemini 호출 상태 통계"""
+        return {
+            **_stats,
+            "max_concurrency": GEMINI_MAX_CONCURRENCY,
+            "timeout_seconds": GEMINI_TIMEOUT_SECONDS
+        }
@@ -0,0 +1,230 @@
+import re
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# 프롬프트(prompt_search.txt)의 분야 목록 - DB의 joined.field 값과 합쳐서 사용
+FIELD_NAMES = [
+    "원자", "화학", "지학", "동물", "지구과학", "동식물", "지구및환경", "환경", "생물", "특허", "산업및에너지",
+    "산업", "산업(농수)", "화공학", "물리", "식물", "산업(공업)", "공업", "물상", "농림수산"
+]
+
+# 명사 뒤에 붙는 조사 (긴 것부터 제거, 남는 부분이 2글자 이상일 때만)
+# 은/는으로 끝나는 토큰은 관형형 용언(줄이는, 작은)과 구분할 수 없어 SENTENCE_ENDINGS에서 처리
+PARTICLES = sorted(
+    ["에서", "으로", "에게", "부터", "까지", "처럼", "보다", "이나", "와", "과", "을", "를", "의", "에", "로"],
+    key=len, reverse=True
+)
+
+# 검색 의도를 바꾸지 않아 버리는 단어 (요약 쿼리에 넣지 않는 단어 포함)
+STOPWORDS = {
+    "보고서", "작품", "연구", "탐구", "관련", "주제", "자료", "논문", "검색", "추천", "찾기", "찾아줘", "알려줘",
+    "보여줘", "분야", "수상", "수상작", "년", "년도", "연도", "대회", "전람회"
+}
+
+# 문장형 질문 / 용언으로 보이는 어미와 의문사 - 있으면 의도 해석이 필요하므로 Gemini로 넘김
+SENTENCE_ENDINGS = (
+    "하다", "하는", "되는", "했", "하기", "하여", "해서", "하고", "하면", "줘", "주세요", "세요", "해요", "나요",
+    "까", "니", "죠", "습니다", "합니다", "인가", "는지", "은지", "이용한", "활용한", "통한", "대한", "관한",
+    "위한", "따른", "의한", "같은", "싶어", "는", "은", "한", "된", "할", "될"
+)
+QUESTION_WORDS = {"어떻게", "무엇", "뭐", "왜", "어떤", "언제", "어디", "누가", "무슨"}
+
+# 이름 뒤 호칭 → 지도교사 / 학생
+TEACHER_SUFFIXES = ("선생님", "지도교사", "교사")
+STUDENT_SUFFIXES = ("학생",)
+
+YEAR_PATTERN = re.compile(r"^((?:19|20)\d{2})(?:년도|년)?$")
+TOKEN_PATTERN = re.compile(r"[^\s,./?!~·]+")
+HANGUL_PATTERN = re.compile(r"^[가-힣()]+$")
+
+
+def split_names(value: Optional[str]) -> List[str]:
+    """DB의 저자 / 지도교사 문자열을 이름 목록으로 분리"""
+    return [name for name in re.split(r"[\s,/·]+", value or "") if 2 <= len(name) <= 4 and HANGUL_PATTERN.match(name)]
+
+
+class LocalQueryAnalyzer:
+    """연도, 수상명, 분야명, 저자/지도교사 이름 + 명사 키워드로만 이루어진 짧은 쿼리를 Gemini 없이 분석
+
+    - 모든 토큰을 해석할 수 있고(신뢰도 ≥ min_confidence) 키워드가 max_keywords개 이하일 때만 결과 반환
+    - 문장형 질문, 영어, 긴 쿼리 등은 None을 반환하여 Gemini 분석으로 넘김
+    """
+
+    def __init__(self, award_names: Iterable[str], field_names: Iterable[str], author_names: Set[str], teacher_names: Set[str],
+                 priority_sections: List[str], max_keywords: int = 3, min_confidence: float = 1.0):
+        # 긴 이름부터 비교 (최우수상 / 우수상)
+        self.award_names = sorted(set(award_names), key=len, reverse=True)
+        self.field_names = set(field_names)
+        self.author_names = author_names
+        self.teacher_names = teacher_names
+        self.priority_sections = priority_sections
+        self.max_keywords = max_keywords
+        self.min_confidence = min_confidence
+
+        self._lock = threading.Lock()
+        self.fast_path = 0
+        self.escalated = 0
+        self.total_ms = 0.0
+
+    @classmethod
+    def load(cls, db_path: str, award_names: Iterable[str], priority_sections: List[str], **kwargs) -> "LocalQueryAnalyzer":
+        """science_reports.db의 joined 테이블에서 분야명, 저자, 지도교사 이름을 읽어 생성 (DB가 없으면 이름 없이 생성)"""
+        field_names, author_names, teacher_names = set(FIELD_NAMES), set(), set()
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                for field, authors, teacher in conn.execute("SELECT field, authors, teacher FROM joined"):
+                    if field and str(field).strip():
+                        field_names.add(str(field).strip())
+                    author_names.update(split_names(authors))
+                    teacher_names.update(split_names(teacher))
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"⚠️ 로컬 쿼리 분석기: 이름 목록을 불러오지 못했습니다 ({db_path}): {e}")
+        return cls(award_names, field_names, author_names, teacher_names, priority_sections, **kwargs)
+
+    @staticmethod
+    def strip_particle(token: str) -> str:
+        for particle in PARTICLES:
+            if token.endswith(particle) and len(token) - len(particle) >= 2:
+                return token[:-len(particle)]
+        return token
+
+    def match_person(self, token: str, next_token: str = "", bare_names: bool = False) -> Optional[Tuple[str, str]]:
+        """이름 토큰이면 (메타데이터 키, 이름) 반환
+
+        호칭이 붙었거나("김민수학생") 다음 토큰이 호칭일 때("김민수 학생")만 이름으로 인정
+        (호칭 없는 이름은 같은 철자의 일반 명사일 수 있음 - bare_names면 허용하고 양쪽 목록에 모두 있으면 저자로 판단)
+        """
+        for suffixes, key in ((TEACHER_SUFFIXES, "teacher"), (STUDENT_SUFFIXES, "authors")):
+            for suffix in suffixes:
+                if token.endswith(suffix) and len(token) > len(suffix):
+                    name = token[:-len(suffix)]
+                    names = self.teacher_names if key == "teacher" else self.author_names
+                    return (key, name) if name in names else None
+        if next_token in TEACHER_SUFFIXES and token in self.teacher_names:
+            return "teacher", token
+        if next_token in STUDENT_SUFFIXES and token in self.author_names:
+            return "authors", token
+        if not bare_names:
+            return None
+        if token in self.author_names:
+            return "authors", token
+        if token in self.teacher_names:
+            return "teacher", token
+        return None
+
+    def match_award(self, token: str) -> Optional[str]:
+        for award in self.award_names:
+            if token == award or token == f"{award}작":
+                return award
+        return None
+
+    def analyze(self, query: str) -> Tuple[Optional[Tuple[str, List[str], List[str], Dict[str, str]]], float]:
+        """(요약 쿼리, 우선순위 섹션, 키워드, 메타데이터 필터)와 신뢰도 반환 (신뢰도가 낮으면 분석 결과는 None)"""
+        started_at = time.perf_counter()
+        analysis, confidence = self._analyze(query)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        with self._lock:
+            self.total_ms += elapsed_ms
+            if analysis is not None:
+                self.fast_path += 1
+            else:
+                self.escalated += 1
+        return analysis, confidence
+
+    def _analyze(self, query: str) -> Tuple[Optional[Tuple[str, List[str], List[str], Dict[str, str]]], float]:
+        tokens = TOKEN_PATTERN.findall(query.lower())
+        if not tokens or "?" in query:
+            return None, 0.0
+
+        metadata_filters = {}
+        keywords = []
+        field_terms = []  # "분야" 없이 쓰인 분야명 (식물, 화학 등은 주제어로도 쓰이므로 다른 키워드가 있으면 키워드로 취급)
+        recognized = 0
+        stripped_tokens = [self.strip_particle(raw_token) for raw_token in tokens] + [""]
+        for i, raw_token in enumerate(tokens):
+            if raw_token in QUESTION_WORDS or raw_token.endswith(SENTENCE_ENDINGS):
+                continue
+
+            year_match = YEAR_PATTERN.match(raw_token)
+            if year_match:
+                metadata_filters.setdefault("year", year_match.group(1))
+                recognized += 1
+                continue
+
+            token = stripped_tokens[i]
+            award = self.match_award(token)
+            person = self.match_person(token, stripped_tokens[i + 1])
+            if award is not None:
+                metadata_filters.setdefault("award", award)
+            elif token.endswith("분야") and token[:-2] in self.field_names:
+                metadata_filters.setdefault("field", token[:-2])
+            elif token in self.field_names:
+                field_terms.append(token)
+                if token not in keywords:
+                    keywords.append(token)
+            elif person is not None:
+                metadata_filters.setdefault(person[0], person[1])
+            elif token in self.author_names or token in self.teacher_names:
+                # 호칭 없는 이름은 일반 명사("나무", "하늘")와 구분할 수 없으므로 해석하지 못한 토큰으로 처리 (Gemini로 넘김)
+                continue
+            elif token in STOPWORDS or token in TEACHER_SUFFIXES or token in STUDENT_SUFFIXES:
+                pass
+            elif HANGUL_PATTERN.match(token) and len(token) >= 2:
+                if token not in keywords:
+                    keywords.append(token)
+            else:
+                # 영어, 숫자, 한 글자 등은 번역/해석이 필요하므로 해석하지 못한 토큰으로 처리
+                continue
+            recognized += 1
+
+        # 분야명 외에 키워드가 없으면 분야명은 메타데이터 조건 (예: "2023 화학 대통령상")
+        if field_terms and len(keywords) == len(field_terms):
+            metadata_filters.setdefault("field", field_terms[0])
+            keywords = [keyword for keyword in keywords if keyword != metadata_filters["field"]]
+
+        confidence = recognized / len(tokens)
+        if len(keywords) > self.max_keywords:
+            confidence = 0.0
+
+        # 메타데이터만 있는 쿼리는 분야명을 요약 쿼리로 사용 (분야도 없으면 검색할 내용이 없으므로 Gemini로 넘김)
+        summary_query = " ".join(keywords) or metadata_filters.get("field", "")
+        if not summary_query or confidence < self.min_confidence:
+            return None, confidence
+        return (summary_query, list(self.priority_sections), keywords, metadata_filters), confidence
+
+    def metadata_terms(self, query: str) -> Tuple[str, ...]:
+        """쿼리에 들어 있는 메타데이터 값(수상, 분야, 저자/지도교사)과 숫자(연도 등) - 의미 캐시 적중 조건용
+
+        "2024 물리 특상"과 "2024 화학 특상"처럼 임베딩은 거의 같아도 검색 조건이 다른 쿼리를 구분
+        """
+        terms = {f"num:{number}" for number in re.findall(r"\d+", query)}
+        for raw_token in TOKEN_PATTERN.findall(query.lower()):
+            token = self.strip_particle(raw_token)
+            award = self.match_award(token)
+            person = self.match_person(token, bare_names=True)  # 캐시 적중 조건은 넓게 잡아도 적중률만 약간 낮아짐
+            if award is not None:
+                terms.add(f"award:{award}")
+            elif token.endswith("분야") and token[:-2] in self.field_names:
+                terms.add(f"field:{token[:-2]}")
+            elif token in self.field_names:
+                terms.add(f"field:{token}")
+            elif person is not None:
+                terms.add(f"{person[0]}:{person[1]}")
+        return tuple(sorted(terms))
+
+    def stats(self) -> Dict[str, Any]:
+        """로컬 분석(빠른 경로) / Gemini 위임 횟수와 평균 처리 시간"""
+        total = self.fast_path + self.escalated
+        return {
+            "fast_path": self.fast_path,
+            "escalated": self.escalated,
+            "fast_path_rate": self.fast_path / total if total else 0.0,
+            "avg_ms": self.total_ms / total if total else 0.0,
+            "names": len(self.author_names | self.teacher_names),
+            "fields": len(self.field_names)
+        }
@@ -0,0 +1,221 @@
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+from .chunk_features import ChunkFeatures
+
+# 유사도 계산 시 분모 안정화 값 (cosine_similarity_numpy와 동일)
+EPSILON = 1e-8
+
+# 메타데이터 조건 부스터에 사용하는 필드
+METADATA_KEYS = ["field", "year", "award", "authors", "teacher"]
+
+
+def build_candidate_features(documents, award_weights: Dict[str, float], chunk_ids: Optional[List[str]] = None, keyword_index=None,
+                             chunk_features: Optional[ChunkFeatures] = None) -> Dict[str, Any]:
+    """후보 문서별로 쿼리와 무관한 특징(섹션, 제목, 수상, 메타데이터 번호)을 준비
+
+    chunk_features(색인 시 미리 계산한 특징 테이블)에 모든 후보가 있으면 번호 배열만 조회하고,
+    없으면 후보 문서 메타데이터로 같은 형태의 테이블을 즉석에서 생성
+    keyword_index에 포함된 청크는 본문 검색어 매칭을 역색인으로 처리하므로 본문을 소문자로 바꾸지 않음
+    """
+    codes = None
+    if chunk_features is not None and chunk_ids is not None:
+        codes = chunk_features.codes_for(chunk_ids)
+    if codes is None:
+        chunk_features = ChunkFeatures.build(
+            chunk_ids if chunk_ids is not None else [str(i) for i in range(len(documents))],
+            (doc.metadata for doc in documents)
+        )
+        codes = {key: np.asarray(values, dtype=np.intp) for key, values in chunk_features.codes.items()}
+
+    if keyword_index is not None and chunk_ids is not None:
+        index_positions = keyword_index.indices_for(chunk_ids)
+    else:
+        index_positions = np.full(len(documents), -1, dtype=np.int64)
+
+    # 수상도 부스터는 기존 rerank_with_weights와 같이 원본 수상 값으로 조회 (특징 테이블의 수상 값은 앞뒤 공백이 제거되어 있음)
+    award_boost = np.array([award_weights.get(doc.metadata.get("award", ""), 0.0) for doc in documents], dtype=np.float64)
+    return {
+        "codes": codes,
+        "vocab": chunk_features.vocab,
+        "value_to_code": chunk_features.value_to_code,
+        # 같은 보고서의 청크는 제목이 같으므로 제목 검색어 매칭은 고유 제목 단위로 계산
+        "title_unique": np.unique(codes["title"], return_inverse=True),
+        "text_lower": [
+            doc.page_content.lower() if index_positions[i] < 0 else None
+            for i, doc in enumerate(documents)
+        ],
+        "index_positions": index_positions,
+        "keyword_index": keyword_index,
+        "has_title": chunk_features.title_present[codes["title"]],
+        "award_boost": award_boost,
+        "documents": documents
+    }
+
+
+def to_matrix(vectors, dim: Optional[int] = None) -> np.ndarray:
+    """벡터 목록을 float64 행렬로 변환 (None은 0 벡터로 채움)"""
+    if dim is None:
+        dim = next((len(v) for v in vectors if v is not None), 0)
+    matrix = np.zeros((len(vectors), dim), dtype=np.float64)
+    for i, vector in enumerate(vectors):
+        if vector is not None:
+            matrix[i] = vector
+    return matrix
+
+
+def cosine_scores(matrix: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+    """행렬의 모든 행과 쿼리 벡터의 cosine similarity를 한 번의 행렬-벡터 곱으로 계산"""
+    if matrix.shape[0] == 0:
+        return np.zeros(0, dtype=np.float64)
+    if np.all(np.abs(query_vector) <= EPSILON):
+        return np.zeros(matrix.shape[0], dtype=np.float64)
+
+    norms = np.linalg.norm(matrix, axis=1)
+    scores = (matrix @ query_vector) / (norms * np.linalg.norm(query_vector) + EPSILON)
+    scores = np.clip(scores, -1.0, 1.0)
+    # np.allclose(vec, 0)과 동일한 0 벡터 처리
+    scores[np.all(np.abs(matrix) <= EPSILON, axis=1)] = 0.0
+    return scores
+
+
+def term_matches(term: str, features: Dict[str, Any]) -> np.ndarray:
+    """후보별로 검색어가 본문 또는 제목에 포함되는지 여부 배열"""
+    title_vocab = features["vocab"]["title"]
+    unique_titles, title_inverse = features["title_unique"]
+    matched = np.array([term in title_vocab[code] for code in unique_titles], dtype=bool)[title_inverse.reshape(-1)]
+
+    index_positions = features["index_positions"]
+    indexed = index_positions >= 0
+    if len(term) < 2:
+        # 역색인은 2자 이상 검색어만 지원하므로 본문 문자열 검색으로 처리
+        for i in np.flatnonzero(indexed):
+            matched[i] |= term in features["documents"][i].page_content.lower()
+    elif indexed.any():
+        matched[indexed] |= features["keyword_index"].docs_containing(term, index_positions[indexed])
+
+    for i, text in enumerate(features["text_lower"]):
+        if text is not None and not matched[i]:
+            matched[i] = term in text
+    return matched
+
+
+def count_matches(terms: List[str], features: Dict[str, Any]) -> np.ndarray:
+    """후보별로 포함된 검색어 개수를 계산"""
+    counts = np.zeros(len(features["documents"]), dtype=np.int64)
+    for term in terms:
+        counts += term_matches(term, features)
+    return counts
+
+
+def section_boost_scores(section_codes: np.ndarray, section_vocab: List[str], priority_sections: List[str], section_weights: Dict[int, float]) -> np.ndarray:
+    """우선순위 섹션 순위에 따른 섹션 부스터 점수 배열 (섹션 사전 단위로 계산 후 번호로 조회)"""
+    boost_by_section = {}
+    for priority_index, section in enumerate(priority_sections):
+        boost_by_section.setdefault(section, section_weights.get(priority_index, 0.0))
+    boost_by_code = np.array([boost_by_section.get(section, 0.0) for section in section_vocab], dtype=np.float64)
+    return boost_by_code[section_codes]
+
+
+def metadata_boost_scores(features: Dict[str, Any], metadata_filters: Optional[Dict[str, str]], metadata_weight_table: Dict[str, float]) -> np.ndarray:
+    """메타데이터 조건과 일치하는 필드별 가중치 합 배열"""
+    n = len(features["documents"])
+    boost = np.zeros(n, dtype=np.float64)
+    if not metadata_filters:
+        return boost
+
+    for key, val in metadata_filters.items():
+        if key in METADATA_KEYS:
+            code = features["value_to_code"][key].get(val)
+            if code is None:
+                continue
+            matched = features["codes"][key] == code
+        else:
+            matched = np.array([str(doc.metadata.get(key, '')).strip() == val for doc in features["documents"]], dtype=bool)
+        boost[matched] += metadata_weight_table.get(key, 0.05)
+    return boost
+
+
+def score_candidates(
+    query_embedding,
+    doc_matrix: np.ndarray,
+    title_matrix: np.ndarray,
+    features: Dict[str, Any],
+    priority_sections: List[str],
+    simplified_query: str,
+    original_query: str,
+    keyword_match_terms: List[str],
+    weight_config: Dict[str, Any],
+    metadata_filters: Optional[Dict[str, str]] = None,
+    content_scores: Optional[List[float]] = None
+) -> Dict[str, np.ndarray]:
+    """전체 후보의 점수 구성 요소를 배열로 한 번에 계산 (content_scores가 주어지면 본문 유사도 대신 사용)"""
+    alpha = weight_config["alpha"]
+    gamma = weight_config["gamma"]
+
+    query_vector = np.asarray(query_embedding, dtype=np.float64)
+    if content_scores is None:
+        content_scores = cosine_scores(doc_matrix, query_vector)
+    else:
+        content_scores = np.asarray(content_scores, dtype=np.float64)
+    title_scores = np.where(features["has_title"], cosine_scores(title_matrix, query_vector), 0.0)
+
+    simplified_terms = [t.lower() for t in simplified_query.split() if len(t) > 1]
+    original_terms = [t.lower() for t in original_query.split() if len(t) > 1]
+
+    simplified_matches = count_matches(simplified_terms, features)
+    original_matches = count_matches(original_terms, features)
+    keyword_matches = count_matches(keyword_match_terms, features)
+    matched_terms = simplified_matches + original_matches + keyword_matches
+
+    section_boost = section_boost_scores(features["codes"]["section"], features["vocab"]["section"], priority_sections, weight_config["section_weights"])
+    keyword_boost = gamma * matched_terms
+    award_boost = features["award_boost"]
+    metadata_boost = metadata_boost_scores(features, metadata_filters, weight_config["metadata_weights"])
+
+    total_scores = (
+        (content_scores + alpha * title_scores)
+        + section_boost
+        + keyword_boost
+        + award_boost
+        + metadata_boost
+    )
+
+    return {
+        "content_score": content_scores,
+        "title_score": title_scores,
+        "section_boost_score": section_boost,
+        "keyword_boost_score": keyword_boost,
+        "award_boost_score": award_boost,
+        "metadata_boost": metadata_boost,
+        "matched_terms": matched_terms,
+        "simplified_matches": simplified_matches,
+        "original_matches": original_matches,
+        "total_score": total_scores
+    }
+
+
+def build_score_info(components: Dict[str, np.ndarray], index: int, alpha: float) -> Dict[str, Any]:
+    """배열 점수에서 기존 score_info 형식의 딕셔너리를 생성"""
+    content_score = float(components["content_score"][index])
+    title_score = float(components["title_score"][index])
+    section_boost_score = float(components["section_boost_score"][index])
+    keyword_boost_score = float(components["keyword_boost_score"][index])
+    award_boost_score = float(components["award_boost_score"][index])
+    metadata_boost = float(components["metadata_boost"][index])
+    total_score = float(components["total_score"][index])
+
+    return {
+        'content_score': content_score,
+        'title_score': title_score,
+        'alpha': alpha,
+        'section_boost_score': section_boost_score,
+        'keyword_boost_score': keyword_boost_score,
+        'award_boost_score': award_boost_score,
+        'metadata_boost': metadata_boost,
+        'matched_terms': int(components["matched_terms"][index]),
+        'simplified_matches': int(components["simplified_matches"][index]),
+        'original_matches': int(components["original_matches"][index]),
+        'total_score': total_score,
+        'calculation': f"({content_score:.4f} + {alpha} × {title_score:.4f}) + {section_boost_score:.4f} + {keyword_boost_score:.4f} + {award_boost_score:.4f} + {metadata_boost:.4f} = {total_score:.4f}"
+    }
@@ -0,0 +1,68 @@
+import secrets
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import LRUCache
+
+
+class SearchPageCache:
+    """사용자별 최근 검색 결과를 보관하여 커서로 다음 페이지를 반환하는 캐시
+
+    - 항목 하나 = 검색 요청 하나 (배치 검색은 쿼리 수와 관계없이 항목 하나에 쿼리 순서대로 보관)
+    - 커서 형식: "{검색 ID}.{배치 내 위치}.{다음 결과 위치}"
+    - formatter(결과 목록, 시작 위치)가 주어지면 보관된 결과는 요청된 페이지만 응답 형식으로 변환
+    """
+
+    def __init__(self, max_users: int = 1000, per_user: int = 5, ttl_seconds: Optional[float] = None,
+                 formatter: Optional[Callable[[List[Any], int], List[Dict[str, Any]]]] = None):
+        self.per_user = per_user
+        self.ttl_seconds = ttl_seconds
+        self.formatter = formatter
+        self._users = LRUCache(max_users, ttl_seconds=ttl_seconds)  # key: user_id, value: LRUCache(key: 검색 ID, value: 쿼리별 응답 정보 + 전체 결과 목록)
+
+    def save(self, user_id: Optional[str], pages: List[Tuple[Dict[str, Any], List[Any], int]]) -> List[Optional[str]]:
+        """(응답 정보, 전체 결과, 첫 페이지 이후 위치) 목록을 한 항목으로 보관하고 쿼리별 다음 페이지 커서 반환
+
+        남은 결과가 없는 쿼리의 커서는 None (모든 쿼리에 남은 결과가 없으면 보관하지 않음)
+        """
+        if self.per_user <= 0 or all(offset >= len(results) for _, results, offset in pages):
+            return [None] * len(pages)
+
+        user_key = str(user_id)
+        user_pages = self._users.get(user_key)
+        if user_pages is None:
+            user_pages = LRUCache(self.per_user, ttl_seconds=self.ttl_seconds)
+        # 사용자 항목의 만료 시각을 매 저장마다 갱신 (첫 검색 시각 기준으로 이후 커서까지 만료되지 않도록)
+        self._users.set(user_key, user_pages)
+
+        search_id = secrets.token_urlsafe(12)
+        user_pages.set(search_id, [{**response_data, "results": results} for response_data, results, _ in pages])
+        return [
+            f"{search_id}.{position}.{offset}" if offset < len(results) else None
+            for position, (_, results, offset) in enumerate(pages)
+        ]
+
+    def get(self, cursor: str, k: int, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """커서 위치부터 k개 결과와 다음 커서 반환 (만료되었거나 잘못된 커서면 None)"""
+        search_id, position, offset = (cursor.split(".") + ["", ""])[:3]
+        if not search_id or not position.isdigit() or not offset.isdigit():
+            return None
+        user_pages = self._users.get(str(user_id))
+        cached = user_pages.get(search_id) if user_pages is not None else None
+        position, offset = int(position), int(offset)
+        if cached is None or position >= len(cached):
+            return None
+
+        cached = cached[position]
+        page = cached["results"][offset:offset + k]
+        next_offset = offset + len(page)
+        return {
+            **cached,
+            "results": self.formatter(page, offset) if self.formatter is not None else page,
+            "offset": offset,
+            "total_cached": len(cached["results"]),
+            "next_cursor": f"{search_id}.{position}.{next_offset}" if page and next_offset < len(cached["results"]) else None
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """검색 결과 페이지 캐시 통계 (사용자 수 기준)"""
+        return self._users.stats()
@@ -1,17 +1,35 @@
 import os
 import sys
+import time
+import asyncio
+import threading
 import warnings
-import torch
-from google import genai
+import chromadb
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from dotenv import load_dotenv
 import numpy as np
 import re
+import unicodedata
+import hashlib
+import secrets
 from typing import List, Dict, Any, Optional, Tuple
 from fastapi import HTTPException
 from langchain_core.prompts import PromptTemplate
+from langchain_core.documents import Document
 from .logger_service import LoggerService
+from .llm_gateway import LLMGateway
+from .cache import LRUCache, SingleFlight
+from .semantic_cache import SemanticCache
+from .search_pages import SearchPageCache
+from .local_query_analyzer import LocalQueryAnalyzer
+from .keyword_index import KeywordIndex
+from .chunk_features import ChunkFeatures
+from .embedding_backend import EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, create_embedding_model
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_sidecar import EMBEDDING_SIDECAR_VECTORSTORE, SidecarVectorStore
+from .vector_snapshot import VECTORSTORE_BACKEND, SnapshotVectorStore
+from .vector_partitions import PartitionedVectorStore, load_partition_manifest
+from .rerank_engine import build_candidate_features, to_matrix, cosine_scores, score_candidates, build_score_info
 
 # 경고 메시지 억제
 warnings.filterwarnings('ignore', category=RuntimeWarning, module='sklearn')
@@ -50,19 +68,56 @@ def get_weight_config():
 # 전역 가중치 설정 변수
 WEIGHT_CONFIG = get_weight_config()
 
-# Gemini API 설정
-API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    raise ValueError("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
-client = genai.Client(api_key=API_KEY)
+# 추측 검색: 쿼리 분석과 동시에 원본 쿼리로 벡터 검색을 시작 (요약 쿼리와 충분히 가까우면 결과 재사용)
+SEARCH_SPECULATIVE = os.getenv("SEARCH_SPECULATIVE", "true").lower() == "true"
+SEARCH_SPECULATIVE_REUSE_THRESHOLD = float(os.getenv("SEARCH_SPECULATIVE_REUSE_THRESHOLD", "0.92"))
 
-# 임베딩 모델 및 Chroma DB 설정
-EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-large")
+# 하이브리드 검색: BM25 어휘 검색 결과를 벡터 검색 결과와 RRF(Reciprocal Rank Fusion)로 결합
+SEARCH_HYBRID = os.getenv("SEARCH_HYBRID", "true").lower() == "true"
+SEARCH_LEXICAL_K = int(os.getenv("SEARCH_LEXICAL_K", "20"))
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
 
-# 디바이스 설정
-EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
+# 메타데이터 조건이 있는 검색은 조건에 맞는 청크만 검색하므로 후보 수를 줄임 (k의 배수)
+SEARCH_FILTERED_K_MULTIPLIER = int(os.getenv("SEARCH_FILTERED_K_MULTIPLIER", "3"))
 
-EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# 보고서(nttSn) 단위 집계 방식 ("max": 최고 청크 점수, "top2": 상위 2개 청크 평균)
+SEARCH_REPORT_POOLING = os.getenv("SEARCH_REPORT_POOLING", "max").lower()
+# 고유 보고서가 k개 미만일 때 후보 수를 2배씩 늘려 재검색하는 최대 한도 (k의 배수)
+SEARCH_MAX_FETCH_MULTIPLIER = int(os.getenv("SEARCH_MAX_FETCH_MULTIPLIER", "20"))
+
+# 검색 방식 ("chunk": 전체 청크 검색, "two_stage": 보고서 요약 벡터로 상위 보고서를 고른 뒤 해당 보고서의 청크만 검색)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "chunk").lower()
+# 2단계 검색 시 1단계에서 고를 보고서 수 (k의 배수)
+SEARCH_TWO_STAGE_REPORT_MULTIPLIER = int(os.getenv("SEARCH_TWO_STAGE_REPORT_MULTIPLIER", "3"))
+
+# 검색 결과 페이지 커서: 재정렬된 전체 결과를 사용자별로 보관하여 다음 페이지는 캐시에서 바로 반환
+SEARCH_PAGE_CACHE_USERS = int(os.getenv("SEARCH_PAGE_CACHE_USERS", "1000"))        # 보관할 최대 사용자 수
+SEARCH_PAGE_CACHE_PER_USER = int(os.getenv("SEARCH_PAGE_CACHE_PER_USER", "5"))     # 사용자별 보관할 최근 검색 수
+SEARCH_PAGE_CACHE_TTL = float(os.getenv("SEARCH_PAGE_CACHE_TTL", "900"))
+SEARCH_PAGE_MAX_RESULTS = int(os.getenv("SEARCH_PAGE_MAX_RESULTS", "100"))         # 검색 1회당 보관할 최대 결과 수 (응답 변환은 페이지 요청 시에만)
+
+# 배치 검색 (/search/batch) 요청 1회당 최대 쿼리 수
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "20"))
+
+# 의미 기반 검색 캐시: 원본 쿼리 임베딩이 이전 쿼리와 충분히 가까우면 분석/검색 없이 이전 결과 반환
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "true").lower() == "true"
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+
+# 로컬 규칙 기반 쿼리 분석: 연도/수상/분야/이름 + 명사 몇 개로 된 짧은 쿼리는 Gemini 없이 분석 (신뢰도가 낮으면 Gemini 사용)
+# 분석기의 분야/이름 목록은 의미 캐시 적중 조건에도 쓰이므로 SEMANTIC_CACHE가 켜져 있으면 이 값과 관계없이 로드
+LOCAL_QUERY_ANALYZER = os.getenv("LOCAL_QUERY_ANALYZER", "true").lower() == "true"
+LOCAL_ANALYZER_MAX_KEYWORDS = int(os.getenv("LOCAL_ANALYZER_MAX_KEYWORDS", "3"))
+LOCAL_ANALYZER_MIN_CONFIDENCE = float(os.getenv("LOCAL_ANALYZER_MIN_CONFIDENCE", "1.0"))
+LOCAL_ANALYZER_SECTIONS = [s.strip() for s in os.getenv("LOCAL_ANALYZER_SECTIONS", "서론>연구 결과>결론 및 고찰").split(">") if s.strip()]
+
+# 요약 쿼리 임베딩 캐시 크기 (동일한 요약 쿼리가 반복되는 경우 재임베딩 방지)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+# 동시 쿼리 임베딩 마이크로 배치 (최대 EMBEDDING_BATCH_SIZE개, EMBEDDING_BATCH_WAIT_MS 동안 모음)
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "true").lower() == "true"
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
 
 # 경로 설정 (환경변수에서 읽어오기)
 def get_paths():
@@ -75,13 +130,22 @@ def get_paths():
         "pdf_reports": os.path.join(base_dir, os.getenv("PDF_REPORTS_PATH", "datas/pdf_reports")),
         "json_results": os.path.join(base_dir, os.getenv("JSON_RESULTS_PATH", "datas/json_results")),
         "science_reports_db": os.path.join(base_dir, os.getenv("SCIENCE_REPORTS_DB_PATH", "datas/science_reports.db")),
-        "prompts": os.path.join(base_dir, os.getenv("PROMPTS_PATH", "prompts"))
+        "prompts": os.path.join(base_dir, os.getenv("PROMPTS_PATH", "prompts")),
+        "keyword_index": os.path.join(base_dir, os.getenv("KEYWORD_INDEX_PATH", "datas/keyword_index")),
+        "chunk_features": os.path.join(base_dir, os.getenv("CHUNK_FEATURES_PATH", "datas/chunk_features")),
+        "onnx_model": os.path.join(base_dir, os.getenv("EMBEDDING_ONNX_PATH", "datas/onnx_model")),
+        "vector_snapshot": os.path.join(base_dir, os.getenv("VECTOR_SNAPSHOT_PATH", "datas/vector_snapshot"))
     }
 
 # 전역 경로 설정
 PATHS = get_paths()
 CHROMA_DIR = PATHS["chroma_db"]
 
+# Chroma 컬렉션 이름 (build_chromadb.py와 동일해야 함)
+CHUNK_COLLECTION_NAME = "my_report_collection"
+TITLE_COLLECTION_NAME = "my_report_title_collection"
+SUMMARY_COLLECTION_NAME = "my_report_summary_collection"
+
 # 프롬프트 템플릿 로드
 try:
     prompt_path = os.path.join(PATHS["prompts"], "prompt_search.txt")
@@ -92,9 +156,61 @@ except FileNotFoundError:
 
 QUERY_ANALYSIS_PROMPT = PromptTemplate.from_template(QUERY_ANALYSIS_PROMPT_TEMPLATE)
 
+# 쿼리 분석 캐시 설정 (프롬프트나 모델이 바뀌면 캐시 키가 달라지도록 버전에 포함)
+QUERY_ANALYSIS_PROMPT_VERSION = os.getenv(
+    "QUERY_ANALYSIS_PROMPT_VERSION",
+    hashlib.sha1((os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest") + QUERY_ANALYSIS_PROMPT_TEMPLATE).encode("utf-8")).hexdigest()[:12]
+)
+QUERY_ANALYSIS_CACHE_SIZE = int(os.getenv("QUERY_ANALYSIS_CACHE_SIZE", "1024"))
+QUERY_ANALYSIS_CACHE_TTL = float(os.getenv("QUERY_ANALYSIS_CACHE_TTL", "3600"))
+
+# 캐시 적중 또는 중복 호출 공유 시 기록할 사용량 (토큰 0)
+CACHED_USAGE_METADATA = {
+    'total_token_count': 0,
+    'prompt_token_count': 0,
+    'candidates_token_count': 0,
+    'cache_hit': True
+}
+
+# 로컬 분석기로 처리한 검색의 사용량 로그 service_name (Gemini 호출 없이 토큰 0으로 기록, 검색 기록에 포함)
+LOCAL_ANALYZER_SERVICE_NAME = "query_summary_local"
+
+# 로컬 분석기로 처리했을 때 기록할 사용량 (Gemini 호출 없음)
+LOCAL_ANALYZER_USAGE_METADATA = {
+    'total_token_count': 0,
+    'prompt_token_count': 0,
+    'candidates_token_count': 0,
+    'local_analyzer': True
+}
+
 # 전역 변수
 _embedding_model = None
 _vectorstore = None
+_title_vectors = None  # key: nttSn(str), value: (title, 제목 벡터)
+_keyword_index = None  # 청크 텍스트 바이그램 역색인 (build_chromadb.py가 생성)
+_chunk_features = None  # 청크별 재정렬 특징 번호 테이블 (build_chromadb.py가 생성)
+_summary_collection = None  # 보고서(nttSn)당 요약 벡터 1개 컬렉션 (SEARCH_MODE=two_stage일 때만 로드)
+_embedding_batcher = None
+_query_embedding_cache = LRUCache(QUERY_EMBEDDING_CACHE_SIZE)  # key: 정규화된 쿼리, value: 쿼리 벡터
+_query_analysis_cache = LRUCache(QUERY_ANALYSIS_CACHE_SIZE, ttl_seconds=QUERY_ANALYSIS_CACHE_TTL)  # key: (정규화된 쿼리, 프롬프트 버전)
+_query_analysis_flight = SingleFlight()
+_local_query_analyzer = None  # science_reports.db의 분야/이름 목록으로 처음 사용할 때 생성
+_semantic_cache = SemanticCache(SEMANTIC_CACHE_SIZE if SEMANTIC_CACHE else 0, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL)  # key: 원본 쿼리 임베딩, value: 분석 결과 + 전체 결과
+_search_page_cache = SearchPageCache(
+    SEARCH_PAGE_CACHE_USERS, SEARCH_PAGE_CACHE_PER_USER, SEARCH_PAGE_CACHE_TTL,
+    formatter=lambda ranked, offset: SearchService.format_results(ranked, len(ranked), offset + 1)
+)  # 사용자별 최근 검색(배치 검색은 1건) 결과
+_init_lock = threading.Lock()
+_component_status = {}  # key: 구성 요소 이름, value: 로딩 상태 / 소요 시간 / 상세 정보
+
+
+def _record_component(name: str, status: str, started_at: float, detail: Optional[str] = None):
+    """구성 요소 로딩 결과 기록 (/ready 응답에 사용)"""
+    _component_status[name] = {
+        "status": status,
+        "load_seconds": round(time.perf_counter() - started_at, 3),
+        "detail": detail
+    }
 
 
 def cosine_similarity_numpy(vec1, vec2):
@@ -127,55 +243,535 @@ class SearchService:
     
     @staticmethod
     def initialize_models():
-        """모델들을 지연 초기화"""
-        global _embedding_model, _vectorstore
-        
-        if _embedding_model is None:
-            print(f"🔧 모델 초기화 시작...")
-            
-            # CUDA 사용 가능 여부 확인
-            if not torch.cuda.is_available():
-                print(f"❌ CUDA가 사용 불가능합니다.")
-                print(f"GPU 드라이버와 PyTorch CUDA 버전을 확인해주세요.")
-                raise RuntimeError("CUDA가 필요합니다.")
-            
-            print(f"✅ CUDA 사용 가능: {torch.cuda.get_device_name(0)}")
-            
-            # Gemini API 설정
-            # genai.configure(api_key=API_KEY) # 이전 코드에서 이미 설정됨
-            print(f"✅ Gemini API 설정 완료")
-            
-            # 임베딩 모델 초기화 (CUDA 필수)
-            print(f"🧠 임베딩 모델 로딩 중: {EMBEDDING_MODEL_NAME}")
-            try:
-                _embedding_model = HuggingFaceEmbeddings(
-                    model_name=EMBEDDING_MODEL_NAME,
-                    model_kwargs={'device': EMBEDDING_DEVICE},
-                    encode_kwargs={'batch_size': EMBEDDING_BATCH_SIZE}
-                )
-                print(f"✅ 임베딩 모델 로드 완료: {EMBEDDING_DEVICE}")
-            except RuntimeError as e:
-                print(f"❌ CUDA 디바이스 오류 발생: {e}")
-                print(f"CUDA가 필요합니다. GPU 드라이버와 PyTorch CUDA 버전을 확인해주세요.")
-                raise RuntimeError(f"CUDA 디바이스 오류: {e}")
-            
-            # Chroma DB 초기화
-            print(f"💾 Chroma DB 로딩 중: {CHROMA_DIR}")
-            if not os.path.exists(CHROMA_DIR):
-                raise ValueError(f"Chroma DB 디렉토리 '{CHROMA_DIR}'가 존재하지 않습니다.")
-            
-            _vectorstore = Chroma(
-                persist_directory=CHROMA_DIR, 
-                embedding_function=_embedding_model,
-                collection_name="my_report_collection"
-            )
-            print(f"✅ Chroma DB 로딩 완료")
+        """모델들을 지연 초기화 (여러 스레드에서 동시에 호출되어도 한 번만 로드)"""
+        global _embedding_model, _vectorstore, _title_vectors, _keyword_index, _chunk_features, _embedding_batcher, _summary_collection, _local_query_analyzer
+
+        if _embedding_model is not None and _vectorstore is not None:
+            return _embedding_model, _vectorstore
+
+        with _init_lock:
+            if _embedding_model is None:
+                print(f"🔧 모델 초기화 시작...")
+                
+                # Gemini API 설정
+                # genai.configure(api_key=API_KEY) # 이전 코드에서 이미 설정됨
+                print(f"✅ Gemini API 설정 완료")
+                
+                # 임베딩 모델 초기화 (EMBEDDING_BACKEND: torch / onnx / sidecar, GPU가 없으면 CPU 사용)
+                print(f"🧠 임베딩 모델 로딩 중: {EMBEDDING_BACKEND}")
+                started_at = time.perf_counter()
+                try:
+                    _embedding_model = create_embedding_model(onnx_dir=PATHS["onnx_model"])
+                except Exception as e:
+                    print(f"❌ 임베딩 모델 로딩 실패: {e}")
+                    _record_component("embedding_model", "failed", started_at, str(e))
+                    raise RuntimeError(f"임베딩 모델 로딩 실패: {e}")
+                _record_component("embedding_model", "ready", started_at, EMBEDDING_BACKEND)
+
+                if EMBEDDING_BATCHING:
+                    _embedding_batcher = EmbeddingBatcher(_embedding_model.embed_documents, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WAIT_MS)
+                    print(f"✅ 쿼리 임베딩 마이크로 배치 사용: 최대 {EMBEDDING_BATCH_SIZE}건 / {EMBEDDING_BATCH_WAIT_MS}ms")
+
+            if _vectorstore is None:
+                started_at = time.perf_counter()
+                try:
+                    # 연도(/분야)별 파티션으로 빌드된 인덱스면 파티션 목록을 읽어 청크 컬렉션 대신 사용
+                    index_dir = PATHS["vector_snapshot"] if VECTORSTORE_BACKEND == "snapshot" else CHROMA_DIR
+                    partition_manifest = load_partition_manifest(index_dir) if os.path.exists(index_dir) else None
+
+                    if EMBEDDING_BACKEND == "sidecar" and EMBEDDING_SIDECAR_VECTORSTORE:
+                        # 벡터 인덱스도 사이드카 프로세스가 소유 (워커는 Chroma 클라이언트를 열지 않음)
+                        sidecar_stats = _embedding_model.client.stats()
+                        if not sidecar_stats["vectorstore"]:
+                            raise RuntimeError("임베딩 사이드카가 벡터 인덱스를 제공하지 않습니다. EMBEDDING_SIDECAR_VECTORSTORE 설정을 확인해주세요.")
+                        vectorstore = SidecarVectorStore(_embedding_model.client, CHUNK_COLLECTION_NAME)
+                        print(f"✅ 사이드카 벡터 인덱스 연결 완료")
+                    elif VECTORSTORE_BACKEND == "snapshot":
+                        # 읽기 전용 스냅샷을 mmap으로 열어 워커 간 메모리 페이지 공유
+                        print(f"💾 벡터 스냅샷 로딩 중: {PATHS['vector_snapshot']}")
+                        vectorstore = SnapshotVectorStore(PATHS["vector_snapshot"], None if partition_manifest else CHUNK_COLLECTION_NAME)
+                        print(f"✅ 벡터 스냅샷 로딩 완료: {len(vectorstore.manifest['collections'])}개 컬렉션")
+                    else:
+                        # Chroma DB 초기화
+                        print(f"💾 Chroma DB 로딩 중: {CHROMA_DIR}")
+                        if not os.path.exists(CHROMA_DIR):
+                            raise ValueError(f"Chroma DB 디렉토리 '{CHROMA_DIR}'가 존재하지 않습니다.")
+
+                        if partition_manifest is not None:
+                            # 파티션 DB에는 단일 청크 컬렉션이 없으므로 Chroma 클라이언트로 파티션 컬렉션을 직접 조회
+                            vectorstore = PartitionedVectorStore(chromadb.PersistentClient(path=CHROMA_DIR), CHUNK_COLLECTION_NAME, partition_manifest)
+                        else:
+                            vectorstore = Chroma(
+                                persist_directory=CHROMA_DIR, 
+                                embedding_function=_embedding_model,
+                                collection_name=CHUNK_COLLECTION_NAME
+                            )
+                        print(f"✅ Chroma DB 로딩 완료")
+
+                    if partition_manifest is not None:
+                        if not isinstance(vectorstore, PartitionedVectorStore):
+                            vectorstore = PartitionedVectorStore(vectorstore._client, CHUNK_COLLECTION_NAME, partition_manifest)
+                        print(f"🗂️ 파티션 인덱스 사용: {len(vectorstore._collection.partitions)}개 파티션 "
+                              f"({'/'.join(partition_manifest['partition_by'])}), {vectorstore._collection.count()}개 청크")
+                except Exception as e:
+                    _record_component("vectorstore", "failed", started_at, str(e))
+                    raise
+                _record_component("vectorstore", "ready", started_at, f"{VECTORSTORE_BACKEND}:{CHUNK_COLLECTION_NAME}")
+
+                started_at = time.perf_counter()
+                _title_vectors = SearchService.load_title_vectors(vectorstore)
+                _record_component("title_vectors", "ready" if _title_vectors else "missing", started_at, f"{len(_title_vectors)}개 보고서")
+
+                started_at = time.perf_counter()
+                _keyword_index = KeywordIndex.load(PATHS["keyword_index"])
+                if _keyword_index is not None:
+                    print(f"✅ 키워드 역색인 로딩 완료: {_keyword_index.num_docs}개 청크")
+                    _record_component("keyword_index", "ready", started_at, f"{_keyword_index.num_docs}개 청크")
+                else:
+                    print(f"⚠️ 키워드 역색인이 없습니다. 재정렬 시 본문 문자열 검색을 사용합니다: {PATHS['keyword_index']}")
+                    _record_component("keyword_index", "missing", started_at, PATHS["keyword_index"])
+
+                started_at = time.perf_counter()
+                _chunk_features = ChunkFeatures.load(PATHS["chunk_features"])
+                if _chunk_features is not None:
+                    print(f"✅ 청크 특징 테이블 로딩 완료: {_chunk_features.num_docs}개 청크")
+                    _record_component("chunk_features", "ready", started_at, f"{_chunk_features.num_docs}개 청크")
+                else:
+                    print(f"⚠️ 청크 특징 테이블이 없습니다. 재정렬 시 후보 메타데이터로 계산합니다: {PATHS['chunk_features']}")
+                    _record_component("chunk_features", "missing", started_at, PATHS["chunk_features"])
+
+                # 로컬 쿼리 분석과 의미 캐시 적중 조건이 같은 분야/이름 목록을 사용 - 첫 검색 요청에서 DB를 읽지 않도록 미리 로드
+                if (LOCAL_QUERY_ANALYZER or SEMANTIC_CACHE) and _local_query_analyzer is None:
+                    started_at = time.perf_counter()
+                    try:
+                        _local_query_analyzer = SearchService.load_local_query_analyzer()
+                        _record_component("query_vocabulary", "ready", started_at, f"{_local_query_analyzer.stats()['names']}개 이름")
+                    except Exception as e:
+                        print(f"⚠️ 로컬 쿼리 분석기 로딩 실패: {e}")
+                        _record_component("query_vocabulary", "failed", started_at, str(e))
+
+                if SEARCH_MODE == "two_stage":
+                    started_at = time.perf_counter()
+                    _summary_collection = SearchService.load_summary_collection(vectorstore)
+                    _record_component(
+                        "summary_collection", "ready" if _summary_collection is not None else "missing", started_at,
+                        f"{_summary_collection.count()}개 보고서" if _summary_collection is not None else SUMMARY_COLLECTION_NAME
+                    )
+
+                # 부가 자료까지 모두 준비된 뒤에 공개 (다른 스레드의 빠른 경로가 반쯤 준비된 상태를 보지 않도록)
+                _vectorstore = vectorstore
         
         return _embedding_model, _vectorstore
+
+    @staticmethod
+    def get_component_status() -> Dict[str, Dict[str, Any]]:
+        """검색 구성 요소별 로딩 상태와 소요 시간"""
+        return {name: dict(status) for name, status in _component_status.items()}
+
+    @staticmethod
+    def load_title_vectors(vectorstore) -> Dict[str, Tuple[str, np.ndarray]]:
+        """build_chromadb.py가 저장한 제목 벡터 컬렉션을 nttSn 기준으로 메모리에 적재"""
+        try:
+            title_collection = vectorstore._client.get_collection(name=TITLE_COLLECTION_NAME)
+            stored = title_collection.get(include=["embeddings", "metadatas"])
+        except Exception as e:
+            print(f"⚠️ 제목 벡터 컬렉션을 불러오지 못했습니다. 검색 시 제목을 직접 임베딩합니다: {e}")
+            return {}
+
+        title_vectors = {}
+        for nttsn, embedding, metadata in zip(stored["ids"], stored["embeddings"], stored["metadatas"]):
+            title = (metadata or {}).get("title", "")
+            title_vectors[str(nttsn)] = (title, np.asarray(embedding, dtype=np.float32))
+        print(f"✅ 제목 벡터 로딩 완료: {len(title_vectors)}개 보고서")
+        return title_vectors
+
+    @staticmethod
+    def load_summary_collection(vectorstore):
+        """build_chromadb.py가 저장한 보고서 요약 벡터 컬렉션 (없으면 None → 전체 청크 검색)"""
+        try:
+            summary_collection = vectorstore._client.get_collection(name=SUMMARY_COLLECTION_NAME)
+            report_count = summary_collection.count()
+        except Exception as e:
+            print(f"⚠️ 보고서 요약 컬렉션을 불러오지 못했습니다. 전체 청크 검색을 사용합니다: {e}")
+            return None
+        print(f"✅ 보고서 요약 컬렉션 연결 완료: {report_count}개 보고서")
+        return summary_collection
+
+    @staticmethod
+    def get_title_vectors(documents, embedding_model) -> List[Optional[np.ndarray]]:
+        """문서별 제목 벡터 조회 - 저장된 벡터가 없거나 제목이 다를 때만 즉석 임베딩"""
+        title_vectors = [None] * len(documents)
+        missing_indices = []
+        for i, doc in enumerate(documents):
+            title = doc.metadata.get("title", "")
+            if not title.strip():
+                continue
+            stored = _title_vectors.get(str(doc.metadata.get("nttSn", ""))) if _title_vectors else None
+            if stored is not None and stored[0] == title:
+                title_vectors[i] = stored[1]
+            else:
+                missing_indices.append(i)
+
+        if missing_indices:
+            missing_titles = [documents[i].metadata.get("title", "") for i in missing_indices]
+            for i, vector in zip(missing_indices, embedding_model.embed_documents(missing_titles)):
+                title_vectors[i] = vector
+
+        return title_vectors
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """캐시 키용 쿼리 정규화 (유니코드 NFC + 공백 정리)"""
+        return " ".join(unicodedata.normalize("NFC", query).split())
+
+    @staticmethod
+    def embed_query(embedding_model, query: str) -> np.ndarray:
+        """쿼리를 한 번만 임베딩 (정규화된 쿼리 기준 LRU 캐시 사용)"""
+        normalized_query = SearchService.normalize_query(query)
+        query_embedding = _query_embedding_cache.get(normalized_query)
+        if query_embedding is None:
+            query_embedding = np.asarray(embedding_model.embed_query(normalized_query), dtype=np.float32)
+            query_embedding.setflags(write=False)
+            _query_embedding_cache.set(normalized_query, query_embedding)
+        return query_embedding
+
+    @staticmethod
+    async def embed_query_batched(embedding_model, query: str) -> np.ndarray:
+        """동시 요청과 묶어서 쿼리를 임베딩 (마이크로 배치가 꺼져 있으면 스레드에서 단건 임베딩)"""
+        if _embedding_batcher is None:
+            return await asyncio.to_thread(SearchService.embed_query, embedding_model, query)
+
+        normalized_query = SearchService.normalize_query(query)
+        query_embedding = _query_embedding_cache.get(normalized_query)
+        if query_embedding is None:
+            query_embedding = await _embedding_batcher.embed(normalized_query)
+            query_embedding.setflags(write=False)
+            _query_embedding_cache.set(normalized_query, query_embedding)
+        return query_embedding
+
+    @staticmethod
+    async def embed_queries_batched(embedding_model, queries: List[str]) -> List[np.ndarray]:
+        """여러 쿼리를 한 배치로 임베딩 (캐시에 없는 쿼리만 마이크로 배치 또는 embed_documents 한 번으로 처리)"""
+        normalized_queries = [SearchService.normalize_query(query) for query in queries]
+        embeddings = {query: _query_embedding_cache.get(query) for query in normalized_queries}
+        missing = [query for query, embedding in embeddings.items() if embedding is None]
+
+        if missing:
+            if _embedding_batcher is not None:
+                vectors = await asyncio.gather(*(_embedding_batcher.embed(query) for query in missing))
+            else:
+                vectors = await asyncio.to_thread(embedding_model.embed_documents, missing)
+            for query, vector in zip(missing, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                _query_embedding_cache.set(query, vector)
+                embeddings[query] = vector
+        return [embeddings[query] for query in normalized_queries]
+
+    @staticmethod
+    def get_embedding_stats() -> Dict[str, Any]:
+        """쿼리 임베딩 캐시 및 마이크로 배치 통계"""
+        return {
+            "backend": EMBEDDING_BACKEND,
+            "cache": _query_embedding_cache.stats(),
+            "batcher": _embedding_batcher.stats() if _embedding_batcher is not None else None
+        }
+
+    @staticmethod
+    def query_candidates(vectorstore, query_embedding, n_results: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Chroma 컬렉션에 직접 질의하여 후보 청크를 저장된 임베딩과 함께 반환 (where로 메타데이터 조건 적용)"""
+        return SearchService.query_candidates_batch(vectorstore, [query_embedding], n_results, where)[0]
+
+    @staticmethod
+    def query_candidates_batch(vectorstore, query_embeddings, n_results: int, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리 임베딩을 한 번의 Chroma 질의로 검색하여 쿼리별 후보 목록 반환"""
+        results = vectorstore._collection.query(
+            query_embeddings=[np.asarray(query_embedding).tolist() for query_embedding in query_embeddings],
+            n_results=n_results,
+            where=where,
+            include=["embeddings", "metadatas", "documents", "distances"]
+        )
+
+        candidate_lists = []
+        for query_index in range(len(query_embeddings)):
+            candidates = []
+            for chunk_id, text, metadata, embedding, distance in zip(
+                results["ids"][query_index],
+                results["documents"][query_index],
+                results["metadatas"][query_index],
+                results["embeddings"][query_index],
+                results["distances"][query_index]
+            ):
+                candidates.append({
+                    "id": chunk_id,
+                    "document": Document(page_content=text, metadata=metadata or {}),
+                    "embedding": embedding,
+                    "distance": distance
+                })
+            candidate_lists.append(candidates)
+        return candidate_lists
+
+    @staticmethod
+    def build_where_clause(metadata_filters: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """메타데이터 필터를 Chroma where 절로 변환 (숫자 값은 문자열/정수 저장 형태 모두 허용)"""
+        conditions = []
+        for key, val in metadata_filters.items():
+            val = str(val).strip()
+            if val.isdigit():
+                conditions.append({"$or": [{key: val}, {key: int(val)}]})
+            else:
+                conditions.append({key: val})
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+
+    @staticmethod
+    def matches_filters(metadata: Dict[str, Any], metadata_filters: Dict[str, str]) -> bool:
+        """후보 메타데이터가 모든 필터 조건과 일치하는지 확인"""
+        return all(str(metadata.get(key, '')).strip() == str(val).strip() for key, val in metadata_filters.items())
+
+    @staticmethod
+    def build_report_clause(report_numbers: List[str]) -> Dict[str, Any]:
+        """보고서 번호 목록을 nttSn $in 조건으로 변환 (숫자 번호는 문자열/정수 저장 형태 모두 허용)"""
+        int_numbers = [int(number) for number in report_numbers if number.isdigit()]
+        if not int_numbers:
+            return {"nttSn": {"$in": report_numbers}}
+        return {"$or": [{"nttSn": {"$in": report_numbers}}, {"nttSn": {"$in": int_numbers}}]}
+
+    @staticmethod
+    def two_stage_search(vectorstore, query_embedding, n_results: int, n_reports: int, min_reports: int, max_results: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """보고서 요약 컬렉션에서 상위 n_reports개 보고서를 고른 뒤 해당 보고서(nttSn $in)의 청크만 검색"""
+        results = _summary_collection.query(
+            query_embeddings=[np.asarray(query_embedding).tolist()],
+            n_results=n_reports,
+            where=where,
+            include=["metadatas"]
+        )
+        report_numbers = [
+            str((metadata or {}).get("nttSn", report_id))
+            for report_id, metadata in zip(results["ids"][0], results["metadatas"][0])
+        ]
+        if not report_numbers:
+            return []
+
+        report_where = SearchService.build_report_clause(report_numbers)
+        if where:
+            report_where = {"$and": [where, report_where]}
+        candidates = SearchService.query_candidates(vectorstore, query_embedding, n_results, where=report_where)
+        print(f"📚 2단계 검색: 보고서 {len(report_numbers)}개 → 청크 {len(candidates)}개")
+        return SearchService.expand_for_reports(
+            vectorstore, query_embedding, candidates, n_results, min_reports, max_results, where=report_where
+        )
+
+    @staticmethod
+    def search_candidates(vectorstore, query_embedding, n_results: int, min_reports: int, max_results: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """검색 방식(SEARCH_MODE)에 따라 2단계 검색 또는 전체 청크 검색 후 고유 보고서 수 확보"""
+        if _summary_collection is not None:
+            return SearchService.two_stage_search(
+                vectorstore, query_embedding, n_results, min_reports * SEARCH_TWO_STAGE_REPORT_MULTIPLIER, min_reports, max_results, where=where
+            )
+        candidates = SearchService.query_candidates(vectorstore, query_embedding, n_results, where=where)
+        return SearchService.expand_for_reports(vectorstore, query_embedding, candidates, n_results, min_reports, max_results, where=where)
+
+    @staticmethod
+    def filtered_vector_search(vectorstore, query_embedding, n_results: int, metadata_filters: Dict[str, str], min_reports: int, max_results: int) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """메타데이터 조건을 where 절로 적용한 벡터 검색
+
+        고유 보고서가 min_reports개 미만이면 가중치가 낮은 조건부터 하나씩 완화하여 재검색하고,
+        실제로 적용된 조건을 함께 반환
+        """
+        metadata_weight_table = WEIGHT_CONFIG["metadata_weights"]
+        active_filters = dict(metadata_filters)
+
+        while active_filters:
+            where = SearchService.build_where_clause(active_filters)
+            try:
+                candidates = SearchService.search_candidates(vectorstore, query_embedding, n_results, min_reports, max_results, where=where)
+            except Exception as e:
+                print(f"⚠️ 메타데이터 조건 검색 실패 ({active_filters}): {e}")
+                candidates = []
+
+            if SearchService.count_reports(candidates) >= min_reports:
+                return candidates, active_filters
+
+            relaxed_key = min(active_filters, key=lambda key: metadata_weight_table.get(key, 0.05))
+            print(f"🔓 메타데이터 조건 완화: {relaxed_key}={active_filters[relaxed_key]} (결과 {len(candidates)}개)")
+            del active_filters[relaxed_key]
+
+        return SearchService.search_candidates(vectorstore, query_embedding, n_results, min_reports, max_results), {}
+
+    @staticmethod
+    def report_key(candidate: Dict[str, Any]) -> str:
+        """후보 청크가 속한 보고서 번호 (nttSn이 없으면 청크 ID)"""
+        number = candidate["document"].metadata.get("nttSn")
+        return str(number) if number not in (None, "") else candidate["id"]
+
+    @staticmethod
+    def count_reports(candidates: List[Dict[str, Any]]) -> int:
+        """후보 청크들의 고유 보고서 수"""
+        return len({SearchService.report_key(c) for c in candidates})
+
+    @staticmethod
+    def expand_for_reports(vectorstore, query_embedding, candidates: List[Dict[str, Any]], n_results: int, min_reports: int, max_results: int, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """고유 보고서가 min_reports개 미만이면 검색 후보 수를 2배씩 늘려 재검색 (max_results 또는 컬렉션 끝까지)"""
+        while SearchService.count_reports(candidates) < min_reports and n_results < max_results:
+            n_results = min(n_results * 2, max_results)
+            more = SearchService.query_candidates(vectorstore, query_embedding, n_results, where=where)
+            candidates = SearchService.merge_candidates(candidates, more)
+            print(f"📈 후보 확장: {n_results}개 검색 → 고유 보고서 {SearchService.count_reports(candidates)}개")
+            if len(more) < n_results:
+                break
+        return candidates
+
+    @staticmethod
+    def aggregate_by_report(candidates: List[Dict[str, Any]], query_embedding, pooling: str = SEARCH_REPORT_POOLING) -> List[Dict[str, Any]]:
+        """청크 후보를 보고서(nttSn) 단위로 묶어 보고서 점수와 대표 청크를 계산
+
+        보고서 점수는 청크 유사도의 최댓값(max) 또는 상위 2개 평균(top2)이며,
+        보고서마다 유사도가 가장 높은 청크 하나만 report_score와 함께 반환 (보고서 점수 내림차순)
+        """
+        if not candidates:
+            return []
+
+        chunk_scores = cosine_scores(
+            to_matrix([c["embedding"] for c in candidates]),
+            np.asarray(query_embedding, dtype=np.float64)
+        )
+
+        groups = {}
+        for i, candidate in enumerate(candidates):
+            groups.setdefault(SearchService.report_key(candidate), []).append(i)
+
+        reports = []
+        for number, indices in groups.items():
+            scores = chunk_scores[indices]
+            order = np.argsort(-scores, kind="stable")
+            top_scores = scores[order[:1] if pooling == "max" else order[:2]]
+            reports.append({
+                **candidates[indices[order[0]]],
+                "report_score": float(np.mean(top_scores)),
+                "report_chunk_count": len(indices)
+            })
+
+        reports.sort(key=lambda r: r["report_score"], reverse=True)
+        return reports
+
+    @staticmethod
+    def get_candidates_by_ids(vectorstore, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """청크 ID로 Chroma에서 후보를 저장된 임베딩과 함께 조회 (요청한 ID 순서 유지)"""
+        if not chunk_ids:
+            return []
+        results = vectorstore._collection.get(
+            ids=list(chunk_ids),
+            include=["embeddings", "metadatas", "documents"]
+        )
+        by_id = {}
+        for chunk_id, text, metadata, embedding in zip(results["ids"], results["documents"], results["metadatas"], results["embeddings"]):
+            by_id[chunk_id] = {
+                "id": chunk_id,
+                "document": Document(page_content=text, metadata=metadata or {}),
+                "embedding": embedding,
+                "distance": None
+            }
+        return [by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in by_id]
+
+    @staticmethod
+    def lexical_search(vectorstore, query: str, n_results: int) -> List[Dict[str, Any]]:
+        """키워드 역색인의 BM25 점수로 후보 검색"""
+        if _keyword_index is None or n_results <= 0:
+            return []
+        doc_indices, scores = _keyword_index.top_k(query, n_results)
+        candidates = SearchService.get_candidates_by_ids(vectorstore, [_keyword_index.doc_ids[i] for i in doc_indices])
+        bm25_by_id = {_keyword_index.doc_ids[i]: float(score) for i, score in zip(doc_indices, scores)}
+        for candidate in candidates:
+            candidate["bm25_score"] = bm25_by_id.get(candidate["id"], 0.0)
+        return candidates
+
+    @staticmethod
+    def fuse_candidates(ranked_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+        """여러 검색 결과를 RRF로 결합하여 상위 limit개 반환"""
+        fused = {}
+        for ranked in ranked_lists:
+            for rank, candidate in enumerate(ranked, 1):
+                entry = fused.setdefault(candidate["id"], {**candidate, "rrf_score": 0.0})
+                entry["rrf_score"] += 1.0 / (SEARCH_RRF_K + rank)
+                for key in ("distance", "bm25_score"):
+                    if entry.get(key) is None and candidate.get(key) is not None:
+                        entry[key] = candidate[key]
+        return sorted(fused.values(), key=lambda c: c["rrf_score"], reverse=True)[:limit]
+
+    @staticmethod
+    async def vector_search(embedding_model, vectorstore, query: str, n_results: int) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """쿼리 임베딩(마이크로 배치) 후 벡터 검색 (Chroma 질의는 이벤트 루프 밖 스레드에서 실행)"""
+        query_embedding = await SearchService.embed_query_batched(embedding_model, query)
+        return query_embedding, await asyncio.to_thread(SearchService.query_candidates, vectorstore, query_embedding, n_results)
+
+    @staticmethod
+    def merge_candidates(primary: List[Dict[str, Any]], secondary: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """청크 ID 기준으로 후보 목록 병합 (primary 순서 우선)"""
+        seen_ids = {c["id"] for c in primary}
+        return primary + [c for c in secondary if c["id"] not in seen_ids]
+
+    @staticmethod
+    async def retrieve_after_analysis(embedding_model, vectorstore, summary_query: str, n_results: int, speculative_task: Optional[asyncio.Task]) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """요약 쿼리 기준 후보 검색 - 추측 검색 결과가 있으면 재사용하거나 병합"""
+        speculative = None
+        if speculative_task is not None:
+            try:
+                speculative = await speculative_task
+            except Exception as e:
+                print(f"⚠️ 추측 검색 실패, 요약 쿼리로만 검색합니다: {e}")
+
+        if speculative is None:
+            return await SearchService.vector_search(embedding_model, vectorstore, summary_query, n_results)
+
+        speculative_embedding, speculative_candidates = speculative
+        query_embedding = await SearchService.embed_query_batched(embedding_model, summary_query)
+        similarity = cosine_similarity_numpy(query_embedding, speculative_embedding)
+
+        if similarity >= SEARCH_SPECULATIVE_REUSE_THRESHOLD:
+            print(f"⚡ 추측 검색 결과 재사용 (유사도 {similarity:.4f})")
+            return query_embedding, speculative_candidates
+
+        summary_candidates = await asyncio.to_thread(SearchService.query_candidates, vectorstore, query_embedding, n_results)
+        print(f"🔀 추측 검색 결과 병합 (유사도 {similarity:.4f})")
+        return query_embedding, SearchService.merge_candidates(summary_candidates, speculative_candidates)
     
     @staticmethod
-    async def analyze_user_query(original_query: str, user_id: str, logger_service: Optional[LoggerService] = None, is_hidden: bool = False, auth_token: Optional[str] = None) -> Tuple[str, List[str], List[str], Dict, str, Dict]:
-        """사용자 쿼리를 분석하여 요약 쿼리, 우선순위 섹션, 키워드, 메타데이터 필터, 의도, 사용량 메타데이터를 반환"""
+    def parse_query_analysis(response_content: str) -> Tuple[str, List[str], List[str], Dict[str, str]]:
+        """Gemini 응답에서 요약 쿼리, 우선순위 섹션, 키워드, 메타데이터 필터를 추출"""
+        summary_query = ""
+        priority_sections = []
+        extracted_keywords = []
+
+        summary_match = re.search(r"요약 쿼리:\s*(.+)", response_content)
+        if summary_match:
+            summary_query = summary_match.group(1).strip()
+
+        sections_match = re.search(r"우선순위 섹션:\s*(.+)", response_content)
+        if sections_match:
+            sections_str = sections_match.group(1).strip()
+            priority_sections = [s.strip() for s in sections_str.split('>') if s.strip()]
+
+        keywords_match = re.search(r"핵심 키워드:\s*(.+)", response_content)
+        if keywords_match:
+            keyword_str = keywords_match.group(1).strip()
+            extracted_keywords = [kw.strip().lower() for kw in re.split(r"[,\s]+", keyword_str) if len(kw.strip()) > 1]
+
+        metadata_filters = {}
+        for key in ["field", "year", "award", "authors", "teacher"]:
+            match = re.search(rf"{key}:\s*(.+)", response_content, re.IGNORECASE)
+            if match:
+                metadata_filters[key] = match.group(1).strip()
+
+        return summary_query, priority_sections, extracted_keywords, metadata_filters
+
+    @staticmethod
+    async def request_query_analysis(original_query: str, cache_key: Tuple[str, str]) -> Tuple[Tuple, Dict]:
+        """Gemini로 쿼리 분석을 요청하고 성공한 결과를 캐시에 저장"""
         generation_config = {
             "max_output_tokens": int(os.getenv("GEMINI_MAX_TOKENS", "2048")),
             "temperature": float(os.getenv("GEMINI_TEMPERATURE", "0.1")),
@@ -185,71 +781,131 @@ class SearchService:
         gemini_model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
         prompt = QUERY_ANALYSIS_PROMPT_TEMPLATE.replace("{{query}}", original_query)
 
-        try:
-            response = client.models.generate_content(
-                model=gemini_model_name,
-                contents=prompt,
-            )
-            response_content = response.text
-            
-            # 사용량 메타데이터 추출
-            usage_metadata = {}
-            if hasattr(response, 'usage_metadata') and response.usage_metadata:
-                usage_metadata = {
-                    'total_token_count': response.usage_metadata.total_token_count,
-                    'prompt_token_count': response.usage_metadata.prompt_token_count,
-                    'candidates_token_count': response.usage_metadata.candidates_token_count
-                }
-            
-            print(f"🔍 Gemini API 응답:")
-            print(response_content)
-            print(f"🔍 사용량 메타데이터: {usage_metadata}")
-
-            summary_query = ""
-            priority_sections = []
-            extracted_keywords = []
-
-            summary_match = re.search(r"요약 쿼리:\s*(.+)", response_content)
-            if summary_match:
-                summary_query = summary_match.group(1).strip()
-
-            sections_match = re.search(r"우선순위 섹션:\s*(.+)", response_content)
-            if sections_match:
-                sections_str = sections_match.group(1).strip()
-                priority_sections = [s.strip() for s in sections_str.split('>') if s.strip()]
-
-            keywords_match = re.search(r"핵심 키워드:\s*(.+)", response_content)
-            if keywords_match:
-                keyword_str = keywords_match.group(1).strip()
-                extracted_keywords = [kw.strip().lower() for kw in re.split(r"[,\s]+", keyword_str) if len(kw.strip()) > 1]
-
-            metadata_filters = {}
-            for key in ["field", "year", "award", "authors", "teacher"]:
-                match = re.search(rf"{key}:\s*(.+)", response_content, re.IGNORECASE)
-                if match:
-                    metadata_filters[key] = match.group(1).strip()
-
-            # 로깅 수행 (logger_service가 제공된 경우에만)
-            if logger_service and usage_metadata:
-                try:
-                    await logger_service.log_ai_usage(
-                        user_id=user_id,
-                        service_name="query_summary",
-                        request_prompt=original_query,
-                        request_token_count=usage_metadata.get('prompt_token_count', 0),
-                        response_token_count=usage_metadata.get('candidates_token_count', 0),
-                        total_token_count=usage_metadata.get('total_token_count', 0),
-                        is_hidden=is_hidden,
-                        auth_token=auth_token  # 토큰 전달
-                    )
-                except Exception as log_error:
-                    print(f"❌ 로깅 중 오류: {log_error}")
-            
-            return summary_query, priority_sections, extracted_keywords, metadata_filters, usage_metadata
+        response = await LLMGateway.generate_content(
+            model=gemini_model_name,
+            contents=prompt,
+        )
+        response_content = response.text
+
+        # 사용량 메타데이터 추출
+        usage_metadata = {}
+        if hasattr(response, 'usage_metadata') and response.usage_metadata:
+            usage_metadata = {
+                'total_token_count': response.usage_metadata.total_token_count,
+                'prompt_token_count': response.usage_metadata.prompt_token_count,
+                'candidates_token_count': response.usage_metadata.candidates_token_count
+            }
+
+        print(f"🔍 Gemini API 응답:")
+        print(response_content)
+        print(f"🔍 사용량 메타데이터: {usage_metadata}")
+
+        analysis = SearchService.parse_query_analysis(response_content)
+        if analysis[0]:
+            _query_analysis_cache.set(cache_key, analysis)
+        return analysis, usage_metadata
+
+    @staticmethod
+    def load_local_query_analyzer() -> LocalQueryAnalyzer:
+        """DB에서 분야/저자/지도교사 이름 목록을 읽어 로컬 쿼리 분석기 생성 (_init_lock 안에서 호출)"""
+        analyzer = LocalQueryAnalyzer.load(
+            PATHS["science_reports_db"],
+            WEIGHT_CONFIG["award_weights"].keys(),
+            LOCAL_ANALYZER_SECTIONS,
+            max_keywords=LOCAL_ANALYZER_MAX_KEYWORDS,
+            min_confidence=LOCAL_ANALYZER_MIN_CONFIDENCE
+        )
+        print(f"✅ 로컬 쿼리 분석기 준비 완료: {analyzer.stats()}")
+        return analyzer
+
+    @staticmethod
+    def get_local_query_analyzer() -> LocalQueryAnalyzer:
+        """로컬 쿼리 분석기 (LOCAL_QUERY_ANALYZER / SEMANTIC_CACHE가 켜져 있으면 모델 초기화 때 로드, 아니면 처음 호출 시 로드)"""
+        global _local_query_analyzer
+        if _local_query_analyzer is None:
+            with _init_lock:
+                if _local_query_analyzer is None:
+                    _local_query_analyzer = SearchService.load_local_query_analyzer()
+        return _local_query_analyzer
+
+    @staticmethod
+    def get_query_analyzer_stats() -> Dict[str, Any]:
+        """로컬 분석(빠른 경로) 사용 횟수와 쿼리 분석 캐시 통계"""
+        return {
+            "local": _local_query_analyzer.stats() if _local_query_analyzer is not None else None,
+            "cache": _query_analysis_cache.stats()
+        }
+
+    @staticmethod
+    async def analyze_user_query(original_query: str, user_id: str, logger_service: Optional[LoggerService] = None, is_hidden: bool = False, auth_token: Optional[str] = None) -> Tuple[str, List[str], List[str], Dict, Dict]:
+        """사용자 쿼리를 분석하여 요약 쿼리, 우선순위 섹션, 키워드, 메타데이터 필터, 사용량 메타데이터를 반환"""
+        cache_key = (SearchService.normalize_query(original_query).casefold(), QUERY_ANALYSIS_PROMPT_VERSION)
+
+        # 단순한 쿼리는 로컬 규칙으로 바로 분석 (Gemini 호출 및 사용량 기록 없음)
+        if LOCAL_QUERY_ANALYZER:
+            local_analyzer = SearchService.get_local_query_analyzer()
+            analysis, confidence = local_analyzer.analyze(SearchService.normalize_query(original_query))
+            if analysis is not None:
+                stats = local_analyzer.stats()
+                print(f"⚡ 로컬 쿼리 분석: {analysis} (빠른 경로 {stats['fast_path']}회, {stats['fast_path_rate']:.1%})")
+                summary_query, priority_sections, extracted_keywords, metadata_filters = analysis
+
+                # 캐시 적중과 마찬가지로 토큰 0으로 기록 (service_name으로 로컬 분석 구분)
+                if logger_service:
+                    try:
+                        await logger_service.log_ai_usage(
+                            user_id=user_id,
+                            service_name=LOCAL_ANALYZER_SERVICE_NAME,
+                            request_prompt=original_query,
+                            request_token_count=0,
+                            response_token_count=0,
+                            total_token_count=0,
+                            is_hidden=is_hidden,
+                            auth_token=auth_token
+                        )
+                    except Exception as log_error:
+                        print(f"❌ 로깅 중 오류: {log_error}")
+                return summary_query, priority_sections, extracted_keywords, metadata_filters, dict(LOCAL_ANALYZER_USAGE_METADATA)
+            print(f"🧠 로컬 분석 신뢰도 낮음 ({confidence:.2f}) → Gemini 분석")
 
+        try:
+            analysis = _query_analysis_cache.get(cache_key)
+            if analysis is not None:
+                print(f"⚡ 쿼리 분석 캐시 적중: {original_query}")
+                usage_metadata = dict(CACHED_USAGE_METADATA)
+            else:
+                # 동일한 쿼리가 동시에 들어오면 Gemini 호출은 한 번만 수행
+                (analysis, usage_metadata), shared = await _query_analysis_flight.do(
+                    cache_key,
+                    lambda: SearchService.request_query_analysis(original_query, cache_key)
+                )
+                if shared:
+                    print(f"⚡ 진행 중인 쿼리 분석 결과 공유: {original_query}")
+                    usage_metadata = dict(CACHED_USAGE_METADATA)
         except Exception as e:
             print(f"❌ 쿼리 분석 중 오류: {e}")
-            return original_query, [], [], {}, "", {}
+            return original_query, [], [], {}, {}
+
+        summary_query, priority_sections, extracted_keywords, metadata_filters = analysis
+
+        # 로깅 수행 (logger_service가 제공된 경우에만, 캐시 적중 시 토큰 0으로 기록)
+        if logger_service and usage_metadata:
+            try:
+                await logger_service.log_ai_usage(
+                    user_id=user_id,
+                    service_name="query_summary",
+                    request_prompt=original_query,
+                    request_token_count=usage_metadata.get('prompt_token_count', 0),
+                    response_token_count=usage_metadata.get('candidates_token_count', 0),
+                    total_token_count=usage_metadata.get('total_token_count', 0),
+                    is_hidden=is_hidden,
+                    auth_token=auth_token  # 토큰 전달
+                )
+            except Exception as log_error:
+                print(f"❌ 로깅 중 오류: {log_error}")
+
+        # 캐시된 값이 호출자에 의해 변경되지 않도록 복사본 반환
+        return summary_query, list(priority_sections), list(extracted_keywords), dict(metadata_filters), usage_metadata
     
     @staticmethod
     def rerank_with_weights(
@@ -261,96 +917,251 @@ class SearchService:
         original_query,
         keyword_match_terms,
         weight_config=WEIGHT_CONFIG,
-        metadata_filters=None
+        metadata_filters=None,
+        doc_vectors=None,
+        chunk_ids=None,
+        content_scores=None
     ):
-        """문서를 가중치를 적용하여 재정렬"""
+        """문서를 가중치를 적용하여 재정렬 (doc_vectors가 주어지면 저장된 청크 벡터를, chunk_ids가 주어지면 키워드 역색인을,
+        content_scores가 주어지면 보고서 단위로 집계된 본문 점수를 사용)"""
         alpha = weight_config["alpha"]
-        gamma = weight_config["gamma"]
-        section_weights = weight_config["section_weights"]
-        award_weights = weight_config["award_weights"]  # 수상도별 가중치
-        metadata_weight_table = weight_config["metadata_weights"]
 
-        doc_texts = [doc.page_content for doc in documents]
-        doc_titles = [doc.metadata.get("title", "") for doc in documents]
+        if doc_vectors is None:
+            doc_vectors = embedding_model.embed_documents([doc.page_content for doc in documents])
+        title_vectors = SearchService.get_title_vectors(documents, embedding_model)
 
-        doc_vectors = embedding_model.embed_documents(doc_texts)
-        title_vectors = embedding_model.embed_documents(doc_titles)
+        # 전체 후보를 행렬로 묶어 한 번에 점수 계산
+        doc_matrix = to_matrix(doc_vectors)
+        title_matrix = to_matrix(title_vectors, dim=doc_matrix.shape[1] if len(documents) else None)
+        features = build_candidate_features(documents, weight_config["award_weights"], chunk_ids, _keyword_index, _chunk_features)
 
-        simplified_terms = [t.lower() for t in simplified_query.split() if len(t) > 1]
-        original_terms = [t.lower() for t in original_query.split() if len(t) > 1]
+        components = score_candidates(
+            query_embedding,
+            doc_matrix,
+            title_matrix,
+            features,
+            priority_sections,
+            simplified_query,
+            original_query,
+            keyword_match_terms,
+            weight_config,
+            metadata_filters,
+            content_scores
+        )
 
         reranked_results = []
-
         for i, doc in enumerate(documents):
-            content_score = cosine_similarity_numpy(query_embedding, doc_vectors[i])
-            title_score = cosine_similarity_numpy(query_embedding, title_vectors[i]) if doc_titles[i].strip() else 0.0
+            score_info = build_score_info(components, i, alpha)
+            reranked_results.append((doc, score_info['total_score'], score_info))
 
-            # 섹션 부스터 점수 계산 (Gemini가 분석한 우선순위 섹션과 일치할 때 가중치 적용)
-            section_boost_score = 0.0
-            doc_section = doc.metadata.get("section", "")
-            if doc_section in priority_sections:
-                try:
-                    priority_index = priority_sections.index(doc_section)  # 우선순위에서의 위치 (0, 1, 2)
-                    section_boost_score = section_weights.get(priority_index, 0.0)  # 1순위: 0.08, 2순위: 0.04, 3순위: 0.01
-                except ValueError:
-                    pass
+        reranked_results.sort(key=lambda x: x[1], reverse=True)
+        return reranked_results
+    
+    @staticmethod
+    def dedupe_reranked(reranked, limit: int) -> List[Tuple[Any, float, Dict[str, Any]]]:
+        """재정렬 결과에서 중복 number를 제거하고 최대 limit개 반환 (이미지 조회 등 응답 변환 없음)"""
+        unique = []
+        seen_numbers = set()
+        for doc, score, score_info in reranked:
+            number = str(doc.metadata.get('nttSn', 'N/A'))
+            if number in seen_numbers:
+                continue
+            seen_numbers.add(number)
+            unique.append((doc, score, score_info))
+            if len(unique) >= limit:
+                break
+        return unique
+
+    @staticmethod
+    def format_results(reranked, limit: int, start_rank: int = 1) -> List[Dict[str, Any]]:
+        """재정렬 결과를 응답 형식으로 변환 (중복 number 제거, 최대 limit개, 순위는 start_rank부터)"""
+        results = []
+        seen_numbers = set()
+        for i, (doc, score, score_info) in enumerate(reranked, 1):
+            number = str(doc.metadata.get('nttSn', 'N/A'))  # 항상 문자열로 변환
+            if number in seen_numbers:
+                continue
+            seen_numbers.add(number)
+            
+            # 이미지 경로 가져오기
+            image_path = get_image_path_from_db(number)
+            
+            result = {
+                'rank': start_rank + len(results),
+                'title': doc.metadata.get('title', 'N/A'),
+                'section': doc.metadata.get('section', 'N/A'),
+                'number': number,
+                'metadata': {
+                    'field': doc.metadata.get('field', 'N/A'),
+                    'year': doc.metadata.get('year', 'N/A'),
+                    'award': doc.metadata.get('award', 'N/A'),
+                    'authors': doc.metadata.get('authors', 'N/A'),
+                    'teacher': doc.metadata.get('teacher', 'N/A'),
+                    'source_type': doc.metadata.get('source_type', 'N/A')
+                },
+                'score_info': dict(score_info),
+                'content': doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content,
+                'image_path': image_path
+            }
+            results.append(result)
+            if len(results) >= limit:
+                break
+        return results
 
-            text_lower = doc.page_content.lower()
-            title_lower = doc_titles[i].lower()
+    @staticmethod
+    def save_search_pages(user_id: Optional[str], response_data: Dict[str, Any], ranked: List[Tuple[Any, float, Dict[str, Any]]], offset: int) -> Optional[str]:
+        """첫 페이지 이후 재정렬 결과를 사용자별 캐시에 보관하고 다음 페이지 커서 반환 (남은 결과가 없으면 None)"""
+        return _search_page_cache.save(user_id, [(response_data, ranked, offset)])[0]
 
-            simplified_matches = sum(1 for term in simplified_terms if term in text_lower or term in title_lower)
-            original_matches = sum(1 for term in original_terms if term in text_lower or term in title_lower)
-            matched_terms = simplified_matches + original_matches
+    @staticmethod
+    def get_search_page(cursor: str, k: int, user_id: Optional[str]) -> Dict[str, Any]:
+        """커서 위치부터 k개 결과를 캐시에서 반환 (쿼리 분석, 임베딩, 검색 없음)"""
+        page = _search_page_cache.get(cursor, k, user_id)
+        if page is None:
+            raise HTTPException(status_code=410, detail="검색 결과가 만료되었습니다. 다시 검색해주세요.")
 
-            keyword_matches = sum(1 for kw in keyword_match_terms if kw in text_lower or kw in title_lower)
-            keyword_boost_score = gamma * (matched_terms + keyword_matches)
+        offset, total_cached = page.pop("offset"), page.pop("total_cached")
+        print(f"📄 검색 결과 페이지 캐시 반환: {offset + 1}~{offset + len(page['results'])}위 / 전체 {total_cached}개")
+        return {
+            **page,
+            "total_results": len(page["results"]),
+            "usage_metadata": dict(CACHED_USAGE_METADATA)
+        }
 
-            # 수상도 부스터 점수 계산 (높은 순위의 수상일수록 높은 가중치 적용)
-            award_boost_score = 0.0
-            doc_award = doc.metadata.get("award", "")
-            if doc_award in award_weights:
-                award_boost_score = award_weights[doc_award]  # 대통령상: 0.15, 국무총리상: 0.12, 최우수상: 0.10, 특상: 0.08, 우수상: 0.06, 장려상: 0.04
+    @staticmethod
+    def semantic_cache_guard(query: str) -> Tuple[str, ...]:
+        """의미 캐시 적중 조건 - 연도, 분야, 수상, 저자/지도교사가 다른 쿼리는 임베딩이 가까워도 다른 결과가 필요하므로 모두 같아야 함
 
-            metadata_boost = 0.0
-            if metadata_filters:
-                for key, val in metadata_filters.items():
-                    doc_val = str(doc.metadata.get(key, '')).strip()
-                    if doc_val == val:
-                        metadata_boost += metadata_weight_table.get(key, 0.05)
-
-            matched_terms += keyword_matches
-            total_score = (
-                (content_score + alpha * title_score)
-                + section_boost_score
-                + keyword_boost_score
-                + award_boost_score  # 수상도 부스터 점수 추가
-                + metadata_boost
-            )
+        SEMANTIC_CACHE가 켜져 있을 때만 호출되며, LOCAL_QUERY_ANALYZER 설정과 관계없이 로컬 분석기의 분야/이름 목록 사용
+        """
+        return SearchService.get_local_query_analyzer().metadata_terms(SearchService.normalize_query(query))
 
-            score_info = {
-                'content_score': content_score,        # 내용 유사도 점수 (0~1)
-                'title_score': title_score,            # 제목 유사도 점수 (0~1)
-                'alpha': alpha,                        # 제목 가중치 계수
-                'section_boost_score': section_boost_score,  # 섹션 부스터 점수 (1순위: 0.08, 2순위: 0.04, 3순위: 0.01)
-                'keyword_boost_score': keyword_boost_score,  # 키워드 매칭 부스터 점수
-                'award_boost_score': award_boost_score,  # 수상도 부스터 점수 (대통령상: 0.15, 국무총리상: 0.12, 최우수상: 0.10, 특상: 0.08, 우수상: 0.06, 장려상: 0.04)
-                'metadata_boost': metadata_boost,      # 메타데이터 매칭 부스터 점수
-                'matched_terms': matched_terms,        # 매칭된 키워드 개수
-                'simplified_matches': simplified_matches,  # 요약 쿼리 매칭 개수
-                'original_matches': original_matches,  # 원본 쿼리 매칭 개수
-                'total_score': total_score,            # 최종 점수
-                'calculation': f"({content_score:.4f} + {alpha} × {title_score:.4f}) + {section_boost_score:.4f} + {keyword_boost_score:.4f} + {award_boost_score:.4f} + {metadata_boost:.4f} = {total_score:.4f}"
-            }
+    @staticmethod
+    async def search_from_semantic_cache(query: str, query_embedding, k: int, user_id: Optional[str], logger_service: Optional[LoggerService], is_hidden: bool, auth_token: Optional[str]) -> Optional[Dict[str, Any]]:
+        """의미 캐시에 가까운 이전 쿼리가 있으면 그 분석 결과와 재정렬 결과로 응답 (Gemini / 벡터 검색 없음)"""
+        cached, similarity = _semantic_cache.get(query_embedding, SearchService.semantic_cache_guard(query))
+        if cached is None:
+            return None
 
-            reranked_results.append((doc, total_score, score_info))
+        stats = _semantic_cache.stats()
+        print(f"⚡ 의미 캐시 적중: '{query}' ≈ '{cached['query']}' (유사도 {similarity:.4f}, 적중률 {stats['hit_rate']:.1%})")
+
+        if logger_service:
+            try:
+                await logger_service.log_ai_usage(
+                    user_id=user_id,
+                    service_name="query_summary",
+                    request_prompt=query,
+                    request_token_count=0,
+                    response_token_count=0,
+                    total_token_count=0,
+                    is_hidden=is_hidden,
+                    auth_token=auth_token
+                )
+            except Exception as log_error:
+                print(f"❌ 로깅 중 오류: {log_error}")
+
+        # 첫 페이지만 응답 형식으로 변환 (score_info는 복사되므로 캐시된 값은 변경되지 않음)
+        ranked = cached["results"]
+        results = SearchService.format_results(ranked[:k], k)
+        response_data = {
+            "query": query,
+            "summary_query": cached["summary_query"],
+            "priority_sections": list(cached["priority_sections"]),
+            "metadata_filters": dict(cached["metadata_filters"])
+        }
+        next_cursor = SearchService.save_search_pages(user_id, response_data, ranked, len(results))
+        response_data.update({
+            "total_results": len(results),
+            "results": results,
+            "usage_metadata": {**CACHED_USAGE_METADATA, "semantic_cache_similarity": round(similarity, 4)},
+            "next_cursor": next_cursor
+        })
+        return response_data
+
+    @staticmethod
+    def get_semantic_cache_stats() -> Dict[str, Any]:
+        """의미 캐시 크기 및 적중률 통계"""
+        return _semantic_cache.stats()
 
-        reranked_results.sort(key=lambda x: x[1], reverse=True)
-        return reranked_results
-    
     @staticmethod
-    async def search_documents(query: str, k: int = 10, user_id: Optional[str] = None, logger_service: Optional[LoggerService] = None, is_hidden: bool = False, auth_token: Optional[str] = None) -> Dict[str, Any]:
-        """문서 검색 처리"""
+    def get_search_page_stats() -> Dict[str, Any]:
+        """검색 결과 페이지 캐시 통계 (사용자 수 기준)"""
+        return _search_page_cache.stats()
+
+    @staticmethod
+    async def rank_candidates(query: str, k: int, user_id: Optional[str], embedding_model, vectorstore, query_embedding, candidates: List[Dict[str, Any]],
+                              applied_filters: Dict[str, str], summary_query: str, priority_sections: List[str], keyword_terms: List[str],
+                              metadata_filters: Dict[str, str], usage_metadata: Dict, original_embedding=None,
+                              save_pages: bool = True) -> Tuple[Dict[str, Any], List[Tuple[Any, float, Dict[str, Any]]]]:
+        """벡터 검색 후보를 어휘 검색과 결합 → 보고서 단위 집계 → 재정렬하여 (응답 데이터, 다음 페이지용 전체 재정렬 결과) 반환
+
+        save_pages가 False면 다음 페이지를 보관하지 않음 (배치 검색은 모든 쿼리 결과를 한 항목으로 보관)
+        """
+        # 어휘(BM25) 검색 결과와 결합 - 저자명, 학명, 화학물질명 등 정확한 용어 검색 보완
+        if SEARCH_HYBRID and _keyword_index is not None:
+            lexical_query = " ".join([query, summary_query] + keyword_terms)
+            lexical_candidates = await asyncio.to_thread(SearchService.lexical_search, vectorstore, lexical_query, SEARCH_LEXICAL_K)
+            if applied_filters:
+                lexical_candidates = [c for c in lexical_candidates if SearchService.matches_filters(c["document"].metadata, applied_filters)]
+            # 재정렬 대상은 아래에서 보고서 단위로 줄어들므로 결합 단계에서는 후보를 자르지 않음
+            candidates = SearchService.fuse_candidates([candidates, lexical_candidates], len(candidates) + len(lexical_candidates))
+            print(f"✅ 하이브리드 결합 완료: 어휘 검색 {len(lexical_candidates)}개 → 후보 {len(candidates)}개")
+
+        # 보고서 단위 집계 - 보고서별 대표 청크만 재정렬
+        chunk_count = len(candidates)
+        candidates = SearchService.aggregate_by_report(candidates, query_embedding)
+        print(f"✅ 보고서 단위 집계 완료: 청크 {chunk_count}개 → 보고서 {len(candidates)}개 ({SEARCH_REPORT_POOLING})")
+
+        # 재정렬
+        reranked = SearchService.rerank_with_weights(
+            query_embedding,
+            [c["document"] for c in candidates],
+            embedding_model,
+            priority_sections,
+            summary_query,
+            query,
+            keyword_terms,
+            WEIGHT_CONFIG,
+            metadata_filters,
+            doc_vectors=[c["embedding"] for c in candidates],
+            chunk_ids=[c["id"] for c in candidates],
+            content_scores=[c["report_score"] for c in candidates]
+        )
+
+        # 중복 number 제거 후 첫 페이지만 응답 형식으로 변환 - 다음 페이지용 결과는 재정렬 결과 그대로 보관하고 요청 시 변환
+        ranked = SearchService.dedupe_reranked(reranked, max(k, SEARCH_PAGE_MAX_RESULTS))
+        results = SearchService.format_results(ranked[:k], k)
+
+        response_data = {
+            "query": query,
+            "summary_query": summary_query,
+            "priority_sections": priority_sections,
+            "metadata_filters": metadata_filters,
+            # "intent": intent,
+        }
+        next_cursor = SearchService.save_search_pages(user_id, response_data, ranked, len(results)) if save_pages else None
+        if original_embedding is not None:
+            _semantic_cache.set(
+                original_embedding,
+                {**response_data, "results": ranked},
+                SearchService.semantic_cache_guard(query)
+            )
+        response_data.update({
+            "total_results": len(results),
+            "results": results,
+            "usage_metadata": usage_metadata,
+            "next_cursor": next_cursor
+        })
+        return response_data, ranked
+
+    @staticmethod
+    async def search_documents(query: str, k: int = 10, user_id: Optional[str] = None, logger_service: Optional[LoggerService] = None, is_hidden: bool = False, auth_token: Optional[str] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """문서 검색 처리 (cursor가 주어지면 이전 검색의 다음 페이지를 캐시에서 반환)"""
         try:
+            if cursor:
+                return SearchService.get_search_page(cursor, k, user_id)
+
             print(f"🔍 검색 요청 받음: {query}")
             query = query.strip()
 
@@ -359,9 +1170,33 @@ class SearchService:
 
             print(f"🔧 모델 초기화 시작...")
             # 모델 초기화
-            embedding_model, vectorstore = SearchService.initialize_models()
+            embedding_model, vectorstore = await asyncio.to_thread(SearchService.initialize_models)
             print(f"✅ 모델 초기화 완료")
 
+            initial_search_k = k * 5
+            max_search_k = k * SEARCH_MAX_FETCH_MULTIPLIER
+
+            # 의미 캐시 조회 (원본 쿼리 임베딩은 캐시되어 아래 추측 검색에서 재사용)
+            original_embedding = None
+            if SEMANTIC_CACHE:
+                original_embedding = await SearchService.embed_query_batched(embedding_model, query)
+                cached_response = await SearchService.search_from_semantic_cache(
+                    query, original_embedding, k, user_id, logger_service, is_hidden, auth_token
+                )
+                if cached_response is not None:
+                    return cached_response
+
+            # 쿼리 분석(LLM)을 기다리는 동안 원본 쿼리로 벡터 검색을 먼저 시작
+            # 2단계 검색은 보고서 요약 컬렉션을 먼저 검색하므로 전체 청크 대상 추측 검색을 하지 않음
+            two_stage = _summary_collection is not None
+            speculative_task = None
+            if SEARCH_SPECULATIVE and not two_stage:
+                speculative_task = asyncio.create_task(
+                    SearchService.vector_search(embedding_model, vectorstore, query, initial_search_k)
+                )
+                # 요약 쿼리 생성 실패 등으로 결과를 쓰지 않는 경우에도 예외가 소비되도록 처리
+                speculative_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
             print(f"🧠 쿼리 분석 시작...")
             # 쿼리 분석
             summary_query, priority_sections, keyword_terms, metadata_filters, usage_metadata = await SearchService.analyze_user_query(query, user_id, logger_service, is_hidden, auth_token)
@@ -372,79 +1207,39 @@ class SearchService:
                 raise HTTPException(status_code=500, detail="요약 쿼리 생성에 실패했습니다.")
 
             print(f"🔍 벡터 검색 시작...")
-            # 벡터 검색
-            initial_search_k = k * 5
-            raw_results = vectorstore.similarity_search_with_score(summary_query, k=initial_search_k)
-            raw_documents = [doc for doc, _ in raw_results]
-            print(f"✅ 벡터 검색 완료: {len(raw_documents)}개 문서 발견")
-
-            # 메타데이터 필터 적용
+            # 벡터 검색 (저장된 청크 임베딩 포함) - 요약 쿼리 임베딩은 재정렬에도 그대로 사용
+            applied_filters = {}
             if metadata_filters:
-                filtered_documents = [doc for doc in raw_documents if all(str(doc.metadata.get(key, '')).strip() == val.strip() for key, val in metadata_filters.items())]
-                if len(filtered_documents) < k:
-                    filtered_documents = raw_documents
+                # 메타데이터 조건은 Chroma where 절로 넘겨 조건에 맞는 청크만 검색 (추측 검색 결과는 사용하지 않음)
+                query_embedding = await SearchService.embed_query_batched(embedding_model, summary_query)
+                candidates, applied_filters = await asyncio.to_thread(
+                    SearchService.filtered_vector_search,
+                    vectorstore, query_embedding, k * SEARCH_FILTERED_K_MULTIPLIER, metadata_filters, k, max_search_k
+                )
+                print(f"✅ 적용된 메타데이터 조건: {applied_filters}")
+            elif two_stage:
+                query_embedding = await SearchService.embed_query_batched(embedding_model, summary_query)
+                candidates = await asyncio.to_thread(
+                    SearchService.search_candidates,
+                    vectorstore, query_embedding, initial_search_k, k, max_search_k
+                )
             else:
-                filtered_documents = raw_documents
-
-            query_embedding = embedding_model.embed_query(summary_query)
-
-            # 재정렬
-            reranked = SearchService.rerank_with_weights(
-                query_embedding,
-                filtered_documents,
-                embedding_model,
-                priority_sections,
-                summary_query,
-                query,
-                keyword_terms,
-                WEIGHT_CONFIG,
-                metadata_filters
+                query_embedding, candidates = await SearchService.retrieve_after_analysis(
+                    embedding_model, vectorstore, summary_query, initial_search_k, speculative_task
+                )
+                # 긴 보고서 하나가 후보를 독차지하면 고유 보고서가 k개가 되도록 후보 확장
+                candidates = await asyncio.to_thread(
+                    SearchService.expand_for_reports,
+                    vectorstore, query_embedding, candidates, initial_search_k, k, max_search_k
+                )
+            print(f"✅ 벡터 검색 완료: {len(candidates)}개 문서 발견")
+
+            response_data, _ = await SearchService.rank_candidates(
+                query, k, user_id, embedding_model, vectorstore, query_embedding, candidates, applied_filters,
+                summary_query, priority_sections, keyword_terms, metadata_filters, usage_metadata, original_embedding
             )
+            results = response_data["results"]
 
-            # 결과 포맷팅 (중복 number 제거)
-            results = []
-            seen_numbers = set()
-            for i, (doc, score, score_info) in enumerate(reranked, 1):
-                number = str(doc.metadata.get('nttSn', 'N/A'))  # 항상 문자열로 변환
-                if number in seen_numbers:
-                    continue
-                seen_numbers.add(number)
-                
-                # 이미지 경로 가져오기
-                image_path = get_image_path_from_db(number)
-                
-                result = {
-                    'rank': len(results) + 1,
-                    'title': doc.metadata.get('title', 'N/A'),
-                    'section': doc.metadata.get('section', 'N/A'),
-                    'number': number,
-                    'metadata': {
-                        'field': doc.metadata.get('field', 'N/A'),
-                        'year': doc.metadata.get('year', 'N/A'),
-                        'award': doc.metadata.get('award', 'N/A'),
-                        'authors': doc.metadata.get('authors', 'N/A'),
-                        'teacher': doc.metadata.get('teacher', 'N/A'),
-                        'source_type': doc.metadata.get('source_type', 'N/A')
-                    },
-                    'score_info': score_info,
-                    'content': doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content,
-                    'image_path': image_path
-                }
-                results.append(result)
-                if len(results) >= k:
-                    break
-
-            response_data = {
-                "query": query,
-                "summary_query": summary_query,
-                "priority_sections": priority_sections,
-                "metadata_filters": metadata_filters,
-                # "intent": intent,
-                "total_results": len(results),
-                "results": results,
-                "usage_metadata": usage_metadata
-            }
-            
             print(f"🔍 API 응답 데이터:")
             # print(f"  - intent: '{intent}'")
             print(f"  - total_results: {len(results)}")
@@ -456,4 +1251,122 @@ class SearchService:
             raise
         except Exception as e:
             print(f"❌ 검색 중 오류: {e}")
-            raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}") 
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}") 
+
+    @staticmethod
+    async def search_documents_batch(queries: List[str], k: int = 10, user_id: Optional[str] = None, logger_service: Optional[LoggerService] = None, is_hidden: bool = False, auth_token: Optional[str] = None) -> Dict[str, Any]:
+        """여러 쿼리를 한 번에 검색 (쿼리 분석은 병렬, 요약 쿼리 임베딩은 한 배치, 조건 없는 벡터 검색은 한 번의 질의로 처리)
+
+        쿼리별 결과는 단건 검색 응답과 같은 형식이며, 실패한 쿼리는 error / status_code만 담아 반환
+        """
+        try:
+            queries = [query.strip() for query in queries]
+            if not queries or not all(queries):
+                raise HTTPException(status_code=400, detail="검색어를 입력해주세요.")
+            if len(queries) > SEARCH_BATCH_MAX_QUERIES:
+                raise HTTPException(status_code=400, detail=f"한 번에 최대 {SEARCH_BATCH_MAX_QUERIES}개의 쿼리까지 검색할 수 있습니다.")
+
+            # 같은 쿼리는 한 번만 검색
+            unique_queries = {}
+            for query in queries:
+                unique_queries.setdefault(SearchService.normalize_query(query), query)
+            query_keys = list(unique_queries)
+            print(f"🔍 배치 검색 요청 받음: {len(queries)}개 쿼리 (고유 {len(query_keys)}개)")
+
+            embedding_model, vectorstore = await asyncio.to_thread(SearchService.initialize_models)
+            initial_search_k = k * 5
+            max_search_k = k * SEARCH_MAX_FETCH_MULTIPLIER
+            two_stage = _summary_collection is not None
+
+            # 쿼리 분석 병렬 실행 (로컬 분석 / 분석 캐시 / 동일 쿼리 호출 합치기는 단건 검색과 동일하게 적용)
+            analyses = await asyncio.gather(*(
+                SearchService.analyze_user_query(unique_queries[key], user_id, logger_service, is_hidden, auth_token)
+                for key in query_keys
+            ))
+            print(f"✅ 배치 쿼리 분석 완료: {[analysis[0] for analysis in analyses]}")
+
+            # 요약 쿼리 임베딩을 한 배치로 계산
+            query_embeddings = await SearchService.embed_queries_batched(
+                embedding_model, [analysis[0] or unique_queries[key] for key, analysis in zip(query_keys, analyses)]
+            )
+
+            # 메타데이터 조건이 없는 쿼리는 한 번의 벡터 검색 질의로 처리
+            candidate_lists = {}
+            plain_indices = [] if two_stage else [i for i, analysis in enumerate(analyses) if analysis[0] and not analysis[3]]
+            if plain_indices:
+                batch_candidates = await asyncio.to_thread(
+                    SearchService.query_candidates_batch,
+                    vectorstore, [query_embeddings[i] for i in plain_indices], initial_search_k
+                )
+                candidate_lists.update(zip(plain_indices, batch_candidates))
+                print(f"✅ 배치 벡터 검색 완료: {len(plain_indices)}개 쿼리")
+
+            async def search_one(index: int) -> Dict[str, Any]:
+                query = unique_queries[query_keys[index]]
+                summary_query, priority_sections, keyword_terms, metadata_filters, usage_metadata = analyses[index]
+                if not summary_query:
+                    raise HTTPException(status_code=500, detail="요약 쿼리 생성에 실패했습니다.")
+
+                query_embedding = query_embeddings[index]
+                applied_filters = {}
+                if metadata_filters:
+                    candidates, applied_filters = await asyncio.to_thread(
+                        SearchService.filtered_vector_search,
+                        vectorstore, query_embedding, k * SEARCH_FILTERED_K_MULTIPLIER, metadata_filters, k, max_search_k
+                    )
+                elif two_stage:
+                    candidates = await asyncio.to_thread(
+                        SearchService.search_candidates,
+                        vectorstore, query_embedding, initial_search_k, k, max_search_k
+                    )
+                else:
+                    candidates = await asyncio.to_thread(
+                        SearchService.expand_for_reports,
+                        vectorstore, query_embedding, candidate_lists[index], initial_search_k, k, max_search_k
+                    )
+
+                return await SearchService.rank_candidates(
+                    query, k, user_id, embedding_model, vectorstore, query_embedding, candidates, applied_filters,
+                    summary_query, priority_sections, keyword_terms, metadata_filters, usage_metadata, save_pages=False
+                )
+
+            outcomes = await asyncio.gather(*(search_one(i) for i in range(len(query_keys))), return_exceptions=True)
+
+            # 성공한 쿼리들의 다음 페이지는 배치 하나를 한 항목으로 보관 (배치 크기와 관계없이 사용자의 이전 커서를 밀어내지 않음)
+            succeeded = [(key, outcome) for key, outcome in zip(query_keys, outcomes) if not isinstance(outcome, Exception)]
+            cursors = _search_page_cache.save(user_id, [
+                ({field: response_data[field] for field in ("query", "summary_query", "priority_sections", "metadata_filters")},
+                 ranked, response_data["total_results"])
+                for _, (response_data, ranked) in succeeded
+            ])
+            for (_, (response_data, _)), next_cursor in zip(succeeded, cursors):
+                response_data["next_cursor"] = next_cursor
+
+            # 한 쿼리의 실패가 배치 전체를 실패시키지 않도록 쿼리별 오류로 기록
+            responses = {}
+            for key, outcome in zip(query_keys, outcomes):
+                if isinstance(outcome, Exception):
+                    if isinstance(outcome, HTTPException):
+                        status_code, detail = outcome.status_code, outcome.detail
+                    else:
+                        status_code, detail = 500, f"검색 중 오류가 발생했습니다: {str(outcome)}"
+                    print(f"❌ 배치 검색 중 오류 ({unique_queries[key]}): {detail}")
+                    outcome = {"query": unique_queries[key], "error": detail, "status_code": status_code}
+                else:
+                    outcome = outcome[0]
+                responses[key] = outcome
+
+            results = [responses[SearchService.normalize_query(query)] for query in queries]
+            print(f"🔍 배치 검색 완료: {len(results)}개 쿼리, 실패 {sum('error' in result for result in results)}개")
+            print("-" * 50)
+
+            return {
+                "total_queries": len(results),
+                "results": results
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"❌ 배치 검색 중 오류: {e}")
+            raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
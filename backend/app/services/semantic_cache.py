@@ -0,0 +1,117 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """쿼리 임베딩의 cosine 유사도로 조회하는 LRU 캐시
+
+    - 정규화된 벡터를 (max_entries, dim) 행렬에 보관하고 조회 시 행렬 곱 한 번으로 가장 가까운 항목을 찾음
+      (수천 개 규모에서는 근사 인덱스 없이 완전 탐색이 더 빠르고 정확함)
+    - 유사도가 threshold 이상이고 guard(예: 쿼리 속 숫자)가 같을 때만 적중
+    - 가득 차면 가장 오래 사용되지 않은 항목의 자리를 재사용
+    """
+
+    def __init__(self, max_entries: int = 2048, threshold: float = 0.95, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._vectors: Optional[np.ndarray] = None        # (max_entries, dim) float32, 첫 저장 시 할당
+        self._valid = np.zeros(max(0, max_entries), dtype=bool)
+        self._entries = OrderedDict()                      # slot -> (만료 시각, guard, 값), LRU 순서
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.hit_similarity_sum = 0.0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _remove(self, slot: int):
+        del self._entries[slot]
+        self._valid[slot] = False
+
+    def get(self, vector, guard: Hashable = None) -> Tuple[Optional[Any], float]:
+        """가장 유사한 항목의 값과 유사도를 반환 (threshold 미만이거나 guard가 다르면 값은 None)"""
+        with self._lock:
+            if self._vectors is None or not self._entries:
+                self.misses += 1
+                return None, 0.0
+
+            similarities = self._vectors @ self._normalize(vector)
+            similarities[~self._valid] = -1.0
+            now = time.monotonic()
+            for slot in np.argsort(-similarities):
+                slot = int(slot)
+                similarity = float(similarities[slot])
+                if similarity < self.threshold:
+                    break
+                expires_at, entry_guard, value = self._entries[slot]
+                if expires_at is not None and expires_at <= now:
+                    self._remove(slot)
+                    self.expirations += 1
+                    continue
+                if entry_guard != guard:
+                    continue
+                self._entries.move_to_end(slot)
+                self.hits += 1
+                self.hit_similarity_sum += similarity
+                return value, similarity
+
+            self.misses += 1
+            return None, float(similarities.max())
+
+    def set(self, vector, value: Any, guard: Hashable = None):
+        """항목 저장 (용량 초과 시 LRU 항목 자리에 덮어씀)"""
+        if self.max_entries <= 0:
+            return
+        vector = self._normalize(vector)
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            free_slots = np.flatnonzero(~self._valid)
+            if len(free_slots):
+                slot = int(free_slots[0])
+            else:
+                slot = next(iter(self._entries))
+                self._remove(slot)
+                self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._entries[slot] = (expires_at, guard, value)
+
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._valid[:] = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 크기, 적중률, 적중 시 평균 유사도"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / total if total else 0.0,
+            "avg_hit_similarity": self.hit_similarity_sum / self.hits if self.hits else 0.0
+        }
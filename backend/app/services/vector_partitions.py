@@ -0,0 +1,204 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 파티션 목록 파일 (Chroma DB 폴더 또는 벡터 스냅샷 폴더에 저장)
+PARTITION_MANIFEST_FILE = "partitions.json"
+
+# 조건 없는 검색 시 파티션을 병렬로 조회할 스레드 수
+VECTOR_PARTITION_WORKERS = int(os.getenv("VECTOR_PARTITION_WORKERS", "8"))
+
+# 연도가 없는 청크가 들어가는 파티션 값
+UNKNOWN_PARTITION_VALUE = "unknown"
+
+_executor = None
+
+
+def partition_value(value: Any) -> str:
+    """메타데이터 값을 파티션 비교용 문자열로 변환 (문자열/정수 저장 형태 통일)"""
+    value = str(value).strip() if value is not None else ""
+    return value or UNKNOWN_PARTITION_VALUE
+
+
+def partition_name(base_name: str, year: str, field: Optional[str] = None) -> str:
+    """파티션 컬렉션 이름 (Chroma 컬렉션 이름 규칙상 한글 분야명은 해시로 표기)"""
+    name = f"{base_name}_y{year}"
+    if field is not None:
+        name += f"_f{hashlib.sha1(field.encode('utf-8')).hexdigest()[:8]}"
+    return name
+
+
+def partition_keys(metadata: Dict[str, Any], partition_by: List[str]) -> Dict[str, str]:
+    """청크 메타데이터에서 파티션 키 값 추출 (예: {"year": "2023", "field": "물리"})"""
+    return {key: partition_value(metadata.get(key)) for key in partition_by}
+
+
+def load_partition_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    """파티션 목록 읽기 (분할하지 않은 인덱스면 None)"""
+    manifest_path = os.path.join(directory, PARTITION_MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_partition_manifest(directory: str, base_name: str, partition_by: List[str], partitions: List[Dict[str, Any]]):
+    """파티션 목록 저장 (partitions: name / 키 값 / count / built_at)"""
+    manifest = {
+        "base_collection": base_name,
+        "partition_by": partition_by,
+        "partitions": sorted(partitions, key=lambda p: p["name"]),
+        "updated_at": datetime.now().isoformat()
+    }
+    with open(os.path.join(directory, PARTITION_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def allowed_values(where: Optional[Dict[str, Any]], key: str) -> Optional[Set[str]]:
+    """where 절이 key에 대해 허용하는 값 집합 (key를 제한하지 않으면 None)
+
+    {key: v}, {key: {"$eq": v}}, {key: {"$in": [...]}}, 모든 분기가 key를 제한하는 $or, $and를 해석
+    """
+    if not where:
+        return None
+
+    allowed = None
+    for clause_key, value in where.items():
+        if clause_key == "$and":
+            values = [allowed_values(condition, key) for condition in value]
+        elif clause_key == "$or":
+            branches = [allowed_values(condition, key) for condition in value]
+            values = [None if any(branch is None for branch in branches) else set().union(*branches)]
+        elif clause_key == key:
+            if not isinstance(value, dict):
+                values = [{partition_value(value)}]
+            elif "$eq" in value:
+                values = [{partition_value(value["$eq"])}]
+            elif "$in" in value:
+                values = [{partition_value(v) for v in value["$in"]}]
+            else:
+                values = [None]
+        else:
+            continue
+
+        for constrained in values:
+            if constrained is not None:
+                allowed = constrained if allowed is None else allowed & constrained
+    return allowed
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=VECTOR_PARTITION_WORKERS, thread_name_prefix="vector-partition")
+    return _executor
+
+
+class PartitionedCollection:
+    """연도(/분야)별 파티션 컬렉션을 하나의 컬렉션처럼 제공 (Chroma 컬렉션의 query / get / count와 같은 형식)
+
+    - where 절에 연도/분야 조건이 있으면 해당 파티션만 조회 (파티션 가지치기)
+    - 조건이 없으면 모든 파티션을 병렬로 조회하고 거리 기준으로 상위 n_results개 병합
+    """
+
+    def __init__(self, client, manifest: Dict[str, Any]):
+        self.partition_by = manifest["partition_by"]
+        self.partitions = [p for p in manifest["partitions"] if p.get("count", 0) > 0]
+        self.collections = {p["name"]: client.get_collection(name=p["name"]) for p in self.partitions}
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self.collections.values())
+
+    def select(self, where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """where 절 조건에 맞는 파티션 목록"""
+        selected = self.partitions
+        for key in self.partition_by:
+            values = allowed_values(where, key)
+            if values is not None:
+                selected = [p for p in selected if p[key] in values]
+        return selected
+
+    def _fan_out(self, partitions: List[Dict[str, Any]], call):
+        """파티션별 호출 (2개 이상이면 스레드 풀에서 병렬 실행)"""
+        if len(partitions) <= 1:
+            return [call(self.collections[p["name"]], p) for p in partitions]
+        return list(get_executor().map(lambda p: call(self.collections[p["name"]], p), partitions))
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None, include: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        include = list(include or ["metadatas", "documents", "distances"])
+        partitions = self.select(where)
+        if len(partitions) < len(self.partitions):
+            print(f"🗂️ 파티션 가지치기: {len(partitions)}/{len(self.partitions)}개 파티션 검색")
+
+        # 병합에 거리가 필요하므로 항상 포함해서 조회
+        request_include = include if "distances" in include else include + ["distances"]
+        results = self._fan_out(partitions, lambda collection, partition: collection.query(
+            query_embeddings=query_embeddings,
+            n_results=min(n_results, partition["count"]),
+            where=where,
+            include=request_include,
+            **kwargs
+        ))
+
+        merged = {"ids": [], "included": include}
+        for key in include:
+            merged[key] = []
+        for query_index in range(len(query_embeddings)):
+            rows = []
+            for result in results:
+                for i in range(len(result["ids"][query_index])):
+                    rows.append((result["distances"][query_index][i], result, i))
+            rows.sort(key=lambda row: row[0])
+            rows = rows[:n_results]
+
+            merged["ids"].append([result["ids"][query_index][i] for _, result, i in rows])
+            for key in include:
+                merged[key].append([result[key][query_index][i] for _, result, i in rows])
+        return merged
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None, limit: Optional[int] = None, offset: Optional[int] = None, include: Optional[List[str]] = None, **kwargs) -> Dict[str, Any]:
+        include = list(include or ["metadatas", "documents"])
+        results = self._fan_out(self.select(where), lambda collection, partition: collection.get(
+            ids=ids, where=where, include=include, **kwargs
+        ))
+
+        merged = {"ids": [], "included": include}
+        for key in include:
+            merged[key] = []
+        for result in results:
+            merged["ids"].extend(result["ids"])
+            for key in include:
+                merged[key].extend(result[key])
+
+        start = offset or 0
+        end = start + limit if limit is not None else None
+        merged["ids"] = merged["ids"][start:end]
+        for key in include:
+            merged[key] = merged[key][start:end]
+        return merged
+
+
+class PartitionedVectorStore:
+    """search_service가 사용하는 vectorstore._collection / vectorstore._client.get_collection 인터페이스 제공
+
+    청크 컬렉션 이름은 파티션 전체를, 그 밖의 이름(제목 / 보고서 요약 컬렉션)은 원래 클라이언트의 컬렉션을 반환
+    """
+
+    def __init__(self, client, collection_name: str, manifest: Dict[str, Any]):
+        self.client = client
+        self.collection_name = collection_name
+        self.manifest = manifest
+        self._collection = PartitionedCollection(client, manifest)
+        self._client = self
+
+    def get_collection(self, name: str):
+        if name == self.collection_name:
+            return self._collection
+        return self.client.get_collection(name=name)
@@ -0,0 +1,336 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# 환경 변수 로드
+load_dotenv()
+
+# 벡터 인덱스 백엔드 ("chroma": Chroma DB 디렉토리, "snapshot": export_vector_snapshot.py로 만든 mmap 스냅샷)
+VECTORSTORE_BACKEND = os.getenv("VECTORSTORE_BACKEND", "chroma").strip().strip("'\"").lower()
+
+# 스냅샷 파일 구성 (컬렉션별 하위 폴더)
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"   # (N, D) float32 또는 float16, np.load(mmap_mode="r")로 공유
+SQ_NORMS_FILE = "sq_norms.npy"       # (N,) float32, 제곱 L2 거리 계산용
+ITEMS_FILE = "items.sqlite"          # row / id / document / metadata(JSON)
+HNSW_FILE = "hnsw.bin"               # 선택: hnswlib 근사 최근접 이웃 인덱스
+QUANTIZED_FILE = "quantized.npy"     # 선택: 후보 검색용 압축 벡터 (float16 또는 int8)
+SCALES_FILE = "scales.npy"           # int8 압축 시 벡터별 스케일 (N,) float32
+
+# 압축 벡터로 후보를 고른 뒤 (n_results × 배수)개를 전체 정밀도 벡터로 다시 채점
+SNAPSHOT_QUANTIZED_SEARCH = os.getenv("SNAPSHOT_QUANTIZED_SEARCH", "true").lower() == "true"
+SNAPSHOT_RESCORE_FACTOR = int(os.getenv("SNAPSHOT_RESCORE_FACTOR", "4"))
+
+# 완전 탐색 시 한 번에 처리할 행 수 (float16 → float32 변환 메모리 제한)
+SCAN_BLOCK_ROWS = 16384
+
+# where 절 비교 연산자 → SQL
+WHERE_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def where_to_sql(where: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Chroma where 절을 metadata JSON 컬럼에 대한 SQL 조건으로 변환 (값 타입까지 일치해야 매칭)"""
+    clauses, params = [], []
+    for key, value in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_to_sql(condition) for condition in value]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+            for _, part_params in parts:
+                params.extend(part_params)
+            continue
+
+        column = "json_extract(metadata, ?)"
+        path = f'$."{key}"'
+        conditions = value if isinstance(value, dict) else {"$eq": value}
+        for operator, operand in conditions.items():
+            if operator in ("$in", "$nin"):
+                placeholders = ", ".join("?" for _ in operand)
+                negate = "NOT " if operator == "$nin" else ""
+                clauses.append(f"{column} {negate}IN ({placeholders})")
+                params.extend([path, *operand])
+            elif operator in WHERE_OPERATORS:
+                clauses.append(f"{column} {WHERE_OPERATORS[operator]} ?")
+                params.extend([path, operand])
+            else:
+                raise ValueError(f"지원하지 않는 where 연산자입니다: {operator}")
+
+    return " AND ".join(clauses) or "1", params
+
+
+class SnapshotCollection:
+    """읽기 전용 벡터 스냅샷 컬렉션 (Chroma 컬렉션의 query / get / count와 같은 형식으로 응답)
+
+    - 벡터 행렬은 mmap으로 열어 여러 워커 프로세스가 같은 물리 페이지를 공유
+    - ID / 본문 / 메타데이터는 읽기 전용 SQLite에서 필요한 행만 조회
+    - hnsw.bin이 있고 hnswlib가 설치되어 있으면 조건 없는 검색에 근사 인덱스 사용
+    - quantized.npy가 있으면 압축 벡터로 후보를 고르고 상위 후보만 전체 정밀도로 재채점
+    """
+
+    def __init__(self, collection_dir: str, use_hnsw: bool = True, use_quantized: bool = SNAPSHOT_QUANTIZED_SEARCH):
+        self.collection_dir = collection_dir
+        self.embeddings = np.load(os.path.join(collection_dir, EMBEDDINGS_FILE), mmap_mode="r")
+        self.sq_norms = np.load(os.path.join(collection_dir, SQ_NORMS_FILE), mmap_mode="r")
+        self.items_path = os.path.join(collection_dir, ITEMS_FILE)
+        self._local = threading.local()
+
+        self.quantized = None
+        self.scales = None
+        quantized_path = os.path.join(collection_dir, QUANTIZED_FILE)
+        if use_quantized and os.path.exists(quantized_path):
+            self.quantized = np.load(quantized_path, mmap_mode="r")
+            scales_path = os.path.join(collection_dir, SCALES_FILE)
+            if os.path.exists(scales_path):
+                self.scales = np.load(scales_path, mmap_mode="r")
+
+        self.hnsw = None
+        hnsw_path = os.path.join(collection_dir, HNSW_FILE)
+        if use_hnsw and os.path.exists(hnsw_path):
+            try:
+                import hnswlib
+
+                self.hnsw = hnswlib.Index(space="l2", dim=self.embeddings.shape[1])
+                self.hnsw.load_index(hnsw_path, max_elements=self.embeddings.shape[0])
+            except ImportError:
+                print(f"⚠️ hnswlib가 설치되어 있지 않아 완전 탐색을 사용합니다: {collection_dir}")
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.items_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def count(self) -> int:
+        return int(self.embeddings.shape[0])
+
+    def _rows_matching(self, where: Dict[str, Any]) -> np.ndarray:
+        sql, params = where_to_sql(where)
+        rows = self._db().execute(f"SELECT row FROM items WHERE {sql}", params).fetchall()
+        return np.array([row for (row,) in rows], dtype=np.int64)
+
+    def _scan(self, query_vector: np.ndarray, rows: Optional[np.ndarray], n_results: int, quantized: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """제곱 L2 거리 기준 완전 탐색 (Chroma 기본 l2 공간과 같은 거리, quantized면 압축 벡터로 근사)"""
+        matrix = self.quantized if quantized else self.embeddings
+        scales = self.scales if quantized else None
+        total = self.count() if rows is None else len(rows)
+        query_sq_norm = float(query_vector @ query_vector)
+        distances = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, total)
+            block_rows = slice(start, end) if rows is None else rows[start:end]
+            dots = np.asarray(matrix[block_rows], dtype=np.float32) @ query_vector
+            if scales is not None:
+                dots *= scales[block_rows]
+            distances[start:end] = self.sq_norms[block_rows] + query_sq_norm - 2.0 * dots
+
+        k = min(n_results, total)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind="stable")]
+        result_rows = top if rows is None else rows[top]
+        return result_rows.astype(np.int64), np.maximum(distances[top], 0.0)
+
+    def _search(self, query_vector: np.ndarray, n_results: int, where: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        rows = self._rows_matching(where) if where else None
+        if rows is None and self.hnsw is not None:
+            k = min(n_results, self.count())
+            self.hnsw.set_ef(max(k * 2, 64))
+            labels, distances = self.hnsw.knn_query(query_vector, k=k)
+            return labels[0].astype(np.int64), distances[0]
+        if self.quantized is not None:
+            return self.rescored_search(query_vector, rows, n_results)
+        return self._scan(query_vector, rows, n_results)
+
+    def rescored_search(self, query_vector: np.ndarray, rows: Optional[np.ndarray], n_results: int, rescore_factor: int = SNAPSHOT_RESCORE_FACTOR) -> Tuple[np.ndarray, np.ndarray]:
+        """압축 벡터로 (n_results × rescore_factor)개 후보를 고른 뒤 전체 정밀도 벡터로 재채점"""
+        candidate_rows, _ = self._scan(query_vector, rows, n_results * max(1, rescore_factor), quantized=True)
+        # 디스크(mmap) 접근 지역성을 위해 행 번호 순으로 읽음
+        return self._scan(query_vector, np.sort(candidate_rows), n_results)
+
+    def _fetch(self, rows: List[int], include: List[str]) -> Dict[str, List[Any]]:
+        """행 번호 순서대로 ID / 본문 / 메타데이터 / 벡터 조회"""
+        by_row = {}
+        for start in range(0, len(rows), 900):
+            batch = rows[start:start + 900]
+            placeholders = ", ".join("?" for _ in batch)
+            for row, item_id, document, metadata in self._db().execute(
+                f"SELECT row, id, document, metadata FROM items WHERE row IN ({placeholders})", batch
+            ):
+                by_row[row] = (item_id, document, metadata)
+
+        rows = [row for row in rows if row in by_row]
+        return {
+            "ids": [by_row[row][0] for row in rows],
+            "documents": [by_row[row][1] for row in rows] if "documents" in include else None,
+            "metadatas": [json.loads(by_row[row][2]) if by_row[row][2] else None for row in rows] if "metadatas" in include else None,
+            "embeddings": [np.asarray(self.embeddings[row], dtype=np.float32) for row in rows] if "embeddings" in include else None,
+            "rows": rows
+        }
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None,
+              include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = include or ["metadatas", "documents", "distances"]
+        results = {"ids": [], "documents": [], "metadatas": [], "embeddings": [], "distances": []}
+        for query_embedding in query_embeddings:
+            rows, distances = self._search(np.asarray(query_embedding, dtype=np.float32), n_results, where)
+            distance_by_row = dict(zip(rows.tolist(), distances.tolist()))
+            fetched = self._fetch(rows.tolist(), include)
+            for key in ("ids", "documents", "metadatas", "embeddings"):
+                results[key].append(fetched[key])
+            results["distances"].append([distance_by_row[row] for row in fetched["rows"]])
+
+        for key in ("documents", "metadatas", "embeddings", "distances"):
+            if key not in include:
+                results[key] = None
+        results["included"] = include
+        return results
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            include: Optional[List[str]] = None, limit: Optional[int] = None, offset: Optional[int] = None) -> Dict[str, Any]:
+        include = include or ["metadatas", "documents"]
+        sql, params = where_to_sql(where or {})
+        if ids is not None:
+            sql += f" AND id IN ({', '.join('?' for _ in ids)})"
+            params.extend(ids)
+        sql += " ORDER BY row"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset or 0])
+
+        rows = [row for (row,) in self._db().execute(f"SELECT row FROM items WHERE {sql}", params)]
+        fetched = self._fetch(rows, include)
+        del fetched["rows"]
+        fetched["included"] = include
+        return fetched
+
+
+class SnapshotVectorStore:
+    """search_service가 사용하는 vectorstore._collection / vectorstore._client.get_collection 인터페이스 제공"""
+
+    def __init__(self, snapshot_dir: str, collection_name: Optional[str], use_hnsw: bool = True):
+        manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"벡터 스냅샷 '{manifest_path}'가 없습니다. scripts/export_vector_snapshot.py로 먼저 생성해주세요.")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+        self.snapshot_dir = snapshot_dir
+        self.use_hnsw = use_hnsw
+        self._collections = {}
+        # 파티션 스냅샷은 청크 컬렉션이 여러 개이므로 collection_name 없이 열고 get_collection으로 조회
+        self._collection = self.get_collection(collection_name) if collection_name else None
+        self._client = self
+
+    def get_collection(self, name: str) -> SnapshotCollection:
+        if name not in self._collections:
+            if name not in self.manifest["collections"]:
+                raise ValueError(f"스냅샷에 '{name}' 컬렉션이 없습니다.")
+            self._collections[name] = SnapshotCollection(os.path.join(self.snapshot_dir, name), self.use_hnsw)
+        return self._collections[name]
+
+
+def quantize_int8(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """벡터별 스케일(최대 절댓값 / 127)로 int8 대칭 양자화"""
+    scales = np.abs(block).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(block / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def export_collection(collection, output_dir: str, dtype: str = "float32", build_hnsw: bool = False, page_size: int = 1000,
+                      quantize: Optional[str] = None) -> Dict[str, Any]:
+    """Chroma 컬렉션을 읽기 전용 스냅샷(벡터 .npy + SQLite + 선택적 hnswlib 인덱스 / 압축 벡터)으로 저장"""
+    os.makedirs(output_dir, exist_ok=True)
+    total = collection.count()
+
+    items_path = os.path.join(output_dir, ITEMS_FILE)
+    if os.path.exists(items_path):
+        os.remove(items_path)
+    conn = sqlite3.connect(items_path)
+    conn.execute("CREATE TABLE items (row INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, document TEXT, metadata TEXT)")
+
+    embeddings = None
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings", "metadatas", "documents"], limit=page_size, offset=offset)
+        page_vectors = np.asarray(page["embeddings"], dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.lib.format.open_memmap(
+                os.path.join(output_dir, EMBEDDINGS_FILE), mode="w+", dtype=dtype, shape=(total, page_vectors.shape[1])
+            )
+        embeddings[offset:offset + len(page_vectors)] = page_vectors
+        conn.executemany(
+            "INSERT INTO items (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+            [
+                (offset + i, item_id, document, json.dumps(metadata or {}, ensure_ascii=False))
+                for i, (item_id, document, metadata) in enumerate(zip(page["ids"], page["documents"], page["metadatas"]))
+            ]
+        )
+    conn.commit()
+    conn.close()
+
+    if embeddings is None:
+        embeddings = np.zeros((0, 0), dtype=dtype)
+        np.save(os.path.join(output_dir, EMBEDDINGS_FILE), embeddings)
+    else:
+        embeddings.flush()
+
+    # 저장된 정밀도 기준으로 제곱 노름 계산 (검색 시 거리 계산과 일치)
+    stored = np.load(os.path.join(output_dir, EMBEDDINGS_FILE), mmap_mode="r")
+    sq_norms = np.zeros(total, dtype=np.float32)
+    for start in range(0, total, SCAN_BLOCK_ROWS):
+        block = np.asarray(stored[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+        sq_norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+    np.save(os.path.join(output_dir, SQ_NORMS_FILE), sq_norms)
+
+    for filename in (QUANTIZED_FILE, SCALES_FILE):
+        if os.path.exists(os.path.join(output_dir, filename)):
+            os.remove(os.path.join(output_dir, filename))
+    if quantize in ("float16", "int8") and total > 0:
+        quantized = np.lib.format.open_memmap(
+            os.path.join(output_dir, QUANTIZED_FILE), mode="w+", dtype=quantize, shape=stored.shape
+        )
+        scales = np.ones(total, dtype=np.float32)
+        for start in range(0, total, SCAN_BLOCK_ROWS):
+            block = np.asarray(stored[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            if quantize == "int8":
+                quantized[start:start + len(block)], scales[start:start + len(block)] = quantize_int8(block)
+            else:
+                quantized[start:start + len(block)] = block
+        quantized.flush()
+        if quantize == "int8":
+            np.save(os.path.join(output_dir, SCALES_FILE), scales)
+
+    hnsw_path = os.path.join(output_dir, HNSW_FILE)
+    if os.path.exists(hnsw_path):
+        os.remove(hnsw_path)
+    if build_hnsw and total > 0:
+        import hnswlib
+
+        index = hnswlib.Index(space="l2", dim=stored.shape[1])
+        index.init_index(max_elements=total, ef_construction=200, M=16)
+        for start in range(0, total, SCAN_BLOCK_ROWS):
+            block = np.asarray(stored[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            index.add_items(block, np.arange(start, start + len(block)))
+        index.save_index(hnsw_path)
+
+    return {
+        "count": total,
+        "dim": int(stored.shape[1]) if total else 0,
+        "dtype": dtype,
+        "hnsw": build_hnsw and total > 0,
+        "quantize": quantize if quantize in ("float16", "int8") and total > 0 else None,
+        "exported_at": datetime.now().isoformat()
+    }
+
+
+def write_manifest(snapshot_dir: str, collections: Dict[str, Dict[str, Any]]):
+    """스냅샷 구성 정보 저장"""
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump({"collections": collections, "space": "l2"}, f, ensure_ascii=False, indent=2)
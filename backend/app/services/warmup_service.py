@@ -0,0 +1,102 @@
+import os
+import time
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+from .search_service import SearchService, LOCAL_QUERY_ANALYZER
+from .chat_service import ChatService
+
+# 환경 변수 로드
+load_dotenv()
+
+# 서버 시작 시 모델 로딩 및 워밍업 실행 여부
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+WARMUP_QUERY = os.getenv("WARMUP_QUERY", "식물을 이용한 미세먼지 저감 실험")
+
+# 준비 완료 판단에 필요한 구성 요소 (title_vectors, keyword_index, chunk_features는 없어도 검색 가능)
+REQUIRED_COMPONENTS = ["prompts", "embedding_model", "vectorstore", "warmup_embedding", "warmup_query"]
+
+# 전역 변수
+_warmup_state = {
+    "started_at": None,
+    "finished_at": None,
+    "components": {}  # key: 구성 요소 이름, value: 상태 / 소요 시간 / 상세 정보
+}
+
+
+class WarmupService:
+    """서버 시작 시 검색 모델을 미리 로드하고 준비 상태(/ready)를 제공하는 서비스"""
+
+    @staticmethod
+    def run_step(name: str, step: Callable[[], Optional[str]]) -> bool:
+        """워밍업 단계를 실행하고 상태와 소요 시간을 기록"""
+        started_at = time.perf_counter()
+        _warmup_state["components"][name] = {"status": "loading", "load_seconds": None, "detail": None}
+        try:
+            detail = step()
+            status = "ready"
+        except Exception as e:
+            print(f"❌ 워밍업 실패 ({name}): {e}")
+            detail = str(e)
+            status = "failed"
+        _warmup_state["components"][name] = {
+            "status": status,
+            "load_seconds": round(time.perf_counter() - started_at, 3),
+            "detail": detail
+        }
+        return status == "ready"
+
+    @staticmethod
+    def warm_up_sync():
+        """프롬프트, 임베딩 모델, 벡터 인덱스를 로드하고 워밍업 임베딩/검색을 1회 실행 (스레드에서 실행)"""
+        _warmup_state["started_at"] = datetime.now().isoformat()
+        _warmup_state["finished_at"] = None
+        print(f"🔥 워밍업 시작...")
+
+        WarmupService.run_step("prompts", lambda: f"예시 질문 {ChatService.preload_example_questions()}개")
+        if LOCAL_QUERY_ANALYZER:
+            WarmupService.run_step("local_query_analyzer", lambda: str(SearchService.get_local_query_analyzer().stats()))
+
+        try:
+            embedding_model, vectorstore = SearchService.initialize_models()
+        except Exception as e:
+            print(f"❌ 워밍업 중 모델 초기화 실패: {e}")
+        else:
+            query_embedding = None
+
+            def warm_up_embedding():
+                nonlocal query_embedding
+                query_embedding = embedding_model.embed_query(WARMUP_QUERY)
+                return f"{len(query_embedding)}차원"
+
+            def warm_up_query():
+                # 첫 질의 시 벡터 인덱스(HNSW)를 메모리에 올리도록 1건 검색
+                candidates = SearchService.query_candidates(vectorstore, query_embedding, 1)
+                return f"후보 {len(candidates)}개"
+
+            if WarmupService.run_step("warmup_embedding", warm_up_embedding):
+                WarmupService.run_step("warmup_query", warm_up_query)
+
+        _warmup_state["finished_at"] = datetime.now().isoformat()
+        status = WarmupService.get_readiness()
+        print(f"{'✅' if status['ready'] else '⚠️'} 워밍업 종료: ready={status['ready']}")
+
+    @staticmethod
+    async def warm_up():
+        """이벤트 루프를 막지 않도록 워밍업을 스레드에서 실행"""
+        await asyncio.to_thread(WarmupService.warm_up_sync)
+
+    @staticmethod
+    def get_readiness() -> Dict[str, Any]:
+        """구성 요소별 상태와 준비 완료 여부"""
+        components = {**SearchService.get_component_status(), **_warmup_state["components"]}
+        # 워밍업을 끈 경우에는 첫 검색 요청에서 지연 로딩하므로 항상 준비 완료로 응답
+        ready = not WARMUP_ON_STARTUP or all(components.get(name, {}).get("status") == "ready" for name in REQUIRED_COMPONENTS)
+        return {
+            "ready": ready,
+            "warmup_on_startup": WARMUP_ON_STARTUP,
+            "started_at": _warmup_state["started_at"],
+            "finished_at": _warmup_state["finished_at"],
+            "components": components
+        }
@@ -5,7 +5,7 @@ from fastapi import HTTPException
 from .search_service import SearchService
 from .analysis_service import AnalysisService
 from .logger_service import LoggerService
-from google import genai
+from .llm_gateway import LLMGateway
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 import traceback
@@ -14,11 +14,6 @@ import uuid
 # 환경 변수 로드
 load_dotenv()
 
-API_KEY = os.getenv("GOOGLE_API_KEY")
-if not API_KEY:
-    raise ValueError("GOOGLE_API_KEY 환경 변수가 설정되지 않았습니다.")
-client = genai.Client(api_key=API_KEY)
-
 # 프롬프트 템플릿 로드
 try:
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -96,7 +91,7 @@ class WriteService:
         )
 
         try:
-            response = client.models.generate_content(
+            response = await LLMGateway.generate_content(
                 model=gemini_model_name,
                 contents=prompt,
             )
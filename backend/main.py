@@ -1,21 +1,39 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import api_router
+from app.dependencies import get_current_user
+from app.services.warmup_service import WarmupService, WARMUP_ON_STARTUP
+from app.services.search_service import SearchService
+from app.services.chat_service import ChatService
+from app.services.llm_gateway import LLMGateway
 import os
 import time
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 
 
 origins = [
     "http://localhost:5173"
 ]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작 시 검색 모델 워밍업을 백그라운드로 시작 (완료 전까지 /ready는 503)"""
+    warmup_task = None
+    if WARMUP_ON_STARTUP:
+        warmup_task = asyncio.create_task(WarmupService.warm_up())
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+
 app = FastAPI(
     title="ReportCoach API",
     description="ReportCoach Backend API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -52,6 +70,26 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """트래픽 수신 가능 여부 체크 API (모델/벡터 인덱스 로딩 및 워밍업 완료 시 200, 아니면 503)"""
+    readiness = WarmupService.get_readiness()
+    readiness["timestamp"] = datetime.now().isoformat()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+@app.get("/stats")
+async def stats_check(current_user = Depends(get_current_user)):
+    """캐시 / 마이크로 배치 / 채팅 세션 저장소 / Gemini 호출 상태 조회 API (운영 모니터링용, 로그인 필요)"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "embedding": SearchService.get_embedding_stats(),
+        "query_analyzer": SearchService.get_query_analyzer_stats(),
+        "semantic_cache": SearchService.get_semantic_cache_stats(),
+        "search_pages": SearchService.get_search_page_stats(),
+        "chat_sessions": ChatService.get_session_stats(),
+        "llm_gateway": LLMGateway.get_stats()
+    }
+
 # 정적 파일 마운트 (API 라우트 이후에)
 DIST_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend/dist"))
 print("📦 Serving static files from:", DIST_PATH)
@@ -0,0 +1,172 @@
+"""
+임베딩 백엔드 벤치마크 및 벡터 일치 검증
+
+PyTorch(sentence-transformers) 임베딩과 ONNX Runtime(fp32 / int8) 임베딩을
+같은 문장들에 대해 계산하여
+1) 벡터 간 cosine similarity로 일치 여부를 확인하고
+2) 쿼리 1건 임베딩 지연 시간(p50 / p95)과 배치 임베딩 처리량을 비교하고
+3) 동시 쿼리 요청을 단건 처리할 때와 마이크로 배치(EmbeddingBatcher)로 처리할 때의 처리량을 비교합니다.
+
+ONNX 모델은 export_onnx_embedding.py로 먼저 내보내야 합니다.
+
+사용법 (backend/scripts 폴더에서):
+    python benchmark_embedding.py
+    python benchmark_embedding.py --onnx-dir ../datas/onnx_model --threads 4 --batch-size 16
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+load_dotenv("../.env")
+
+from app.services.embedding_backend import (
+    EMBEDDING_MODEL_NAME, ONNX_MODEL_FILE, ONNX_INT8_MODEL_FILE, OnnxEmbeddings, resolve_device
+)
+from app.services.embedding_batcher import EmbeddingBatcher
+
+SAMPLE_QUERIES = [
+    "식물로 미세먼지를 줄이는 방법",
+    "태양광 패널 효율을 높이는 실험",
+    "2024 물리 특상",
+    "pH에 따른 효소 활성 변화",
+    "자석의 세기와 거리의 관계"
+]
+
+SAMPLE_PASSAGE = (
+    "본 연구에서는 실내 공기 정화 식물의 종류에 따라 미세먼지 농도가 어떻게 변하는지 알아보기 위해 "
+    "밀폐된 아크릴 상자 안에 스킨답서스, 산세베리아, 고무나무를 각각 넣고 향을 피워 초기 농도를 맞춘 뒤 "
+    "30분 간격으로 PM2.5 농도를 측정하였다. 잎의 표면적과 기공 밀도가 큰 식물일수록 농도 감소 속도가 빨랐다."
+)
+
+# 통과 기준 (최소 cosine similarity)
+PARITY_THRESHOLDS = {ONNX_MODEL_FILE: 0.9999, ONNX_INT8_MODEL_FILE: 0.98}
+
+
+def percentile(values, p):
+    """값 목록에서 백분위수 계산"""
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def build_passages(count):
+    """길이가 서로 다른 합성 본문 목록"""
+    return [SAMPLE_PASSAGE[:80 + (i * 37) % len(SAMPLE_PASSAGE)] for i in range(count)]
+
+
+def measure(label, model, queries, passages, repeat):
+    """쿼리 1건 지연 시간과 배치 처리량 측정"""
+    model.embed_query(queries[0])  # 워밍업
+
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            model.embed_query(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.embed_documents(passages)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{label:<18} | 쿼리 p50 {percentile(latencies, 50):>7.1f}ms | p95 {percentile(latencies, 95):>7.1f}ms | "
+          f"배치 {len(passages)}개 {batch_seconds:>6.2f}s ({len(passages) / batch_seconds:>6.1f}개/s)")
+
+
+async def measure_concurrency(label, model, concurrency, batch_size, wait_ms):
+    """동시 쿼리 concurrency건을 단건 스레드 처리 / 마이크로 배치로 처리했을 때의 소요 시간 비교"""
+    queries = [f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} {i}" for i in range(concurrency)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*[asyncio.to_thread(model.embed_query, query) for query in queries])
+    single_seconds = time.perf_counter() - start
+
+    batcher = EmbeddingBatcher(model.embed_documents, batch_size, wait_ms)
+    start = time.perf_counter()
+    await asyncio.gather(*[batcher.embed(query) for query in queries])
+    batched_seconds = time.perf_counter() - start
+
+    stats = batcher.stats()
+    print(f"{label:<18} | 동시 {concurrency}건 단건 {single_seconds:>6.2f}s | 배치 {batched_seconds:>6.2f}s "
+          f"(x{single_seconds / batched_seconds:.1f}, 배치 {stats['batches']}개, 평균 크기 {stats['avg_batch_size']:.1f}, "
+          f"p95 대기 {stats['p95_wait_ms']:.1f}ms)")
+
+
+def check_parity(label, reference, candidate, threshold):
+    """행 단위 cosine similarity의 최솟값이 기준 이상인지 확인"""
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    similarities = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1) + 1e-12
+    )
+    passed = similarities.min() >= threshold
+    print(f"{label:<18} | 최소 cosine {similarities.min():.6f} | 평균 {similarities.mean():.6f} | "
+          f"기준 {threshold} → {'✅ 통과' if passed else '❌ 실패'}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 벡터 일치 검증 및 지연 시간 벤치마크")
+    parser.add_argument("--onnx-dir", default="../datas/onnx_model")
+    parser.add_argument("--threads", type=int, default=0, help="CPU 추론 스레드 수 (0이면 기본값)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--passages", type=int, default=64, help="배치 임베딩에 사용할 본문 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 쿼리 임베딩 요청 수")
+    parser.add_argument("--batch-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    if args.threads > 0:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    device = resolve_device()
+    passages = build_passages(args.passages)
+    texts = SAMPLE_QUERIES + passages
+
+    torch_model = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME,
+        model_kwargs={'device': device},
+        encode_kwargs={'batch_size': args.batch_size}
+    )
+    reference = torch_model.embed_documents(texts)
+
+    print("=" * 100)
+    all_passed = True
+    models = [(f"torch ({device})", torch_model)]
+    for model_file in (ONNX_MODEL_FILE, ONNX_INT8_MODEL_FILE):
+        if not os.path.exists(os.path.join(args.onnx_dir, model_file)):
+            print(f"⚠️ {model_file}이 없어 건너뜁니다. export_onnx_embedding.py를 먼저 실행해주세요.")
+            continue
+        onnx_model = OnnxEmbeddings(
+            args.onnx_dir,
+            quantize=model_file == ONNX_INT8_MODEL_FILE,
+            batch_size=args.batch_size,
+            num_threads=args.threads
+        )
+        label = "onnx int8" if model_file == ONNX_INT8_MODEL_FILE else "onnx fp32"
+        all_passed &= check_parity(label, reference, onnx_model.embed_documents(texts), PARITY_THRESHOLDS[model_file])
+        models.append((label, onnx_model))
+
+    print("-" * 100)
+    for label, model in models:
+        measure(label, model, SAMPLE_QUERIES, passages, args.repeat)
+    print("-" * 100)
+    for label, model in models:
+        asyncio.run(measure_concurrency(label, model, args.concurrency, args.batch_size, args.batch_wait_ms))
+    print("=" * 100)
+
+    if not all_passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+재정렬 엔진 벤치마크 및 점수 일치 검증
+
+기존 문서별 루프 방식 재정렬(SearchService.rerank_with_weights 원본)과 app/services/rerank_engine.py의 배치 방식 재정렬
+(후보 메타데이터로 즉석 계산 / 키워드 역색인 + 청크 특징 테이블 사용)을
+동일한 합성 후보 집합(50 / 500 / 5,000개)에 대해 실행하여
+모든 점수 구성 요소가 일치하는지 확인하고 실행 시간을 비교합니다.
+
+사용법 (backend/scripts 폴더에서):
+    python benchmark_rerank.py
+    python benchmark_rerank.py --sizes 50 500 5000 --repeat 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+from langchain_core.documents import Document
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.rerank_engine import build_candidate_features, to_matrix, score_candidates, build_score_info
+from app.services.keyword_index import KeywordIndex
+from app.services.chunk_features import ChunkFeatures
+
+# search_service.get_weight_config()의 기본값과 동일
+WEIGHT_CONFIG = {
+    "alpha": 1.1,
+    "gamma": 0.05,
+    "section_weights": {0: 0.08, 1: 0.04, 2: 0.01},
+    "award_weights": {
+        "대통령상": 0.15, "국무총리상": 0.12, "최우수상": 0.10,
+        "특상": 0.08, "우수상": 0.06, "장려상": 0.04
+    },
+    "metadata_weights": {"field": 0.06, "year": 0.05, "award": 0.08, "authors": 0.1, "teacher": 0.1}
+}
+
+SECTIONS = ["서론", "이론적 배경", "연구 방법", "연구 결과", "결론 및 고찰", "부록"]
+FIELDS = ["물리", "화학", "생물", "지구과학", "환경", "식물"]
+# 가중치 표에 없는 수상명과 앞뒤 공백이 있는 값도 섞어 기존 구현과 같은 값으로 조회하는지 확인
+AWARDS = list(WEIGHT_CONFIG["award_weights"].keys()) + ["입선", " 특상", ""]
+WORDS = ["미세먼지", "식물", "제거", "농도", "효율", "실험", "온도", "측정", "분석", "결과",
+         "산세비에리아", "스파티필룸", "광합성", "용액", "전류", "자석", "토양", "pH", "세균", "빛"]
+DIM = 1024
+
+# 점수 일치 검증 대상 score_info 항목
+SCORE_KEYS = ["content_score", "title_score", "section_boost_score", "keyword_boost_score", "award_boost_score", "metadata_boost", "total_score"]
+COUNT_KEYS = ["matched_terms", "simplified_matches", "original_matches"]
+
+
+def cosine_similarity_numpy(vec1, vec2):
+    """search_service.cosine_similarity_numpy와 동일"""
+    if np.allclose(vec1, 0) or np.allclose(vec2, 0):
+        return 0.0
+    epsilon = 1e-8
+    similarity = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2) + epsilon)
+    return np.clip(similarity, -1.0, 1.0)
+
+
+class StoredVectorEmbeddings:
+    """baseline_rerank_with_weights의 embed_documents 호출(본문 → 제목 순서)에 미리 만든 벡터를 반환하는 임베딩 모델 대역"""
+
+    def __init__(self, doc_vectors, title_vectors):
+        self._vectors = [doc_vectors, title_vectors]
+
+    def embed_documents(self, texts):
+        return self._vectors.pop(0)
+
+
+# 배치 재정렬 도입 이전 SearchService.rerank_with_weights 원본 (이름 외에는 수정 없이 복사, 점수 일치 검증 기준)
+def baseline_rerank_with_weights(
+    query_embedding,
+    documents,
+    embedding_model,
+    priority_sections,
+    simplified_query,
+    original_query,
+    keyword_match_terms,
+    weight_config=WEIGHT_CONFIG,
+    metadata_filters=None
+):
+    """문서를 가중치를 적용하여 재정렬"""
+    alpha = weight_config["alpha"]
+    gamma = weight_config["gamma"]
+    section_weights = weight_config["section_weights"]
+    award_weights = weight_config["award_weights"]  # 수상도별 가중치
+    metadata_weight_table = weight_config["metadata_weights"]
+
+    doc_texts = [doc.page_content for doc in documents]
+    doc_titles = [doc.metadata.get("title", "") for doc in documents]
+
+    doc_vectors = embedding_model.embed_documents(doc_texts)
+    title_vectors = embedding_model.embed_documents(doc_titles)
+
+    simplified_terms = [t.lower() for t in simplified_query.split() if len(t) > 1]
+    original_terms = [t.lower() for t in original_query.split() if len(t) > 1]
+
+    reranked_results = []
+
+    for i, doc in enumerate(documents):
+        content_score = cosine_similarity_numpy(query_embedding, doc_vectors[i])
+        title_score = cosine_similarity_numpy(query_embedding, title_vectors[i]) if doc_titles[i].strip() else 0.0
+
+        # 섹션 부스터 점수 계산 (Gemini가 분석한 우선순위 섹션과 일치할 때 가중치 적용)
+        section_boost_score = 0.0
+        doc_section = doc.metadata.get("section", "")
+        if doc_section in priority_sections:
+            try:
+                priority_index = priority_sections.index(doc_section)  # 우선순위에서의 위치 (0, 1, 2)
+                section_boost_score = section_weights.get(priority_index, 0.0)  # 1순위: 0.08, 2순위: 0.04, 3순위: 0.01
+            except ValueError:
+                pass
+
+        text_lower = doc.page_content.lower()
+        title_lower = doc_titles[i].lower()
+
+        simplified_matches = sum(1 for term in simplified_terms if term in text_lower or term in title_lower)
+        original_matches = sum(1 for term in original_terms if term in text_lower or term in title_lower)
+        matched_terms = simplified_matches + original_matches
+
+        keyword_matches = sum(1 for kw in keyword_match_terms if kw in text_lower or kw in title_lower)
+        keyword_boost_score = gamma * (matched_terms + keyword_matches)
+
+        # 수상도 부스터 점수 계산 (높은 순위의 수상일수록 높은 가중치 적용)
+        award_boost_score = 0.0
+        doc_award = doc.metadata.get("award", "")
+        if doc_award in award_weights:
+            award_boost_score = award_weights[doc_award]  # 대통령상: 0.15, 국무총리상: 0.12, 최우수상: 0.10, 특상: 0.08, 우수상: 0.06, 장려상: 0.04
+
+        metadata_boost = 0.0
+        if metadata_filters:
+            for key, val in metadata_filters.items():
+                doc_val = str(doc.metadata.get(key, '')).strip()
+                if doc_val == val:
+                    metadata_boost += metadata_weight_table.get(key, 0.05)
+
+        matched_terms += keyword_matches
+        total_score = (
+            (content_score + alpha * title_score)
+            + section_boost_score
+            + keyword_boost_score
+            + award_boost_score  # 수상도 부스터 점수 추가
+            + metadata_boost
+        )
+
+        score_info = {
+            'content_score': content_score,        # 내용 유사도 점수 (0~1)
+            'title_score': title_score,            # 제목 유사도 점수 (0~1)
+            'alpha': alpha,                        # 제목 가중치 계수
+            'section_boost_score': section_boost_score,  # 섹션 부스터 점수 (1순위: 0.08, 2순위: 0.04, 3순위: 0.01)
+            'keyword_boost_score': keyword_boost_score,  # 키워드 매칭 부스터 점수
+            'award_boost_score': award_boost_score,  # 수상도 부스터 점수 (대통령상: 0.15, 국무총리상: 0.12, 최우수상: 0.10, 특상: 0.08, 우수상: 0.06, 장려상: 0.04)
+            'metadata_boost': metadata_boost,      # 메타데이터 매칭 부스터 점수
+            'matched_terms': matched_terms,        # 매칭된 키워드 개수
+            'simplified_matches': simplified_matches,  # 요약 쿼리 매칭 개수
+            'original_matches': original_matches,  # 원본 쿼리 매칭 개수
+            'total_score': total_score,            # 최종 점수
+            'calculation': f"({content_score:.4f} + {alpha} × {title_score:.4f}) + {section_boost_score:.4f} + {keyword_boost_score:.4f} + {award_boost_score:.4f} + {metadata_boost:.4f} = {total_score:.4f}"
+        }
+
+        reranked_results.append((doc, total_score, score_info))
+
+    reranked_results.sort(key=lambda x: x[1], reverse=True)
+    return reranked_results
+
+
+def reference_rerank(query_embedding, documents, doc_vectors, title_vectors, priority_sections,
+                     simplified_query, original_query, keyword_match_terms, weight_config, metadata_filters=None):
+    """기존 문서별 루프 재정렬의 문서 순서별 score_info"""
+    reranked = baseline_rerank_with_weights(
+        query_embedding, documents, StoredVectorEmbeddings(doc_vectors, title_vectors), priority_sections,
+        simplified_query, original_query, keyword_match_terms, weight_config, metadata_filters
+    )
+    score_info_by_doc = {id(doc): score_info for doc, _, score_info in reranked}
+    return [score_info_by_doc[id(doc)] for doc in documents]
+
+
+def batch_rerank(query_embedding, documents, doc_vectors, title_vectors, priority_sections,
+                 simplified_query, original_query, keyword_match_terms, weight_config, metadata_filters=None,
+                 keyword_index=None, chunk_features=None):
+    """rerank_engine을 사용한 배치 재정렬 (SearchService.rerank_with_weights와 동일한 호출 순서)"""
+    doc_matrix = to_matrix(doc_vectors)
+    title_matrix = to_matrix(title_vectors, dim=doc_matrix.shape[1])
+    chunk_ids = [f"id_{i}" for i in range(len(documents))]
+    features = build_candidate_features(documents, weight_config["award_weights"], chunk_ids, keyword_index, chunk_features)
+    components = score_candidates(
+        query_embedding, doc_matrix, title_matrix, features, priority_sections,
+        simplified_query, original_query, keyword_match_terms, weight_config, metadata_filters
+    )
+    return [build_score_info(components, i, weight_config["alpha"]) for i in range(len(documents))]
+
+
+def make_candidates(n, rng):
+    """합성 후보 문서와 벡터 생성"""
+    documents, doc_vectors, title_vectors = [], [], []
+    for i in range(n):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 200)))
+        title = "" if i % 17 == 0 else " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8)))
+        documents.append(Document(page_content=text, metadata={
+            "nttSn": 10000 + i // 5,
+            "title": title,
+            "section": rng.choice(SECTIONS),
+            "award": rng.choice(AWARDS),
+            "field": rng.choice(FIELDS),
+            "year": str(rng.randint(2011, 2024))
+        }))
+        doc_vectors.append(np.random.default_rng(1000 + i).standard_normal(DIM).astype(np.float32))
+        title_vectors.append(None if not title else np.random.default_rng(1000 + n + i).standard_normal(DIM).astype(np.float32))
+    return documents, doc_vectors, title_vectors
+
+
+def measure(fn, repeat, *args):
+    """repeat번 실행하여 중앙값(ms)과 마지막 결과 반환"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재정렬 엔진 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    query_embedding = np.random.default_rng(0).standard_normal(DIM).astype(np.float32)
+    query_args = (
+        ["연구 결과", "결론 및 고찰", "서론"],
+        "미세먼지 제거 식물",
+        "식물로 미세먼지 제거하는 실험",
+        ["미세먼지", "제거", "식물", "스파티필룸", "농도"],
+        WEIGHT_CONFIG,
+        {"field": "환경", "year": "2024"}
+    )
+
+    print(f"{'후보 수':>8} | {'루프(ms)':>10} | {'배치(ms)':>10} | {'배치+색인(ms)':>14} | {'속도 향상':>8} | 점수 일치")
+    print("-" * 80)
+    for n in args.sizes:
+        documents, doc_vectors, title_vectors = make_candidates(n, rng)
+        common = (query_embedding, documents, doc_vectors, title_vectors) + query_args
+
+        loop_ms, expected = measure(reference_rerank, args.repeat, *common)
+        batch_ms, actual = measure(batch_rerank, args.repeat, *common)
+        chunk_ids = [f"id_{i}" for i in range(n)]
+        keyword_index = KeywordIndex.build(chunk_ids, [doc.page_content for doc in documents])
+        chunk_features = ChunkFeatures.build(chunk_ids, [doc.metadata for doc in documents])
+        indexed_ms, indexed = measure(batch_rerank, args.repeat, *common, keyword_index, chunk_features)
+
+        # 루프 방식은 float32 벡터로 계산하고 배치 방식은 float64로 계산하므로 float32 정밀도 내에서 비교
+        parity = all(
+            all(np.isclose(e[key], a[key], atol=1e-5) for key in SCORE_KEYS)
+            and all(e[key] == a[key] for key in COUNT_KEYS)
+            for results in (actual, indexed)
+            for e, a in zip(expected, results)
+        )
+        print(f"{n:>8} | {loop_ms:>10.2f} | {batch_ms:>10.2f} | {indexed_ms:>14.2f} | {loop_ms / min(batch_ms, indexed_ms):>7.1f}x | {'✅' if parity else '❌'}")
+        if not parity:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
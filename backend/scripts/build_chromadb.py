@@ -5,16 +5,34 @@ import logging
 from datetime import datetime
 from langchain_community.vectorstores import Chroma
 from langchain.schema import Document
-from langchain_huggingface import HuggingFaceEmbeddings
 from dotenv import load_dotenv
-import torch
 import time
 from tqdm import tqdm
 import chromadb
+import sys
+import sqlite3
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services.keyword_index import KeywordIndex
+from app.services.chunk_features import ChunkFeatures
+from app.services.embedding_backend import EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, EMBEDDING_MODEL_NAME, create_embedding_model
+from app.services.vector_partitions import (
+    partition_keys, partition_name, partition_value, load_partition_manifest, write_partition_manifest
+)
 
 # .env 파일에서 환경 변수 로드 (backend 폴더 기준)
 load_dotenv("../.env")
 
+# 실행 옵션 (파티션 빌드)
+parser = argparse.ArgumentParser(description="JSON 청크를 임베딩하여 ChromaDB 구축")
+parser.add_argument("--partition-by", choices=["none", "year", "year_field"], default=os.getenv("CHROMA_PARTITION_BY", "none"),
+                    help="청크 컬렉션을 연도(/분야)별 파티션 컬렉션으로 나누어 저장")
+parser.add_argument("--years", nargs="+", default=None, help="지정한 연도의 파티션만 다시 생성 (나머지 파티션은 유지)")
+args = parser.parse_args()
+PARTITION_BY = {"none": [], "year": ["year"], "year_field": ["year", "field"]}[args.partition_by]
+REBUILD_YEARS = {partition_value(year) for year in args.years} if args.years else None
+
 # 로깅 설정
 def setup_logging():
     """로깅 설정"""
@@ -64,36 +82,20 @@ logger.info("=" * 60)
 # 설정
 JSON_DIR = "../datas/json_results"
 CHROMA_DIR = "../datas/chroma_db"        # 저장할 Chroma DB 경로
-
-# 임베딩 모델 설정 (환경 변수에서 가져오기)
-EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-large")
-
-# 디바이스 설정 - 따옴표 제거 및 검증
-device_env = os.getenv("EMBEDDING_DEVICE", "")
-logger.info(f"환경 변수 EMBEDDING_DEVICE: '{device_env}'")
-
-if device_env:
-    EMBEDDING_DEVICE = device_env.strip().strip("'\"")  # 따옴표 제거
-    logger.info(f"따옴표 제거 후: '{EMBEDDING_DEVICE}'")
-else:
-    EMBEDDING_DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-    logger.info(f"기본값 설정: '{EMBEDDING_DEVICE}'")
-
-EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+KEYWORD_INDEX_DIR = "../datas/keyword_index"  # 저장할 키워드 역색인 경로
+CHUNK_FEATURES_DIR = "../datas/chunk_features"  # 저장할 청크 재정렬 특징 테이블 경로
+ONNX_MODEL_DIR = "../datas/onnx_model"  # EMBEDDING_BACKEND=onnx일 때 사용할 ONNX 모델 경로
+SCIENCE_REPORTS_DB = "../datas/science_reports.db"  # 보고서 설명(joined.description) 조회용
+SUMMARY_TEXT_DIR = "../datas/extracted_pdf/summary"  # 요약본 PDF에서 추출한 텍스트 ({nttSn}_summary.txt)
+SUMMARY_MAX_CHARS = 2000  # 보고서 요약 벡터에 사용할 최대 글자 수 (임베딩 모델 최대 토큰 수 이내)
+# 보고서 요약 벡터와 함께 저장할 메타데이터 (청크 메타데이터와 같은 값/타입, where 절 공용)
+SUMMARY_METADATA_KEYS = ["nttSn", "title", "year", "field", "contest", "award", "authors", "teacher"]
 
 logger.info(f"임베딩 모델 설정:")
 logger.info(f"   - 모델: {EMBEDDING_MODEL_NAME}")
-logger.info(f"   - 디바이스: {EMBEDDING_DEVICE}")
+logger.info(f"   - 백엔드: {EMBEDDING_BACKEND}")
 logger.info(f"   - 배치 크기: {EMBEDDING_BATCH_SIZE}")
-
-# CUDA 사용 가능 여부 확인
-if not torch.cuda.is_available():
-    logger.error("❌ CUDA가 사용 불가능합니다.")
-    logger.error("GPU 드라이버와 PyTorch CUDA 버전을 확인해주세요.")
-    logger.error("프로그램을 종료합니다.")
-    exit(1)
-
-logger.info(f"✅ CUDA 사용 가능: {torch.cuda.get_device_name(0)}")
+logger.info(f"   - 파티션: {PARTITION_BY or '없음'}" + (f" (재생성 연도: {sorted(REBUILD_YEARS)})" if REBUILD_YEARS else ""))
 
 # JSON 폴더 확인
 if not os.path.exists(JSON_DIR):
@@ -101,22 +103,23 @@ if not os.path.exists(JSON_DIR):
     logger.error("먼저 JSON 변환을 완료해주세요.")
     exit()
 
-# 기존 Chroma DB 디렉토리가 있다면 삭제하고 새로 시작
-if os.path.exists(CHROMA_DIR):
+# 연도별 재생성은 같은 방식으로 분할된 기존 DB가 있어야 함
+if REBUILD_YEARS:
+    existing_manifest = load_partition_manifest(CHROMA_DIR) if os.path.exists(CHROMA_DIR) else None
+    if not PARTITION_BY or existing_manifest is None or existing_manifest["partition_by"] != PARTITION_BY:
+        logger.error(f"오류: --years는 같은 --partition-by로 만든 기존 파티션 DB가 있을 때만 사용할 수 있습니다.")
+        exit(1)
+
+# 기존 Chroma DB 디렉토리가 있다면 삭제하고 새로 시작 (연도별 재생성 시에는 유지)
+if os.path.exists(CHROMA_DIR) and not REBUILD_YEARS:
     logger.warning(f"⚠️ 기존 Chroma DB 디렉토리 '{CHROMA_DIR}'를 삭제합니다. (중복 방지)")
     shutil.rmtree(CHROMA_DIR) # 폴더와 그 안의 모든 내용을 삭제
 
-# 임베딩 로딩 (CUDA 필수)
+# 임베딩 로딩 (GPU가 없으면 CPU 또는 ONNX 백엔드 사용)
 try:
-    embedding_model = HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL_NAME,
-        model_kwargs={'device': EMBEDDING_DEVICE},
-        encode_kwargs={'batch_size': EMBEDDING_BATCH_SIZE}
-    )
-    logger.info(f"✅ 임베딩 모델 로드 완료: {EMBEDDING_DEVICE}")
-except RuntimeError as e:
-    logger.error(f"❌ CUDA 디바이스 오류 발생: {e}")
-    logger.error("CUDA가 필요합니다. GPU 드라이버와 PyTorch CUDA 버전을 확인해주세요.")
+    embedding_model = create_embedding_model(onnx_dir=ONNX_MODEL_DIR)
+except Exception as e:
+    logger.error(f"❌ 임베딩 모델 로딩 실패: {e}")
     logger.error("프로그램을 종료합니다.")
     exit(1)
 
@@ -185,13 +188,28 @@ for nttsn, filename in json_files:
 
 logger.info(f"\n🔍 총 {len(all_documents)}개의 문서를 임베딩합니다...")
 
-def create_chroma_with_progress(documents, embedding_model, persist_directory):
+def build_chunk_ids(documents):
+    """
+    청크 ID 생성 - 기본은 id_{순번}, 파티션 빌드는 일부 연도만 다시 만들어도
+    다른 연도의 ID가 바뀌지 않도록 id_{nttSn}_{보고서 내 순번}
+    """
+    if not PARTITION_BY:
+        return [f"id_{i}" for i in range(len(documents))]
+
+    chunk_counts = {}
+    ids = []
+    for doc in documents:
+        nttsn = str(doc.metadata.get("nttSn"))
+        ids.append(f"id_{nttsn}_{chunk_counts.get(nttsn, 0)}")
+        chunk_counts[nttsn] = chunk_counts.get(nttsn, 0) + 1
+    return ids
+
+def create_chroma_with_progress(documents, chunk_ids, embedding_model, persist_directory, collection_name="my_report_collection"):
     """
     대용량 문서를 배치로 임베딩하고 ChromaDB에 저장하는 함수 (최신 방식)
     """
     # 1. ChromaDB 클라이언트 설정
     client = chromadb.PersistentClient(path=persist_directory)
-    collection_name = "my_report_collection" # 컬렉션 이름 지정
 
     # 기존 컬렉션이 있다면 삭제
     if collection_name in [c.name for c in client.list_collections()]:
@@ -205,7 +223,7 @@ def create_chroma_with_progress(documents, embedding_model, persist_directory):
     
     logger.info(f"총 {len(documents)}개의 문서를 {batch_size}개씩 나누어 임베딩 및 저장합니다...")
 
-    for i in tqdm(range(0, len(documents), batch_size), desc="ChromaDB에 저장 중"):
+    for i in tqdm(range(0, len(documents), batch_size), desc=f"{collection_name}에 저장 중"):
         batch_docs = documents[i:i+batch_size]
         
         # 문서 내용만 추출하여 임베딩
@@ -214,7 +232,7 @@ def create_chroma_with_progress(documents, embedding_model, persist_directory):
         
         # 메타데이터와 ID 준비
         metadatas = [doc.metadata for doc in batch_docs]
-        ids = [f"id_{i+j}" for j in range(len(batch_docs))] # 고유 ID 생성
+        ids = chunk_ids[i:i+batch_size] # 고유 ID
         
         # 4. 컬렉션에 데이터 추가
         collection.add(
@@ -227,5 +245,199 @@ def create_chroma_with_progress(documents, embedding_model, persist_directory):
     logger.info("✅ 모든 문서의 임베딩 및 저장이 완료되었습니다.")
     return collection
 
+def create_partitioned_collections(documents, chunk_ids, embedding_model, persist_directory):
+    """
+    청크를 연도(/분야)별 파티션 컬렉션으로 나누어 저장하고 파티션 목록(partitions.json)을 기록하는 함수
+    (REBUILD_YEARS가 있으면 해당 연도의 파티션만 다시 만들고 나머지는 그대로 유지)
+    """
+    base_name = "my_report_collection"
+    groups = {}
+    for doc, chunk_id in zip(documents, chunk_ids):
+        keys = partition_keys(doc.metadata, PARTITION_BY)
+        name = partition_name(base_name, keys["year"], keys.get("field"))
+        group = groups.setdefault(name, {"keys": keys, "documents": [], "ids": []})
+        group["documents"].append(doc)
+        group["ids"].append(chunk_id)
+
+    partitions = {}
+    if REBUILD_YEARS:
+        client = chromadb.PersistentClient(path=persist_directory)
+        existing_names = [c.name for c in client.list_collections()]
+        for partition in load_partition_manifest(persist_directory)["partitions"]:
+            if partition["year"] not in REBUILD_YEARS:
+                partitions[partition["name"]] = partition
+            elif partition["name"] in existing_names:
+                # 분야가 없어진 경우까지 포함해 해당 연도의 기존 파티션 삭제
+                client.delete_collection(name=partition["name"])
+
+    logger.info(f"총 {len(groups)}개 파티션 ({'/'.join(PARTITION_BY)}) 중 "
+                f"{sum(1 for g in groups.values() if not REBUILD_YEARS or g['keys']['year'] in REBUILD_YEARS)}개를 생성합니다...")
+
+    for name, group in sorted(groups.items()):
+        if REBUILD_YEARS and group["keys"]["year"] not in REBUILD_YEARS:
+            continue
+        create_chroma_with_progress(group["documents"], group["ids"], embedding_model, persist_directory, collection_name=name)
+        partitions[name] = {"name": name, **group["keys"], "count": len(group["documents"]), "built_at": datetime.now().isoformat()}
+        logger.info(f"✅ 파티션 저장 완료: {name} {group['keys']} ({len(group['documents'])}개 청크)")
+
+    write_partition_manifest(persist_directory, base_name, PARTITION_BY, list(partitions.values()))
+    logger.info(f"✅ 파티션 목록 저장 완료: {len(partitions)}개 파티션")
+
+def create_title_collection(documents, embedding_model, persist_directory, reset=True):
+    """
+    보고서(nttSn)별 제목 벡터를 한 번만 임베딩하여 별도 컬렉션에 저장하는 함수
+    (검색 시 재정렬 단계에서 제목을 매번 다시 임베딩하지 않도록 함, reset=False면 주어진 보고서만 갱신)
+    """
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection_name = "my_report_title_collection"
+
+    if reset and collection_name in [c.name for c in client.list_collections()]:
+        client.delete_collection(name=collection_name)
+
+    collection = client.get_or_create_collection(name=collection_name)
+
+    # nttSn별 첫 번째 유효한 제목만 사용
+    titles_by_nttsn = {}
+    for doc in documents:
+        nttsn = doc.metadata.get("nttSn")
+        title = doc.metadata.get("title", "")
+        if nttsn is None or not str(title).strip():
+            continue
+        titles_by_nttsn.setdefault(str(nttsn), title)
+
+    items = list(titles_by_nttsn.items())
+    batch_size = EMBEDDING_BATCH_SIZE
+
+    logger.info(f"총 {len(items)}개 보고서의 제목을 임베딩 및 저장합니다...")
+
+    for i in tqdm(range(0, len(items), batch_size), desc="제목 벡터 저장 중"):
+        batch_items = items[i:i+batch_size]
+        batch_titles = [title for _, title in batch_items]
+        embeddings = embedding_model.embed_documents(batch_titles)
+
+        collection.upsert(
+            ids=[nttsn for nttsn, _ in batch_items],
+            embeddings=embeddings,
+            metadatas=[{"nttSn": nttsn, "title": title} for nttsn, title in batch_items],
+            documents=batch_titles
+        )
+
+    logger.info("✅ 제목 벡터 저장이 완료되었습니다.")
+    return collection
+
+def load_report_descriptions(db_path):
+    """science_reports.db의 joined 테이블에서 보고서별 설명(description) 조회"""
+    if not os.path.exists(db_path):
+        logger.warning(f"⚠️ '{db_path}'가 없어 보고서 설명 없이 요약 벡터를 만듭니다.")
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT nttSn, description FROM joined").fetchall()
+    finally:
+        conn.close()
+    return {str(nttsn): (description or "").strip() for nttsn, description in rows}
+
+def build_report_summary_text(nttsn, title, description, first_chunk_text):
+    """제목 + 보고서 설명 + 요약본 텍스트로 보고서 요약 텍스트 구성 (모두 없으면 첫 청크 사용)"""
+    summary_text = ""
+    summary_path = os.path.join(SUMMARY_TEXT_DIR, f"{nttsn}_summary.txt")
+    if os.path.exists(summary_path):
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary_text = " ".join(f.read().split())
+
+    body = " ".join(part for part in (description, summary_text) if part) or first_chunk_text
+    return f"{title}\n{body}".strip()[:SUMMARY_MAX_CHARS]
+
+def create_summary_collection(documents, embedding_model, persist_directory, reset=True):
+    """
+    보고서(nttSn)당 하나의 요약 벡터를 별도 컬렉션에 저장하는 함수
+    (2단계 검색에서 상위 보고서를 먼저 고른 뒤 해당 보고서의 청크만 검색, reset=False면 주어진 보고서만 갱신)
+    """
+    client = chromadb.PersistentClient(path=persist_directory)
+    collection_name = "my_report_summary_collection"
+
+    if reset and collection_name in [c.name for c in client.list_collections()]:
+        client.delete_collection(name=collection_name)
+
+    collection = client.get_or_create_collection(name=collection_name)
+    descriptions = load_report_descriptions(SCIENCE_REPORTS_DB)
+
+    # nttSn별 첫 번째 청크의 메타데이터와 본문 사용
+    reports = {}
+    for doc in documents:
+        nttsn = doc.metadata.get("nttSn")
+        if nttsn is None or str(nttsn) in reports:
+            continue
+        metadata = {key: doc.metadata[key] for key in SUMMARY_METADATA_KEYS if doc.metadata.get(key) is not None}
+        text = build_report_summary_text(nttsn, doc.metadata.get("title", ""), descriptions.get(str(nttsn), ""), doc.page_content)
+        reports[str(nttsn)] = (text, metadata)
+
+    items = list(reports.items())
+    batch_size = EMBEDDING_BATCH_SIZE
+    missing_descriptions = sum(1 for nttsn, _ in items if not descriptions.get(nttsn))
+
+    logger.info(f"총 {len(items)}개 보고서의 요약 벡터를 임베딩 및 저장합니다... (설명 없음 {missing_descriptions}개)")
+
+    for i in tqdm(range(0, len(items), batch_size), desc="보고서 요약 벡터 저장 중"):
+        batch_items = items[i:i+batch_size]
+        batch_texts = [text for _, (text, _) in batch_items]
+        embeddings = embedding_model.embed_documents(batch_texts)
+
+        collection.upsert(
+            ids=[nttsn for nttsn, _ in batch_items],
+            embeddings=embeddings,
+            metadatas=[metadata for _, (_, metadata) in batch_items],
+            documents=batch_texts
+        )
+
+    logger.info("✅ 보고서 요약 벡터 저장이 완료되었습니다.")
+    return collection
+
+def create_keyword_index(documents, chunk_ids, index_directory):
+    """
+    청크 텍스트의 문자 바이그램 역색인(위치 포함)을 생성하는 함수
+    (청크 ID는 create_chroma_with_progress와 동일, 임베딩이 없어 연도별 재생성 시에도 전체를 다시 생성)
+    """
+    logger.info(f"총 {len(documents)}개 청크의 키워드 역색인을 생성합니다...")
+
+    if os.path.exists(index_directory):
+        shutil.rmtree(index_directory)
+
+    keyword_index = KeywordIndex.build(chunk_ids, (doc.page_content for doc in tqdm(documents, desc="역색인 생성 중")))
+    keyword_index.save(index_directory)
+
+    logger.info(f"✅ 키워드 역색인 저장 완료: {index_directory} (바이그램 {len(keyword_index.vocab)}개)")
+    return keyword_index
+
+def create_chunk_features(documents, chunk_ids, features_directory):
+    """
+    재정렬 시 쿼리와 무관한 청크 특징(섹션, 제목, 수상, 분야, 연도, 저자, 지도교사)을 번호 배열로 저장하는 함수
+    (청크 ID 순서와 정렬, 키워드 역색인과 마찬가지로 연도별 재생성 시에도 전체를 다시 생성)
+    """
+    logger.info(f"총 {len(documents)}개 청크의 재정렬 특징 테이블을 생성합니다...")
+
+    if os.path.exists(features_directory):
+        shutil.rmtree(features_directory)
+
+    chunk_features = ChunkFeatures.build(chunk_ids, (doc.metadata for doc in documents))
+    chunk_features.save(features_directory)
+
+    vocab_sizes = ", ".join(f"{key} {len(values)}개" for key, values in chunk_features.vocab.items())
+    logger.info(f"✅ 청크 특징 테이블 저장 완료: {features_directory} ({vocab_sizes})")
+    return chunk_features
+
 # 스크립트의 메인 부분에서 이 함수를 호출
-create_chroma_with_progress(all_documents, embedding_model, CHROMA_DIR) 
\ No newline at end of file
+chunk_ids = build_chunk_ids(all_documents)
+if PARTITION_BY:
+    create_partitioned_collections(all_documents, chunk_ids, embedding_model, CHROMA_DIR)
+else:
+    create_chroma_with_progress(all_documents, chunk_ids, embedding_model, CHROMA_DIR)
+
+# 연도별 재생성 시 제목 / 요약 벡터는 해당 연도 보고서만 갱신
+report_documents = all_documents
+if REBUILD_YEARS:
+    report_documents = [doc for doc in all_documents if partition_value(doc.metadata.get("year")) in REBUILD_YEARS]
+create_title_collection(report_documents, embedding_model, CHROMA_DIR, reset=not REBUILD_YEARS)
+create_summary_collection(report_documents, embedding_model, CHROMA_DIR, reset=not REBUILD_YEARS)
+create_keyword_index(all_documents, chunk_ids, KEYWORD_INDEX_DIR)
+create_chunk_features(all_documents, chunk_ids, CHUNK_FEATURES_DIR)
@@ -0,0 +1,141 @@
+"""
+압축 벡터 검색 recall@k 평가
+
+export_vector_snapshot.py --quantize float16|int8로 만든 스냅샷에 대해
+같은 쿼리들을
+1) 전체 정밀도 완전 탐색 (정답)
+2) 압축 벡터만으로 탐색
+3) 압축 벡터 후보 + 전체 정밀도 재채점 (서비스 기본 동작)
+으로 검색하여 recall@k, 쿼리당 지연 시간, 벡터 행렬 크기를 비교합니다.
+
+쿼리 파일은 한 줄에 쿼리 하나이며, 없으면 기본 예시 쿼리를 사용합니다.
+--corpus-queries N을 주면 임베딩 모델 없이 저장된 청크 벡터 N개를 쿼리로 사용합니다.
+
+사용법 (backend/scripts 폴더에서):
+    python evaluate_quantized_recall.py
+    python evaluate_quantized_recall.py --queries queries.txt --k 10 50 --rescore-factors 2 4 8
+    python evaluate_quantized_recall.py --corpus-queries 200
+"""
+import os
+import sys
+import time
+import argparse
+import unicodedata
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+load_dotenv("../.env")
+
+from app.services.vector_snapshot import SnapshotCollection, QUANTIZED_FILE, SCALES_FILE, EMBEDDINGS_FILE
+
+SNAPSHOT_DIR = "../datas/vector_snapshot"
+COLLECTION_NAME = "my_report_collection"
+
+SAMPLE_QUERIES = [
+    "식물로 미세먼지를 줄이는 방법",
+    "태양광 패널 효율을 높이는 실험",
+    "2024 물리 특상",
+    "pH에 따른 효소 활성 변화",
+    "자석의 세기와 거리의 관계",
+    "플라나리아 재생 실험",
+    "초음파를 이용한 거리 측정 장치",
+    "빗물의 산성도와 지역별 차이"
+]
+
+
+def load_queries(path):
+    """쿼리 파일(한 줄에 하나)을 읽어 검색 서비스와 같은 방식으로 정규화"""
+    if not path:
+        return SAMPLE_QUERIES
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [" ".join(unicodedata.normalize("NFC", line).split()) for line in f]
+    return [line for line in lines if line]
+
+
+def embed_queries(queries, onnx_dir):
+    """서비스와 같은 임베딩 백엔드로 쿼리 임베딩"""
+    from app.services.embedding_backend import create_embedding_model
+
+    embedding_model = create_embedding_model(onnx_dir=onnx_dir)
+    return np.asarray(embedding_model.embed_documents(queries), dtype=np.float32)
+
+
+def file_megabytes(collection_dir, filename):
+    path = os.path.join(collection_dir, filename)
+    return os.path.getsize(path) / (1024 * 1024) if os.path.exists(path) else 0.0
+
+
+def recall(expected_rows, found_rows, k):
+    """정답 상위 k개 중 찾은 상위 k개에 포함된 비율"""
+    return len(set(expected_rows[:k].tolist()) & set(found_rows[:k].tolist())) / max(1, min(k, len(expected_rows)))
+
+
+def evaluate(label, search, query_vectors, exact_results, ks):
+    """검색 함수의 recall@k 평균과 쿼리당 지연 시간"""
+    recalls = {k: [] for k in ks}
+    latencies = []
+    for query_vector, expected_rows in zip(query_vectors, exact_results):
+        start = time.perf_counter()
+        rows, _ = search(query_vector, max(ks))
+        latencies.append((time.perf_counter() - start) * 1000)
+        for k in ks:
+            recalls[k].append(recall(expected_rows, rows, k))
+
+    recall_text = " | ".join(f"recall@{k} {np.mean(recalls[k]):.4f} (최소 {np.min(recalls[k]):.2f})" for k in ks)
+    print(f"{label:<24} | {recall_text} | p50 {np.percentile(latencies, 50):>7.1f}ms")
+    return {k: float(np.mean(recalls[k])) for k in ks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="압축 벡터 검색과 전체 정밀도 검색의 recall@k 비교")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--queries", default=None, help="쿼리 파일 (한 줄에 하나)")
+    parser.add_argument("--corpus-queries", type=int, default=0, help="임베딩 모델 대신 저장된 청크 벡터 N개를 쿼리로 사용")
+    parser.add_argument("--onnx-dir", default="../datas/onnx_model")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--rescore-factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    collection_dir = os.path.join(args.snapshot_dir, args.collection)
+    if not os.path.exists(os.path.join(collection_dir, QUANTIZED_FILE)):
+        print(f"오류: '{collection_dir}'에 압축 벡터가 없습니다. export_vector_snapshot.py --quantize int8로 먼저 생성해주세요.")
+        sys.exit(1)
+
+    # hnsw를 끄고 완전 탐색끼리 비교 (압축으로 인한 손실만 측정)
+    collection = SnapshotCollection(collection_dir, use_hnsw=False, use_quantized=True)
+
+    if args.corpus_queries > 0:
+        rng = np.random.default_rng(0)
+        sample_rows = rng.choice(collection.count(), size=min(args.corpus_queries, collection.count()), replace=False)
+        query_vectors = np.asarray(collection.embeddings[np.sort(sample_rows)], dtype=np.float32)
+        query_source = f"저장된 청크 벡터 {len(query_vectors)}개"
+    else:
+        queries = load_queries(args.queries)
+        query_vectors = embed_queries(queries, args.onnx_dir)
+        query_source = f"쿼리 {len(queries)}개"
+
+    quantized_dtype = collection.quantized.dtype
+    print("=" * 100)
+    print(f"컬렉션: {args.collection} ({collection.count()}개 벡터, {collection.embeddings.shape[1]}차원) / {query_source}")
+    print(f"전체 정밀도 {collection.embeddings.dtype}: {file_megabytes(collection_dir, EMBEDDINGS_FILE):.1f}MB | "
+          f"압축 {quantized_dtype}: {file_megabytes(collection_dir, QUANTIZED_FILE) + file_megabytes(collection_dir, SCALES_FILE):.1f}MB")
+    print("-" * 100)
+
+    max_k = max(args.k)
+    exact_results = [collection._scan(query_vector, None, max_k)[0] for query_vector in query_vectors]
+    evaluate("exact", lambda q, n: collection._scan(q, None, n), query_vectors, exact_results, args.k)
+    evaluate(f"{quantized_dtype} only", lambda q, n: collection._scan(q, None, n, quantized=True), query_vectors, exact_results, args.k)
+    for factor in args.rescore_factors:
+        evaluate(
+            f"{quantized_dtype} + 재채점 x{factor}",
+            lambda q, n, factor=factor: collection.rescored_search(q, None, n, rescore_factor=factor),
+            query_vectors, exact_results, args.k
+        )
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+임베딩 모델 ONNX 내보내기
+
+EMBEDDING_MODEL(기본 intfloat/multilingual-e5-large)을 ONNX 그래프로 내보내고
+CPU 서버용 int8 동적 양자화 모델을 함께 생성합니다. (내보내기에는 torch가 필요하며,
+서비스 실행 시에는 EMBEDDING_BACKEND=onnx 설정으로 onnxruntime만 사용합니다.)
+
+사용법 (backend/scripts 폴더에서):
+    python export_onnx_embedding.py
+    python export_onnx_embedding.py --output-dir ../datas/onnx_model --no-quantize
+"""
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+load_dotenv("../.env")
+
+from app.services.embedding_backend import EMBEDDING_MODEL_NAME, export_onnx_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 모델 ONNX 내보내기 및 int8 양자화")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output-dir", default="../datas/onnx_model")
+    parser.add_argument("--no-quantize", action="store_true", help="int8 양자화 모델을 만들지 않음")
+    args = parser.parse_args()
+
+    model_path = export_onnx_model(args.output_dir, model_name=args.model, quantize=not args.no_quantize)
+    print(f"✅ 완료: {model_path}")
+
+
+if __name__ == "__main__":
+    main()
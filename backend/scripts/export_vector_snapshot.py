@@ -0,0 +1,90 @@
+"""
+읽기 전용 벡터 스냅샷 내보내기
+
+build_chromadb.py로 만든 Chroma DB의 청크 / 제목 / 보고서 요약 컬렉션을
+- 벡터 행렬 (.npy, float32 또는 float16)
+- ID / 본문 / 메타데이터 테이블 (SQLite)
+- 선택: hnswlib 근사 최근접 이웃 인덱스
+- 선택: 후보 검색용 압축 벡터 (float16 또는 벡터별 스케일 int8, 상위 후보는 전체 정밀도로 재채점)
+로 저장합니다. 검색 서비스는 VECTORSTORE_BACKEND=snapshot 설정 시 이 스냅샷을 mmap으로 열어
+여러 워커가 같은 물리 메모리 페이지를 공유하고, 시작 시 인덱스 로딩 시간을 줄입니다.
+
+사용법 (backend/scripts 폴더에서, build_chromadb.py 실행 후):
+    python export_vector_snapshot.py
+    python export_vector_snapshot.py --dtype float16 --hnsw
+    python export_vector_snapshot.py --quantize int8
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import chromadb
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+load_dotenv("../.env")
+
+from app.services.vector_snapshot import export_collection, write_manifest
+from app.services.vector_partitions import PARTITION_MANIFEST_FILE, load_partition_manifest
+
+CHROMA_DIR = "../datas/chroma_db"
+SNAPSHOT_DIR = "../datas/vector_snapshot"
+COLLECTION_NAMES = ["my_report_collection", "my_report_title_collection", "my_report_summary_collection"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma 컬렉션을 읽기 전용 벡터 스냅샷으로 내보내기")
+    parser.add_argument("--chroma-dir", default=CHROMA_DIR)
+    parser.add_argument("--output-dir", default=SNAPSHOT_DIR)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32", help="저장할 벡터 정밀도")
+    parser.add_argument("--hnsw", action="store_true", help="hnswlib 근사 인덱스도 생성 (hnswlib 필요)")
+    parser.add_argument("--quantize", choices=["none", "float16", "int8"], default="none", help="후보 검색용 압축 벡터 형식")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.chroma_dir):
+        print(f"오류: Chroma DB 폴더 '{args.chroma_dir}'가 존재하지 않습니다. build_chromadb.py를 먼저 실행해주세요.")
+        sys.exit(1)
+
+    # 새 스냅샷을 임시 폴더에 만든 뒤 교체 (실행 중인 서버가 반쯤 쓰인 파일을 보지 않도록)
+    temp_dir = args.output_dir.rstrip("/") + ".tmp"
+    if os.path.exists(temp_dir):
+        shutil.rmtree(temp_dir)
+    os.makedirs(temp_dir)
+
+    client = chromadb.PersistentClient(path=args.chroma_dir)
+    existing = {c.name for c in client.list_collections()}
+
+    # 파티션 빌드(build_chromadb.py --partition-by)면 청크 컬렉션 대신 파티션 컬렉션들을 내보내고 파티션 목록도 복사
+    collection_names = list(COLLECTION_NAMES)
+    partition_manifest = load_partition_manifest(args.chroma_dir)
+    if partition_manifest is not None:
+        collection_names = [p["name"] for p in partition_manifest["partitions"]] + collection_names[1:]
+        shutil.copy(os.path.join(args.chroma_dir, PARTITION_MANIFEST_FILE), os.path.join(temp_dir, PARTITION_MANIFEST_FILE))
+        print(f"🗂️ 파티션 {len(partition_manifest['partitions'])}개 ({'/'.join(partition_manifest['partition_by'])})")
+
+    collections = {}
+    for name in collection_names:
+        if name not in existing:
+            print(f"⚠️ '{name}' 컬렉션이 없어 건너뜁니다.")
+            continue
+        start = time.perf_counter()
+        collections[name] = export_collection(
+            client.get_collection(name=name), os.path.join(temp_dir, name), dtype=args.dtype, build_hnsw=args.hnsw,
+            quantize=None if args.quantize == "none" else args.quantize
+        )
+        print(f"✅ {name}: {collections[name]['count']}개 벡터 ({args.dtype}, hnsw={collections[name]['hnsw']}, "
+              f"quantize={collections[name]['quantize']}) "
+              f"{time.perf_counter() - start:.1f}초")
+
+    write_manifest(temp_dir, collections)
+
+    if os.path.exists(args.output_dir):
+        shutil.rmtree(args.output_dir)
+    os.rename(temp_dir, args.output_dir)
+    print(f"✅ 벡터 스냅샷 저장 완료: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+이벤트 루프 블로킹 부하 테스트
+
+실행 중인 백엔드 서버에 대해
+1) 아무 부하가 없을 때 /health 응답 시간을 측정하고
+2) Gemini 호출이 포함된 /api/v1/search/search 요청을 동시에 여러 개 보내는 동안
+   /health 응답 시간을 다시 측정하여 p50 / p95 / p99 를 비교합니다.
+
+Gemini 호출이 이벤트 루프를 막지 않는다면 두 구간의 p99가 거의 같아야 합니다.
+
+사용법 (backend/scripts 폴더에서):
+    python load_test_event_loop.py --token <JWT 토큰>
+    python load_test_event_loop.py --base-url http://localhost:5000 --token <JWT 토큰> --searches 20
+"""
+import os
+import time
+import asyncio
+import argparse
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv("../.env")
+
+SAMPLE_QUERIES = [
+    "식물로 미세먼지를 줄이는 방법",
+    "태양광 패널 효율을 높이는 실험",
+    "2024 물리 특상",
+    "pH에 따른 효소 활성 변화",
+    "자석의 세기와 거리의 관계"
+]
+
+
+def percentile(values, p):
+    """정렬된 값 목록에서 백분위수 계산"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(label, latencies):
+    print(f"{label:<16} | 요청 {len(latencies):>4}개 | "
+          f"p50 {percentile(latencies, 50):>7.1f}ms | "
+          f"p95 {percentile(latencies, 95):>7.1f}ms | "
+          f"p99 {percentile(latencies, 99):>7.1f}ms")
+
+
+async def probe_health(session, base_url, stop_event, interval):
+    """stop_event가 설정될 때까지 /health 응답 시간을 반복 측정"""
+    latencies = []
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        async with session.get(f"{base_url}/health") as response:
+            await response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run_search(session, base_url, token, query):
+    """Gemini 쿼리 분석이 포함된 검색 요청 1회"""
+    start = time.perf_counter()
+    async with session.post(
+        f"{base_url}/api/v1/search/search",
+        json={"query": query, "k": 5},
+        headers={"Authorization": f"Bearer {token}"}
+    ) as response:
+        await response.read()
+        status = response.status
+    return status, (time.perf_counter() - start) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Gemini 호출 중 이벤트 루프 응답성 부하 테스트")
+    parser.add_argument("--base-url", default=f"http://localhost:{os.getenv('BACKEND_PORT', '5000')}")
+    parser.add_argument("--token", default=os.getenv("LOAD_TEST_TOKEN"), help="검색 API 호출용 JWT 토큰")
+    parser.add_argument("--searches", type=int, default=20, help="동시에 보낼 검색 요청 수")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.05, help="/health 측정 간격(초)")
+    args = parser.parse_args()
+
+    if not args.token:
+        print("오류: --token 또는 LOAD_TEST_TOKEN 환경 변수가 필요합니다.")
+        return
+
+    async with aiohttp.ClientSession() as session:
+        # 1. 부하 없는 상태의 기준 측정
+        stop_event = asyncio.Event()
+        probe = asyncio.create_task(probe_health(session, args.base_url, stop_event, args.interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop_event.set()
+        baseline = await probe
+
+        # 2. 검색(LLM 호출) 부하 중 측정
+        stop_event = asyncio.Event()
+        probe = asyncio.create_task(probe_health(session, args.base_url, stop_event, args.interval))
+        searches = await asyncio.gather(*[
+            run_search(session, args.base_url, args.token, SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)])
+            for i in range(args.searches)
+        ])
+        stop_event.set()
+        under_load = await probe
+
+    print("=" * 72)
+    summarize("/health (기준)", baseline)
+    summarize("/health (부하 중)", under_load)
+    summarize("/search", [latency for _, latency in searches])
+    failed = [status for status, _ in searches if status != 200]
+    if failed:
+        print(f"⚠️ 실패한 검색 요청: {len(failed)}개 (상태 코드: {sorted(set(failed))})")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
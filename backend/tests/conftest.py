@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 폴더를 import 경로에 추가 (app 패키지 사용)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
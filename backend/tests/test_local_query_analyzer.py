@@ -0,0 +1,19 @@
+from app.services.local_query_analyzer import FIELD_NAMES, LocalQueryAnalyzer
+
+# search_service.get_weight_config()의 기본 수상 목록
+AWARD_NAMES = ["대통령상", "국무총리상", "최우수상", "특상", "우수상", "장려상"]
+
+
+def test_bare_name_colliding_with_noun_is_not_a_filter():
+    analyzer = LocalQueryAnalyzer(AWARD_NAMES, FIELD_NAMES, {"김민수", "나무"}, {"이영희"}, ["서론"])
+
+    # 저자 이름과 같은 일반 명사는 필터로 쓰지 않고 Gemini로 넘김
+    analysis, confidence = analyzer.analyze("나무 광합성")
+    assert analysis is None
+    assert confidence < 1.0
+
+    # 호칭이 있으면 이름으로 인정
+    analysis, _ = analyzer.analyze("나무 학생 광합성")
+    assert analysis is not None and analysis[3] == {"authors": "나무"}
+    analysis, _ = analyzer.analyze("이영희선생님 광합성")
+    assert analysis is not None and analysis[3] == {"teacher": "이영희"}
@@ -0,0 +1,78 @@
+import time
+
+from app.services.search_pages import SearchPageCache
+
+# search_service의 기본 설정과 동일 (SEARCH_PAGE_CACHE_PER_USER, SEARCH_BATCH_MAX_QUERIES)
+PAGE_CACHE_PER_USER = 5
+BATCH_MAX_QUERIES = 20
+
+
+def make_page(query, n_results=30, k=10):
+    response_data = {"query": query, "summary_query": query, "priority_sections": [], "metadata_filters": {}}
+    results = [{"number": f"{query}-{i}", "rank": i + 1} for i in range(n_results)]
+    return response_data, results, k
+
+
+def test_full_batch_first_query_cursor_survives():
+    cache = SearchPageCache(max_users=10, per_user=PAGE_CACHE_PER_USER)
+    single_cursor = cache.save("user", [make_page("single")])[0]
+
+    cursors = cache.save("user", [make_page(f"q{i}") for i in range(BATCH_MAX_QUERIES)])
+    assert all(cursors)
+
+    page = cache.get(cursors[0], 10, "user")
+    assert page is not None
+    assert page["query"] == "q0"
+    assert [r["rank"] for r in page["results"]] == list(range(11, 21))
+
+    # 다음 커서도 같은 쿼리의 이어지는 결과
+    last_page = cache.get(page["next_cursor"], 10, "user")
+    assert [r["rank"] for r in last_page["results"]] == list(range(21, 31))
+    assert last_page["next_cursor"] is None
+
+    # 배치 하나가 이전 단건 검색 커서를 밀어내지 않음
+    assert cache.get(single_cursor, 10, "user")["query"] == "single"
+    assert cache.get(cursors[-1], 10, "user")["query"] == f"q{BATCH_MAX_QUERIES - 1}"
+
+
+def test_cursor_is_per_user_and_rejects_invalid():
+    cache = SearchPageCache(max_users=10, per_user=PAGE_CACHE_PER_USER)
+    cursor = cache.save("user", [make_page("q")])[0]
+    assert cache.get(cursor, 10, "other") is None
+    assert cache.get("garbage", 10, "user") is None
+    assert cache.get(cursor.rsplit(".", 2)[0] + ".99.10", 10, "user") is None
+
+
+def test_no_cursor_when_all_results_fit():
+    cache = SearchPageCache(max_users=10, per_user=PAGE_CACHE_PER_USER)
+    assert cache.save("user", [make_page("q", n_results=5)]) == [None]
+    assert cache.stats()["size"] == 0
+
+
+def test_later_cursor_outlives_first_search_ttl():
+    cache = SearchPageCache(max_users=10, per_user=PAGE_CACHE_PER_USER, ttl_seconds=1)
+    cache.save("user", [make_page("first")])
+    time.sleep(0.8)
+    second_cursor = cache.save("user", [make_page("second")])[0]
+    time.sleep(0.3)
+
+    # 첫 검색은 만료 시점이 지났지만 0.3초 전의 두 번째 커서는 유효해야 함
+    page = cache.get(second_cursor, 10, "user")
+    assert page is not None
+    assert page["query"] == "second"
+
+
+def test_formatter_only_formats_requested_page():
+    calls = []
+
+    def formatter(items, offset):
+        calls.append((len(items), offset))
+        return [{**item, "formatted": True} for item in items]
+
+    cache = SearchPageCache(max_users=10, per_user=PAGE_CACHE_PER_USER, formatter=formatter)
+    cursor = cache.save("user", [make_page("q")])[0]
+    page = cache.get(cursor, 10, "user")
+
+    assert calls == [(10, 10)]
+    assert all(r["formatted"] for r in page["results"])
+    assert [r["rank"] for r in page["results"]] == list(range(11, 21))
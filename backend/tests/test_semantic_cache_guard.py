@@ -0,0 +1,32 @@
+import numpy as np
+
+from app.services.local_query_analyzer import FIELD_NAMES, LocalQueryAnalyzer
+from app.services.semantic_cache import SemanticCache
+
+# search_service.get_weight_config()의 기본 수상 목록
+AWARD_NAMES = ["대통령상", "국무총리상", "최우수상", "특상", "우수상", "장려상"]
+
+
+def make_analyzer():
+    return LocalQueryAnalyzer(AWARD_NAMES, FIELD_NAMES, {"김민수"}, {"이영희"}, ["서론"])
+
+
+def test_guard_separates_queries_with_same_digits():
+    analyzer = make_analyzer()
+    assert analyzer.metadata_terms("2024 물리 특상") != analyzer.metadata_terms("2024 화학 특상")
+    assert analyzer.metadata_terms("2024 물리 특상") != analyzer.metadata_terms("2024 물리 우수상")
+    assert analyzer.metadata_terms("김민수 학생 보고서") != analyzer.metadata_terms("이영희 선생님 보고서")
+    assert analyzer.metadata_terms("2024 물리 특상") == analyzer.metadata_terms("2024년 물리 분야 특상")
+
+
+def test_semantic_cache_misses_for_different_field_and_award():
+    analyzer = make_analyzer()
+    cache = SemanticCache(max_entries=8, threshold=0.97)
+    vector = np.random.default_rng(0).standard_normal(16).astype(np.float32)
+    near_vector = vector + 0.01
+
+    cache.set(vector, "물리 특상 결과", analyzer.metadata_terms("2024 물리 특상"))
+
+    assert cache.get(near_vector, analyzer.metadata_terms("2024 화학 특상"))[0] is None
+    assert cache.get(near_vector, analyzer.metadata_terms("2024 물리 우수상"))[0] is None
+    assert cache.get(near_vector, analyzer.metadata_terms("2024 물리 특상"))[0] == "물리 특상 결과"
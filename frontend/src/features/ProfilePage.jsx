@@ -142,6 +142,7 @@ function ProfilePage() {
   const getServiceDisplayName = (serviceName) => {
     const serviceNames = {
       'query_summary': '검색 분석',
+      'query_summary_local': '검색 분석 (로컬)',
       'analyze_reports': '보고서 분석',
       'chat_report': '보고서 채팅',
       'write_chat': '보고서 작성'